@@ -0,0 +1,172 @@
+"""Benchmarks do nucleo: hash, mineracao, saldos, mempool e validacao de cadeia."""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+from typing import Any
+
+from common import Config, addresses, build_chain, fill_mempool, measure, result
+
+from lsdchain.core.block import Block
+from lsdchain.core.blockchain import Blockchain
+from lsdchain.core.mining import Miner
+from lsdchain.core.transaction import Transaction
+
+
+def run(config: Config) -> list[dict[str, Any]]:
+    rng = random.Random(config.seed)
+    started = time.perf_counter()
+    blockchain, funded = build_chain(config)
+    pending = fill_mempool(blockchain, funded, config.mempool)
+    chain = list(blockchain.chain)
+    results: list[dict[str, Any]] = [
+        result(
+            "setup.build_chain",
+            [time.perf_counter() - started],
+            blocks=len(chain),
+            transactions=sum(len(block.transactions) for block in chain),
+            mempool=len(pending),
+        )
+    ]
+
+    # Block.calculate_hash num bloco cheio
+    block = max(chain, key=lambda b: len(b.transactions))
+    results.append(
+        measure(
+            "core.block.calculate_hash",
+            block.calculate_hash,
+            number=200,
+            repeat=config.repeat,
+            transactions=len(block.transactions),
+        )
+    )
+
+    # Miner.mine_block: tentativas de nonce por segundo com um bloco de txs_per_block transacoes
+    miner = Miner(blockchain, "bench-miner")
+    sample = pending[: max(0, config.txs_per_block - 1)]
+    hashes = 0
+    samples: list[float] = []
+    for _ in range(config.mining_blocks):
+        start = time.perf_counter()
+        mined = miner.mine_block(transactions=sample)
+        elapsed = time.perf_counter() - start
+        if mined is not None:
+            hashes += mined.nonce + 1
+            samples.append(elapsed)
+    if samples:
+        results.append(
+            result(
+                "core.miner.mine_block",
+                samples,
+                hashes=hashes,
+                hash_rate=hashes / sum(samples),
+                transactions=len(sample) + 1,
+            )
+        )
+
+    # Leituras: saldo e duplicidade (confirmadas, pendentes e desconhecidas)
+    wallets = addresses(config.addresses) + ["desconhecido:1"]
+    lookups = [rng.choice(wallets) for _ in range(1000)]
+    results.append(
+        measure(
+            "core.blockchain.get_balance",
+            lambda: [blockchain.get_balance(address) for address in lookups],
+            repeat=config.repeat,
+            batch=len(lookups),
+        )
+    )
+    confirmed = [tx for b in chain for tx in b.transactions]
+    candidates = [rng.choice(confirmed) for _ in range(400)]
+    candidates += [rng.choice(pending) for _ in range(400 if pending else 0)]
+    candidates += [Transaction("x", "y", 1.0) for _ in range(200)]
+    results.append(
+        measure(
+            "core.blockchain.is_duplicate",
+            lambda: [blockchain._is_duplicate(tx) for tx in candidates],
+            repeat=config.repeat,
+            batch=len(candidates),
+        )
+    )
+
+    # Escritas: add_transaction (pool ja com `mempool` pendentes) e add_block
+    fresh: list[list[Transaction]] = []
+
+    def new_batch() -> None:
+        fresh.append([
+            Transaction(funded[i % len(funded)], rng.choice(wallets), 0.0001) for i in range(500)
+        ])
+
+    results.append(
+        measure(
+            "core.blockchain.add_transaction",
+            lambda: [blockchain.add_transaction(tx) for tx in fresh[-1]],
+            repeat=config.repeat,
+            setup=new_batch,
+            batch=500,
+            mempool=len(blockchain.mempool),
+        )
+    )
+
+    replay_blocks = [Block.from_dict(b.to_dict()) for b in chain[1:]]
+    replay: list[Blockchain] = []
+    results.append(
+        measure(
+            "core.blockchain.add_block",
+            lambda: [replay[-1].add_block(b) for b in replay_blocks],
+            repeat=config.repeat,
+            setup=lambda: replay.append(Blockchain(validation_workers=1)),
+            batch=len(replay_blocks),
+            transactions_per_block=config.txs_per_block,
+        )
+    )
+
+    # bifurcacao de um bloco na ponta: um ramo rival de 2 blocos passa a ser a cadeia principal
+    rival = Blockchain(validation_workers=1)
+    rival.chain = chain[:-1]
+    rival_miner = Miner(rival, "rival")
+    fork_blocks: list[Block] = []
+    for _ in range(2):
+        block = rival_miner.mine_block()
+        rival.add_block(block)
+        fork_blocks.append(block)
+    targets: list[Blockchain] = []
+
+    def new_target() -> None:
+        target = Blockchain(validation_workers=1)
+        target.chain = chain
+        targets.append(target)
+
+    results.append(
+        measure(
+            "core.blockchain.reorg[depth=1]",
+            lambda: [targets[-1].process_block(b) for b in fork_blocks],
+            repeat=config.repeat,
+            setup=new_target,
+            blocks=len(chain),
+        )
+    )
+    results.append(
+        measure(
+            "core.blockchain.replace_chain[depth=1]",
+            lambda: targets[-1].replace_chain(chain[:-1] + fork_blocks),
+            repeat=config.repeat,
+            setup=new_target,
+            blocks=len(chain),
+        )
+    )
+
+    # is_valid_chain sequencial e, havendo nucleos, com verificacao paralela dos cabecalhos
+    worker_counts = sorted({1, os.cpu_count() or 1})
+    for workers in worker_counts:
+        blockchain.validation_workers = workers
+        results.append(
+            measure(
+                f"core.blockchain.is_valid_chain[workers={workers}]",
+                lambda: blockchain.is_valid_chain(chain),
+                repeat=config.repeat,
+                blocks=len(chain),
+            )
+        )
+    return results
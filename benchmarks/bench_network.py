@@ -0,0 +1,189 @@
+"""Latencia de gossip ponta a ponta entre processos Node locais (loopback)."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import queue
+import socket
+import statistics
+import time
+from typing import Any
+
+from common import Config, percentile
+
+from lsdchain.core.transaction import Transaction
+from lsdchain.network.node import Node
+
+HOST = "127.0.0.1"
+# Limites de espera do orquestrador (segundos)
+READY_TIMEOUT = 30.0
+DELIVERY_TIMEOUT = 10.0
+
+
+def _free_ports(count: int) -> list[int]:
+    sockets = []
+    for _ in range(count):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((HOST, 0))
+        sockets.append(sock)
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+
+def _node_process(
+    index: int,
+    ports: list[int],
+    commands: multiprocessing.Queue,
+    events: multiprocessing.Queue,
+) -> None:
+    """Um no por processo, ligado ao seguinte num anel; reporta cada transacao admitida."""
+    logging.disable(logging.WARNING)
+    node = Node(HOST, ports[index])
+    admit = node.blockchain.add_transactions
+
+    def add_transactions(transactions: Any) -> list[str | None]:
+        transactions = list(transactions)
+        results = admit(transactions)
+        now = time.time()
+        for tx, rejected in zip(transactions, results):
+            if rejected is None:
+                events.put(("received", index, tx.id, now))
+        return results
+
+    node.blockchain.add_transactions = add_transactions
+    node.start()
+    try:
+        neighbour = f"{HOST}:{ports[(index + 1) % len(ports)]}"
+        deadline = time.monotonic() + READY_TIMEOUT
+        # o vizinho pode ainda nao estar ouvindo
+        while not node.connect_to_peer(neighbour) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        events.put(("ready", index, None, time.time()))
+        while True:
+            command = commands.get()
+            if command == "stop":
+                break
+            if command == "mine":
+                node.mine()
+            elif command == "height":
+                events.put(("height", index, len(node.blockchain.chain), time.time()))
+            elif command == "send":
+                tx = Transaction(node.address, f"{HOST}:1", 0.001)
+                sent = time.time()
+                node.broadcast_transaction(tx)
+                events.put(("sent", index, tx.id, sent))
+    finally:
+        node.stop()
+
+
+def _collect(events: multiprocessing.Queue, kind: str, count: int, timeout: float) -> list[tuple]:
+    found: list[tuple] = []
+    deadline = time.monotonic() + timeout
+    while len(found) < count:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            event = events.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if event[0] == kind:
+            found.append(event)
+    return found
+
+
+def run(config: Config) -> list[dict[str, Any]]:
+    """Anel de config.nodes processos; o no 0 minera um bloco e envia gossip_messages transacoes.
+
+    Para cada transacao mede o tempo ate cada outro no admiti-la (o ultimo
+    no esta a nodes // 2 saltos da origem).
+    """
+    if config.nodes < 2:
+        return []
+    ports = _free_ports(config.nodes)
+    events: multiprocessing.Queue = multiprocessing.Queue()
+    commands = [multiprocessing.Queue() for _ in ports]
+    processes = [
+        multiprocessing.Process(
+            target=_node_process, args=(index, ports, commands[index], events), daemon=True
+        )
+        for index in range(config.nodes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        if len(_collect(events, "ready", config.nodes, READY_TIMEOUT)) < config.nodes:
+            raise RuntimeError("nos do benchmark nao ficaram prontos")
+
+        # saldo para a origem: o bloco minerado precisa chegar a todos antes das transacoes
+        commands[0].put("mine")
+        deadline = time.monotonic() + DELIVERY_TIMEOUT
+        while time.monotonic() < deadline:
+            for command in commands:
+                command.put("height")
+            heights = _collect(events, "height", config.nodes, DELIVERY_TIMEOUT)
+            if len(heights) == config.nodes and all(height >= 2 for _, _, height, _ in heights):
+                break
+            time.sleep(0.05)
+        else:
+            raise RuntimeError("bloco inicial nao se propagou")
+
+        sent: dict[str, float] = {}
+        received: dict[str, dict[int, float]] = {}
+        for _ in range(config.gossip_messages):
+            commands[0].put("send")
+            # uma transacao por vez: mede latencia, nao vazao
+            expected = config.nodes
+            deadline = time.monotonic() + DELIVERY_TIMEOUT
+            tx_id = None
+            while expected and time.monotonic() < deadline:
+                try:
+                    kind, index, item, stamp = events.get(timeout=deadline - time.monotonic())
+                except queue.Empty:
+                    break
+                if kind == "sent":
+                    tx_id = item
+                    sent[item] = stamp
+                    expected -= 1
+                elif kind == "received" and index != 0:
+                    received.setdefault(item, {})[index] = stamp
+                    expected -= 1
+            if tx_id is None:
+                raise RuntimeError("origem nao enviou a transacao")
+    finally:
+        for command in commands:
+            command.put("stop")
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    per_node: list[float] = []
+    full: list[float] = []
+    delivered = 0
+    for tx_id, start in sent.items():
+        arrivals = received.get(tx_id, {})
+        per_node.extend(stamp - start for stamp in arrivals.values())
+        if len(arrivals) == config.nodes - 1:
+            delivered += 1
+            full.append(max(arrivals.values()) - start)
+    if not full:
+        return []
+    return [
+        {
+            "name": "network.gossip.latency",
+            "unit": "s",
+            "nodes": config.nodes,
+            "topology": "ring",
+            "messages": len(sent),
+            "delivered_to_all": delivered,
+            "per_node_median": statistics.median(per_node),
+            "per_node_p95": percentile(per_node, 0.95),
+            "full_median": statistics.median(full),
+            "full_p95": percentile(full, 0.95),
+            "full_max": max(full),
+        }
+    ]
@@ -0,0 +1,50 @@
+"""Benchmarks de serializacao das mensagens (Message.to_bytes/from_bytes)."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from common import Config, build_chain, measure
+
+from lsdchain.network.protocol import FRAME_HEADER_SIZE, Message, Protocol
+
+# (nome, binario, zlib) como negociado com os peers
+WIRE_FORMATS = (("json", False, False), ("bin", True, False), ("bin+zlib", True, True))
+
+
+def run(config: Config) -> list[dict[str, Any]]:
+    blockchain, _ = build_chain(config)
+    chain = blockchain.chain
+    block = max(chain, key=lambda b: len(b.transactions))
+    messages = {
+        "new_transaction": Protocol.new_transaction(block.transactions[-1].to_dict()),
+        "new_block": Protocol.new_block(block.to_dict()),
+        "response_chain": Protocol.response_chain(blockchain.to_dict()),
+    }
+    results: list[dict[str, Any]] = []
+    for kind, message in messages.items():
+        message.sender = "127.0.0.1:5000"
+        # mensagens pequenas precisam de mais iteracoes por rodada para medir bem
+        number = 2000 if kind == "new_transaction" else 200 if kind == "new_block" else 5
+        for label, binary, compress in WIRE_FORMATS:
+            frame = message.to_bytes(binary, compress)
+            body = frame[FRAME_HEADER_SIZE:]
+            results.append(
+                measure(
+                    f"protocol.to_bytes[{kind},{label}]",
+                    lambda: message.to_bytes(binary, compress),
+                    number=number,
+                    repeat=config.repeat,
+                    bytes=len(frame),
+                )
+            )
+            results.append(
+                measure(
+                    f"protocol.from_bytes[{kind},{label}]",
+                    lambda: Message.from_bytes(body),
+                    number=number,
+                    repeat=config.repeat,
+                    bytes=len(frame),
+                )
+            )
+    return results
@@ -0,0 +1,131 @@
+"""Utilitarios dos benchmarks: medicao de tempo e dados sinteticos."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_PATH = os.path.join(ROOT, "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from lsdchain.core.blockchain import Blockchain
+from lsdchain.core.mining import Miner
+from lsdchain.core.transaction import Transaction
+
+
+@dataclass
+class Config:
+    """Tamanhos dos dados sinteticos e repeticoes das medicoes."""
+
+    blocks: int = 100
+    txs_per_block: int = 50
+    mempool: int = 2000
+    addresses: int = 100
+    nodes: int = 4
+    gossip_messages: int = 20
+    mining_blocks: int = 3
+    repeat: int = 5
+    seed: int = 2025
+
+
+# Presets da opcao --size
+SIZES = {
+    "small": Config(blocks=50, txs_per_block=20, mempool=500, nodes=3, gossip_messages=10),
+    "medium": Config(),
+    "large": Config(blocks=500, txs_per_block=200, mempool=20000, nodes=6, gossip_messages=50),
+}
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    number: int = 1,
+    repeat: int = 5,
+    setup: Callable[[], Any] | None = None,
+    batch: int = 1,
+    **extra: Any,
+) -> dict[str, Any]:
+    """Executa func number vezes por rodada e devolve as estatisticas por operacao.
+
+    setup (opcional) roda antes de cada rodada, fora do tempo medido. Se cada
+    chamada de func faz `batch` operacoes, os tempos sao divididos por ele.
+    """
+    samples: list[float] = []
+    for _ in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / (number * batch))
+    return result(name, samples, number * batch, **extra)
+
+
+def result(name: str, samples: list[float], number: int = 1, **extra: Any) -> dict[str, Any]:
+    """Registro de resultado a partir de amostras em segundos por operacao.
+
+    number e quantas operacoes cada amostra mediu.
+    """
+    median = statistics.median(samples)
+    return {
+        "name": name,
+        "unit": "s/op",
+        "number": number,
+        "rounds": len(samples),
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+        "ops_per_sec": 1.0 / median if median > 0 else None,
+        **extra,
+    }
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def addresses(count: int) -> list[str]:
+    return [f"10.0.{i // 250}.{i % 250}:5000" for i in range(count)]
+
+
+def build_chain(config: Config) -> tuple[Blockchain, list[str]]:
+    """Cadeia minerada de verdade (PoW atual) com txs_per_block transacoes por bloco.
+
+    Cada bloco premia um endereco diferente, e os seguintes gastam desses
+    saldos, entao todas as regras de validacao sao exercitadas.
+    """
+    blockchain = Blockchain(validation_workers=1)
+    wallets = addresses(config.addresses)
+    miner = Miner(blockchain, wallets[0])
+    funded: list[str] = []
+    for height in range(config.blocks):
+        for i in range(config.txs_per_block - 1 if funded else 0):
+            sender = funded[(height + i) % len(funded)]
+            receiver = wallets[(height * 7 + i) % len(wallets)]
+            blockchain.add_transaction(Transaction(sender, receiver, 0.01))
+        miner.miner_address = wallets[height % len(wallets)]
+        block = miner.mine_block()
+        if block is None or not blockchain.add_block(block):
+            raise RuntimeError("falha ao montar a cadeia sintetica")
+        if miner.miner_address not in funded:
+            funded.append(miner.miner_address)
+    return blockchain, funded
+
+
+def fill_mempool(blockchain: Blockchain, funded: list[str], count: int) -> list[Transaction]:
+    """Adiciona count transacoes pendentes validas e devolve as aceitas."""
+    wallets = addresses(len(funded) + 1)
+    pending = [
+        Transaction(funded[i % len(funded)], wallets[(i * 3) % len(wallets)], 0.001)
+        for i in range(count)
+    ]
+    results = blockchain.add_transactions(pending)
+    return [tx for tx, rejected in zip(pending, results) if rejected is None]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Executa os benchmarks e grava os resultados em JSON.
+
+Exemplos:
+    python benchmarks/run.py
+    python benchmarks/run.py --size large --output resultados.json
+    python benchmarks/run.py --only core protocol --compare anterior.json
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, replace
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any
+
+from common import ROOT, SIZES, Config
+
+import bench_core
+import bench_network
+import bench_protocol
+
+SUITES = {
+    "core": bench_core.run,
+    "protocol": bench_protocol.run,
+    "network": bench_network.run,
+}
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks da blockchain LSD 2025")
+    parser.add_argument("--size", choices=sorted(SIZES), default="medium", help="Preset de tamanhos")
+    parser.add_argument("--only", nargs="*", choices=sorted(SUITES), help="Suites a executar")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saida (padrao: stdout)")
+    parser.add_argument("--compare", default=None, help="JSON anterior para comparar as medianas")
+    for field, default in asdict(Config()).items():
+        parser.add_argument(
+            f"--{field.replace('_', '-')}",
+            type=int,
+            default=None,
+            help=f"Sobrescreve o preset (medium: {default})",
+        )
+    return parser.parse_args()
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(previous: dict[str, Any], current: dict[str, Any]) -> None:
+    """Imprime (stderr) a razao atual/anterior das medianas de cada benchmark."""
+    before = {item["name"]: item for item in previous.get("results", [])}
+    print(f"{'benchmark':<55} atual/anterior", file=sys.stderr)
+    for item in current["results"]:
+        old = before.get(item["name"])
+        if not old or not old.get("median") or "median" not in item:
+            continue
+        ratio = item["median"] / old["median"]
+        print(f"{item['name']:<55} {ratio:6.2f}x", file=sys.stderr)
+
+
+def main() -> None:
+    args = _parse_args()
+    config = SIZES[args.size]
+    overrides = {
+        field: getattr(args, field)
+        for field in asdict(config)
+        if getattr(args, field) is not None
+    }
+    config = replace(config, **overrides)
+
+    results: list[dict[str, Any]] = []
+    for name in args.only or SUITES:
+        started = time.perf_counter()
+        print(f"[{name}] executando...", file=sys.stderr)
+        results.extend(SUITES[name](config))
+        print(f"[{name}] {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "size": args.size,
+            "config": asdict(config),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            _compare(json.load(handle), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,14 @@ from __future__ import annotations
 import argparse
 import time
 
+from ..core.mining import BLOCK_INTERVAL
 from ..core.transaction import Transaction
-from ..network.node import Node
+from ..network.async_node import AsyncNode
+from ..network.node import HTTP_HOST, Node
+from ..network.protocol import WIRE_FORMATS, WIRE_JSON
+
+# Transacoes mais recentes mostradas junto com o saldo
+HISTORY_LINES = 10
 
 
 def _parse_args() -> argparse.Namespace:
@@ -19,10 +25,67 @@ def _parse_args() -> argparse.Namespace:
         default=[],
         help="Enderecos bootstrap (ex: localhost:5001)",
     )
+    parser.add_argument(
+        "--mining-workers",
+        type=int,
+        default=1,
+        help="Processos usados na mineracao (1 = sequencial)",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=None,
+        help="Diretorio para persistir os blocos (sem ele a cadeia fica so em memoria)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("threads", "asyncio"),
+        default="threads",
+        help="Motor de rede: uma thread por conexao ou event loop asyncio",
+    )
+    parser.add_argument(
+        "--wire",
+        choices=tuple(WIRE_FORMATS),
+        default=WIRE_JSON,
+        help="Formato de fio com peers que tambem o aceitam: json (padrao, menos CPU), "
+        "bin (binario compacto) ou zlib (binario comprimido, menos banda)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Guarda as transacoes confirmadas em colunas (menos memoria, leitura mais lenta)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Porta HTTP local com as metricas no formato Prometheus (/metrics)",
+    )
+    parser.add_argument(
+        "--http-host",
+        default=HTTP_HOST,
+        help="Interface dos endpoints HTTP (metricas e API); o padrao so aceita conexoes locais",
+    )
+    parser.add_argument(
+        "--api-port",
+        type=int,
+        default=None,
+        help="Porta HTTP local da API de consulta JSON (blocos, transacoes, saldos)",
+    )
+    parser.add_argument(
+        "--mine",
+        action="store_true",
+        help="Inicia com a mineracao continua ligada (em segundo plano)",
+    )
+    parser.add_argument(
+        "--mining-interval",
+        type=float,
+        default=BLOCK_INTERVAL,
+        help="Segundos minimos entre blocos da mineracao continua",
+    )
     return parser.parse_args()
 
 
-def _print_menu() -> None:
+def _print_menu(node: Node) -> None:
     print("\n" + "=" * 60)
     print("BLOCKCHAIN LSD 2025 - Menu")
     print("=" * 60)
@@ -34,6 +97,9 @@ def _print_menu() -> None:
     print("6. Ver peers conectados")
     print("7. Conectar a peer")
     print("8. Sincronizar blockchain")
+    print("9. Ver metricas")
+    state = "ligada" if node.mining_service.running else "desligada"
+    print(f"10. Mineracao continua ({state}): ligar/desligar")
     print("0. Sair")
     print("=" * 60)
 
@@ -83,7 +149,7 @@ def _mine_block(node: Node) -> None:
 
 def _show_blockchain(node: Node) -> None:
     print("\n--- Blockchain ---")
-    for block in node.blockchain.chain:
+    for block in node.blockchain.snapshot():
         print(f"\n[Bloco #{block.index}]")
         print(f"Hash: {block.hash}")
         print(f"Previous: {block.previous_hash}")
@@ -98,6 +164,15 @@ def _show_balance(node: Node) -> None:
     address = input("\nEndereco: ").strip()
     balance = node.blockchain.get_balance(address)
     print(f"Saldo de {address}: {balance}")
+    summary = node.blockchain.address_summary(address)
+    if not summary.transactions:
+        return
+    print(
+        f"Recebido: {summary.received} | Enviado: {summary.sent} | "
+        f"Transacoes: {summary.transactions}"
+    )
+    for height, tx in node.blockchain.address_history(address, limit=HISTORY_LINES):
+        print(f"  #{height} {tx.origem} -> {tx.destino}: {tx.valor}")
 
 
 def _show_peers(node: Node) -> None:
@@ -105,8 +180,45 @@ def _show_peers(node: Node) -> None:
     if not node.peers:
         print("Nenhum peer conectado.")
         return
+    queues = node.broadcast_stats()["peers"]
     for peer in node.peers:
-        print(f"- {peer}")
+        queue = queues.get(peer)
+        if queue:
+            print(
+                f"- {peer} (fila: {queue['depth']}, enviadas: {queue['sent']}, "
+                f"descartadas: {queue['dropped']}, falhas: {queue['failed']})"
+            )
+        else:
+            print(f"- {peer}")
+
+
+def _show_stats(node: Node) -> None:
+    peer = input("\nPeer (vazio = este no): ").strip()
+    stats = node.request_stats(peer) if peer else node.stats()
+    if stats is None:
+        print("Peer nao respondeu.")
+        return
+    print(f"\n--- Metricas de {stats.get('address', peer)} ---")
+    for section in ("gauges", "counters"):
+        for name, series in sorted(stats.get(section, {}).items()):
+            for labels, value in sorted(series.items()):
+                suffix = f"{{{labels}}}" if labels else ""
+                print(f"{name}{suffix}: {value:g}")
+    for name, series in sorted(stats.get("histograms", {}).items()):
+        for labels, histogram in sorted(series.items()):
+            suffix = f"{{{labels}}}" if labels else ""
+            count = histogram["count"]
+            mean = histogram["sum"] / count * 1000 if count else 0.0
+            print(f"{name}{suffix}: {count} amostras, media {mean:.2f} ms")
+
+
+def _toggle_mining(node: Node) -> None:
+    if node.mining_service.running:
+        node.stop_mining()
+        print(f"\nMineracao continua desligada ({node.mining_service.blocks_found} blocos minerados).")
+    else:
+        node.start_mining()
+        print("\nMineracao continua ligada; o no segue atendendo a rede.")
 
 
 def _connect_peer(node: Node) -> None:
@@ -125,7 +237,19 @@ def _sync_chain(node: Node) -> None:
 
 def run() -> None:
     args = _parse_args()
-    node = Node(host=args.host, port=args.port)
+    node_class = AsyncNode if args.engine == "asyncio" else Node
+    node = node_class(
+        host=args.host,
+        port=args.port,
+        mining_workers=args.mining_workers,
+        data_dir=args.data_dir,
+        compact=args.compact,
+        metrics_port=args.metrics_port,
+        mining_interval=args.mining_interval,
+        api_port=args.api_port,
+        wire=args.wire,
+        http_host=args.http_host,
+    )
     node.start()
 
     for bootstrap in args.bootstrap:
@@ -135,9 +259,12 @@ def run() -> None:
     if node.peers:
         node.sync_blockchain()
 
+    if args.mine:
+        node.start_mining()
+
     try:
         while True:
-            _print_menu()
+            _print_menu(node)
             choice = input("Escolha: ").strip()
             if choice == "1":
                 _create_transaction(node)
@@ -155,6 +282,10 @@ def run() -> None:
                 _connect_peer(node)
             elif choice == "8":
                 _sync_chain(node)
+            elif choice == "9":
+                _show_stats(node)
+            elif choice == "10":
+                _toggle_mining(node)
             elif choice == "0":
                 print("Encerrando...")
                 break
@@ -1,8 +1,12 @@
 """Componentes centrais da blockchain."""
 
+from .addresses import AddressIndex, AddressSummary
 from .block import Block, GENESIS_BLOCK
-from .blockchain import Blockchain
+from .blocktree import BlockTree
+from .blockchain import Blockchain, ChainSnapshot, ChainValidator
+from .columns import TransactionColumns
 from .transaction import Transaction
-from .mining import Miner
+from .mempool import Mempool
+from .mining import Miner, MiningService
 
-__all__ = ["Block", "GENESIS_BLOCK", "Blockchain", "Transaction", "Miner"]
+__all__ = ["AddressIndex", "AddressSummary", "Block", "GENESIS_BLOCK", "BlockTree", "Blockchain", "ChainSnapshot", "ChainValidator", "Transaction", "TransactionColumns", "Mempool", "Miner", "MiningService"]
@@ -0,0 +1,127 @@
+"""Indice de historico por endereco: onde cada endereco aparece na cadeia e totais."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .transaction import Transaction
+
+# Cada entrada e um inteiro de 64 bits: altura << POSITION_BITS | posicao no bloco
+POSITION_BITS = 32
+_POSITION_MASK = (1 << POSITION_BITS) - 1
+
+
+@dataclass(frozen=True)
+class AddressSummary:
+    """Totais confirmados de um endereco."""
+
+    address: str
+    transactions: int
+    received: float
+    sent: float
+
+    @property
+    def balance(self) -> float:
+        return self.received - self.sent
+
+
+class AddressIndex:
+    """Para cada endereco, as transacoes confirmadas que o envolvem e os totais.
+
+    - entradas (altura, posicao) em ordem de cadeia, num array de 64 bits por
+      endereco (8 bytes por entrada, sem objetos por transacao)
+    - totais recebido/enviado atualizados a cada bloco
+
+    Blocos sao aplicados e revertidos so na ponta (como os saldos), entao
+    desfazer um bloco e retirar as ultimas entradas de cada endereco dele.
+    Consultas custam o tamanho da pagina pedida, nao o da cadeia.
+    """
+
+    __slots__ = ("_entries", "_received", "_sent")
+
+    def __init__(self) -> None:
+        self._entries: dict[str, array] = {}
+        self._received: dict[str, float] = {}
+        self._sent: dict[str, float] = {}
+
+    def __contains__(self, address: object) -> bool:
+        return address in self._entries
+
+    def count(self, address: str) -> int:
+        return len(self._entries.get(address, ()))
+
+    def add_block(self, height: int, transactions: Iterable[Transaction]) -> None:
+        base = height << POSITION_BITS
+        entries = self._entries
+        for position, tx in enumerate(transactions):
+            entry = base | position
+            for address in (tx.origem, tx.destino) if tx.origem != tx.destino else (tx.origem,):
+                column = entries.get(address)
+                if column is None:
+                    column = entries[address] = array("Q")
+                column.append(entry)
+            self._sent[tx.origem] = self._sent.get(tx.origem, 0.0) + tx.valor
+            self._received[tx.destino] = self._received.get(tx.destino, 0.0) + tx.valor
+
+    def remove_block(self, height: int, transactions: Iterable[Transaction]) -> None:
+        """Desfaz add_block do bloco na ponta."""
+        floor = height << POSITION_BITS
+        for tx in transactions:
+            for address in (tx.origem, tx.destino):
+                column = self._entries.get(address)
+                while column and column[-1] >= floor:
+                    column.pop()
+                if column is not None and not column:
+                    # endereco sem historico: zera tambem residuos de ponto flutuante
+                    del self._entries[address]
+                    self._received.pop(address, None)
+                    self._sent.pop(address, None)
+            if tx.origem in self._sent:
+                self._sent[tx.origem] -= tx.valor
+            if tx.destino in self._received:
+                self._received[tx.destino] -= tx.valor
+
+    def page(self, address: str, offset: int = 0, limit: int = 50) -> list[tuple[int, int]]:
+        """Entradas (altura, posicao) da mais recente para a mais antiga."""
+        column = self._entries.get(address)
+        if column is None or offset >= len(column):
+            return []
+        stop = len(column) - offset
+        start = max(0, stop - limit)
+        return [
+            (entry >> POSITION_BITS, entry & _POSITION_MASK)
+            for entry in reversed(column[start:stop])
+        ]
+
+    def summary(self, address: str) -> AddressSummary:
+        return AddressSummary(
+            address=address,
+            transactions=self.count(address),
+            received=self._received.get(address, 0.0),
+            sent=self._sent.get(address, 0.0),
+        )
+
+    def copy(self) -> "AddressIndex":
+        """Copia independente (copia os arrays, sem converter as entradas)."""
+        index = AddressIndex()
+        index._entries = {address: column[:] for address, column in self._entries.items()}
+        index._received = dict(self._received)
+        index._sent = dict(self._sent)
+        return index
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "entries": {address: column.tolist() for address, column in self._entries.items()},
+            "received": dict(self._received),
+            "sent": dict(self._sent),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AddressIndex":
+        index = cls()
+        index._entries = {address: array("Q", entries) for address, entries in data["entries"].items()}
+        index._received = dict(data["received"])
+        index._sent = dict(data["sent"])
+        return index
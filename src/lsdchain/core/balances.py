@@ -0,0 +1,117 @@
+"""Saldos confirmados em camadas: versoes publicadas compartilham tudo menos as alteracoes novas."""
+
+from __future__ import annotations
+
+from typing import Iterator, Mapping
+
+# Uma camada e fundida com a de baixo quando a de baixo tem no maximo MERGE_RATIO
+# vezes o tamanho dela: as camadas ficam em tamanhos decrescentes (O(log n) camadas)
+MERGE_RATIO = 2
+
+
+class BalanceView(Mapping[str, float]):
+    """Saldos de uma versao publicada, somente leitura.
+
+    Pilha de dicts que nunca mais sao alterados, da mais antiga (a maior) para
+    a mais nova; um endereco vale o que estiver na camada mais nova que o
+    contem. with_layer() cria outra versao sem tocar nesta.
+    """
+
+    __slots__ = ("_layers",)
+
+    def __init__(self, layers: tuple[dict[str, float], ...] = ()) -> None:
+        self._layers = layers
+
+    def __getitem__(self, address: str) -> float:
+        for layer in reversed(self._layers):
+            if address in layer:
+                return layer[address]
+        raise KeyError(address)
+
+    def get(self, address: str, default: float | None = None) -> float | None:
+        for layer in reversed(self._layers):
+            if address in layer:
+                return layer[address]
+        return default
+
+    def __contains__(self, address: object) -> bool:
+        return any(address in layer for layer in self._layers)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    @property
+    def depth(self) -> int:
+        return len(self._layers)
+
+    def to_dict(self) -> dict[str, float]:
+        """Copia plana dos saldos (O(enderecos): para snapshots em disco e exportacao)."""
+        if len(self._layers) == 1:
+            return dict(self._layers[0])
+        merged: dict[str, float] = {}
+        for layer in self._layers:
+            merged.update(layer)
+        return merged
+
+    def with_layer(self, changes: dict[str, float]) -> "BalanceView":
+        """Nova versao com `changes` por cima; `changes` passa a pertencer a ela.
+
+        Fundir as camadas do topo copia so elas; a base inteira so e copiada
+        quando o topo chega a metade do tamanho dela, entao cada alteracao
+        custa O(log n) amortizado.
+        """
+        layers = [*self._layers, changes]
+        while len(layers) > 1 and len(layers[-2]) <= MERGE_RATIO * len(layers[-1]):
+            top = layers.pop()
+            merged = dict(layers.pop())
+            merged.update(top)
+            layers.append(merged)
+        return BalanceView(tuple(layers))
+
+
+class BalanceMap:
+    """Saldos confirmados da Blockchain: a ultima versao publicada mais as alteracoes novas.
+
+    Escritas vao para um dict proprio (so os enderecos tocados desde a ultima
+    publicacao); publish() congela esse dict como a camada mais nova de um
+    BalanceView. Publicar uma versao por bloco custa o numero de enderecos do
+    bloco, nao o de enderecos da cadeia.
+    """
+
+    __slots__ = ("_view", "_changes")
+
+    def __init__(self, balances: Mapping[str, float] | None = None) -> None:
+        self._view = BalanceView((dict(balances),) if balances else ())
+        self._changes: dict[str, float] = {}
+
+    def get(self, address: str, default: float | None = None) -> float | None:
+        changes = self._changes
+        if address in changes:
+            return changes[address]
+        return self._view.get(address, default)
+
+    def __getitem__(self, address: str) -> float:
+        changes = self._changes
+        if address in changes:
+            return changes[address]
+        return self._view[address]
+
+    def __setitem__(self, address: str, balance: float) -> None:
+        self._changes[address] = balance
+
+    def publish(self) -> BalanceView:
+        """Versao imutavel com todas as alteracoes feitas ate aqui."""
+        if self._changes:
+            self._view = self._view.with_layer(self._changes)
+            self._changes = {}
+        return self._view
+
+    def fork(self) -> "BalanceMap":
+        """Copia independente (para tentar uma troca de ramo sem perder o estado atual)."""
+        copy = BalanceMap()
+        copy._view = self._view
+        copy._changes = dict(self._changes)
+        return copy
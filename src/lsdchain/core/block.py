@@ -11,10 +11,10 @@ import time
 from .transaction import Transaction
 
 GENESIS_PREVIOUS_HASH = "0" * 64
-GENESIS_HASH = "816534932c2b7154836da6afc367695e6337db8a921823784c14378abed4f7d7"
+GENESIS_HASH = "0567c32b97c36a70d3f4cb865710d329a0be5d713c8cb1b8c769fbaf89f1afb7"
 
 
-@dataclass
+@dataclass(slots=True)
 class Block:
     """Representa um bloco da blockchain."""
 
@@ -80,4 +80,31 @@ class Block:
         return self.hash.startswith(difficulty_prefix)
 
 
+class BlockHashTemplate:
+    """Template de hash para a mineracao: serializa as partes fixas do bloco uma vez.
+
+    Com sort_keys a ordem e index, nonce, previous_hash, timestamp, transactions;
+    so os digitos do nonce mudam entre tentativas. O SHA-256 do prefixo e
+    reaproveitado via copy() e o resultado e identico ao de Block.calculate_hash.
+    """
+
+    def __init__(self, block: Block) -> None:
+        head = json.dumps({"index": block.index}, sort_keys=True)[:-1]
+        tail = json.dumps(
+            {
+                "previous_hash": block.previous_hash,
+                "transactions": [tx.to_dict() for tx in block.transactions],
+                "timestamp": block.timestamp,
+            },
+            sort_keys=True,
+        )[1:]
+        self._prefix = hashlib.sha256(f'{head}, "nonce": '.encode())
+        self._suffix = f", {tail}".encode()
+
+    def hash_for(self, nonce: int) -> str:
+        digest = self._prefix.copy()
+        digest.update(str(nonce).encode() + self._suffix)
+        return digest.hexdigest()
+
+
 GENESIS_BLOCK = Block.create_genesis()
@@ -2,194 +2,1009 @@
 
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import islice
+import multiprocessing
+import os
+import threading
+from typing import Any, Iterable, Iterator, Mapping, Sequence
 
+from .addresses import AddressIndex, AddressSummary
+from .balances import BalanceMap, BalanceView
 from .block import Block, GENESIS_HASH, GENESIS_PREVIOUS_HASH
+from .blocktree import BlockTree
+from .columns import TransactionColumns, TransactionIndex, TransactionRange
+from .mempool import Mempool
+from .metrics import Metrics
+from .storage import BlockStore, SnapshotStore, StoredChain
 from .transaction import Transaction
 
 DIFFICULTY_PREFIX = "000"
 COINBASE_SENDER = "coinbase"
 COINBASE_REWARD = 50.0
 
+# Motivos de rejeicao devolvidos por Blockchain.add_transactions
+REJECT_DUPLICATE = "duplicate"
+REJECT_INVALID = "invalid"
+REJECT_COINBASE = "coinbase"
+REJECT_BALANCE = "insufficient_balance"
+REJECT_POOL_FULL = "pool_full"
+# Motivos de rejeicao de blocos (Blockchain.process_block e metricas)
+REJECT_BLOCK_HEADER = "invalid_header"
+REJECT_BLOCK_TRANSACTIONS = "invalid_transactions"
+REJECT_BLOCK_DUPLICATE = "duplicate"
+REJECT_BLOCK_STALE = "stale"
+# Resultado para itens aceitos (blocos: na cadeia principal, inclusive por reorganizacao)
+ACCEPTED = "accepted"
+# Blocos guardados fora da cadeia principal
+BLOCK_SIDE = "side"
+BLOCK_ORPHAN = "orphan"
+
+# Verificacao de hash/PoW em paralelo: abaixo de MIN blocos o custo de subir
+# processos nao compensa; cada tarefa do pool recebe CHUNK blocos
+PARALLEL_VALIDATION_MIN_BLOCKS = 1000
+VALIDATION_CHUNK_SIZE = 256
+# Os workers nascem de um processo limpo (forkserver/spawn): o no ja tem threads de
+# rede rodando, e um fork copiaria locks que elas podem estar segurando
+VALIDATION_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Pools de validacao do processo, por numero de workers: criados na primeira
+# cadeia longa e reaproveitados pelas seguintes
+_validation_pools: dict[int, ProcessPoolExecutor] = {}
+_validation_pools_lock = threading.Lock()
+
+
+def _validate_transaction_basic(transaction: Transaction) -> bool:
+    """Checagem simples: valor deve ser positivo e campos de endereco preenchidos."""
+    try:
+        return bool(transaction.valor > 0 and transaction.origem and transaction.destino)
+    except Exception:
+        return False
+
+
+def _is_valid_genesis(block: Block) -> bool:
+    return (
+        block.index == 0
+        and block.previous_hash == GENESIS_PREVIOUS_HASH
+        and block.hash == GENESIS_HASH
+        and block.timestamp == 0
+        and block.nonce == 0
+        and not block.transactions
+    )
+
+
+def _check_block_header(block: Block, previous: Block) -> bool:
+    """Encadeamento, hash e Proof of Work de um bloco em relacao ao anterior."""
+    return _check_block_link(block, previous.index, previous.hash)
+
+
+def _check_block_link(block: Block, previous_index: int, previous_hash: str) -> bool:
+    if block.index != previous_index + 1: # indice segue a ordem correta
+        return False
+    if block.previous_hash != previous_hash:
+        return False
+    if block.hash != block.calculate_hash():
+        return False
+    return block.is_valid_pow(DIFFICULTY_PREFIX)
+
+
+def _first_invalid_header(
+    blocks: list[Block], previous_index: int, previous_hash: str
+) -> int | None:
+    """Posicao do primeiro bloco com encadeamento, hash ou PoW invalido; None se todos validos.
+
+    So depende dos proprios blocos e do hash anterior, entao trechos da cadeia
+    podem ser verificados em processos separados.
+    """
+    for offset, block in enumerate(blocks):
+        if not _check_block_link(block, previous_index, previous_hash):
+            return offset
+        previous_index, previous_hash = block.index, block.hash
+    return None
+
+
+def _get_validation_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool compartilhado com `workers` processos."""
+    with _validation_pools_lock:
+        pool = _validation_pools.get(workers)
+        if pool is None:
+            pool = _validation_pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(VALIDATION_START_METHOD),
+            )
+        return pool
+
+
+def _discard_validation_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    with _validation_pools_lock:
+        if _validation_pools.get(workers) is pool:
+            del _validation_pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _count_valid_headers(
+    blocks: list[Block], previous: Block, workers: int, metrics: Metrics | None = None
+) -> int:
+    """Quantos blocos iniciais tem encadeamento, hash e PoW validos (em paralelo se valer a pena).
+
+    Os workers importam o modulo principal (forkserver/spawn): em script sem
+    `if __name__ == "__main__":` eles morrem ao subir. O pool quebrado e
+    descartado, a verificacao segue sequencial e a queda e contada em
+    lsd_validation_pool_failures_total.
+    """
+    if workers <= 1 or len(blocks) < PARALLEL_VALIDATION_MIN_BLOCKS:
+        bad = _first_invalid_header(blocks, previous.index, previous.hash)
+        return len(blocks) if bad is None else bad
+
+    pool = _get_validation_pool(workers)
+    starts = range(0, len(blocks), VALIDATION_CHUNK_SIZE)
+    futures = []
+    try:
+        for start in starts:
+            before = previous if start == 0 else blocks[start - 1]
+            futures.append(
+                pool.submit(
+                    _first_invalid_header,
+                    blocks[start:start + VALIDATION_CHUNK_SIZE],
+                    before.index,
+                    before.hash,
+                )
+            )
+        for start, future in zip(starts, futures):
+            bad = future.result()
+            if bad is not None:
+                return start + bad
+        return len(blocks)
+    except BrokenProcessPool:
+        # um worker morreu: o proximo pedido cria outro pool; este segue sequencial
+        _discard_validation_pool(workers, pool)
+        if metrics is not None:
+            metrics.inc("lsd_validation_pool_failures_total")
+        return _count_valid_headers(blocks, previous, 1)
+    finally:
+        # trechos ainda na fila nao interessam mais (bloco invalido encontrado antes)
+        for future in futures:
+            future.cancel()
+
+
+def _validate_block_transactions(
+    block: Block, balances: Mapping[str, float] | BalanceMap
+) -> dict[str, float] | None:
+    """Valida as transacoes de um bloco contra um mapa de saldos (que nao e alterado).
+
+    Retorna os saldos novos dos enderecos tocados pelo bloco, ou None se invalido.
+    """
+    if not block.transactions:
+        return None
+
+    first = block.transactions[0]
+    if first.origem != COINBASE_SENDER:
+        return None
+    if first.valor != COINBASE_REWARD:
+        return None
+    if first.timestamp != block.timestamp:
+        return None
+
+    changes: dict[str, float] = {}
+    for idx, tx in enumerate(block.transactions):
+        if not _validate_transaction_basic(tx):
+            return None
+        if idx == 0:
+            # a coinbase tambem e debitada, como em _apply_transaction: os saldos
+            # vindos do validador (carga do disco) ficam iguais aos incrementais
+            changes[tx.origem] = changes.get(tx.origem, balances.get(tx.origem, 0.0)) - tx.valor
+            changes[tx.destino] = changes.get(tx.destino, balances.get(tx.destino, 0.0)) + tx.valor
+            continue
+        if tx.origem == COINBASE_SENDER:
+            return None
+        sender_balance = changes.get(tx.origem, balances.get(tx.origem, 0.0))
+        if sender_balance < tx.valor:
+            return None
+        changes[tx.origem] = sender_balance - tx.valor
+        changes[tx.destino] = changes.get(tx.destino, balances.get(tx.destino, 0.0)) + tx.valor
+    return changes
+
+
+class ChainValidator:
+    """Valida blocos em sequencia carregando um unico estado de saldos.
+
+    Cada bloco e checado contra o anterior e contra os saldos acumulados ate ele,
+    sem recalcular prefixos: validar n blocos custa O(n).
+    """
+
+    def __init__(
+        self, previous: Block | None = None, balances: dict[str, float] | None = None
+    ) -> None:
+        self.previous = previous
+        self.balances: dict[str, float] = dict(balances) if balances else {}
+        # True quando todos os blocos ate `previous` passaram por este validador
+        self.from_genesis = previous is None
+
+    def feed(self, block: Block) -> bool:
+        """Valida o proximo bloco da sequencia e, se valido, incorpora-o ao estado."""
+        if self.previous is None:
+            if not _is_valid_genesis(block):
+                return False
+        else:
+            if not _check_block_header(block, self.previous):
+                return False
+            changes = _validate_block_transactions(block, self.balances)
+            if changes is None:
+                return False
+            self.balances.update(changes)
+        self.previous = block
+        return True
+
+    def feed_many(
+        self, blocks: list[Block], workers: int = 1, metrics: Metrics | None = None
+    ) -> int:
+        """Valida uma sequencia em dois estagios e retorna quantos blocos iniciais foram aceitos.
+
+        1. encadeamento, hash e PoW de todos os blocos, em paralelo por trechos
+        2. transacoes e saldos, em ordem, ate o primeiro bloco invalido
+        """
+        accepted = 0
+        if self.previous is None:
+            if not blocks or not self.feed(blocks[0]):
+                return 0
+            accepted = 1
+        rest = blocks[accepted:]
+        valid = _count_valid_headers(rest, self.previous, workers, metrics)
+        for block in islice(rest, valid):
+            changes = _validate_block_transactions(block, self.balances)
+            if changes is None:
+                break
+            self.balances.update(changes)
+            self.previous = block
+            accepted += 1
+        return accepted
+
+
+@dataclass(frozen=True)
+class ChainSnapshot:
+    """Visao imutavel e versionada da cadeia principal, da ponta e dos saldos confirmados.
+
+    A sequencia de blocos (lista ou StoredChain) e compartilhada com a
+    Blockchain: ela so cresce por append ou e trocada por outra, entao
+    (sequencia, tamanho) continua descrevendo a mesma cadeia. Os saldos sao
+    um BalanceView, que nunca muda depois de publicado.
+    """
+
+    version: int
+    _blocks: Sequence[Block]
+    length: int
+    _balances: BalanceView
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> Block:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("altura fora da cadeia")
+        return self._blocks[index]
+
+    def __iter__(self) -> Iterator[Block]:
+        return islice(self._blocks, self.length)
+
+    @property
+    def tip(self) -> Block:
+        return self._blocks[self.length - 1]
+
+    @property
+    def height(self) -> int:
+        return self.length - 1
+
+    @property
+    def balances(self) -> Mapping[str, float]:
+        return self._balances
+
+    def get_balance(self, address: str) -> float:
+        """Saldo confirmado nesta versao (sem as pendentes)."""
+        return self._balances.get(address, 0.0)
+
+    def blocks(self, start: int = 0, limit: int | None = None) -> list[Block]:
+        end = self.length if limit is None else min(self.length, start + max(0, limit))
+        return self._blocks[start:end]
+
 
 class Blockchain:
-    """Mantem a cadeia de blocos e o pool de transacoes pendentes."""
+    """Mantem a cadeia de blocos e o pool de transacoes pendentes.
+
+    Escritas (blocos, transacoes, troca de cadeia) sao serializadas por um
+    RLock; leitores usam snapshot(), que devolve a ultima ChainSnapshot
+    publicada sem bloquear.
+
+    Com compact=True as transacoes confirmadas ficam num TransactionColumns e
+    cada bloco da cadeia passa a referencia-las por um TransactionRange.
 
-    def __init__(self) -> None:
-        self.chain: list[Block] = [Block.create_genesis()]
-        self.pending_transactions: list[Transaction] = []
+    Blocos que nao estendem a ponta ficam em self.tree (ramos laterais e
+    orfaos); quando um ramo fica mais longo, a cadeia e reorganizada a partir
+    do ponto de bifurcacao.
+
+    Com validation_workers > 1, cadeias longas sao verificadas num pool de
+    processos iniciado por forkserver/spawn, que reimporta o modulo
+    principal: scripts que usam a Blockchain assim precisam do
+    `if __name__ == "__main__":`. Sem ele a validacao cai para sequencial
+    (lsd_validation_pool_failures_total).
+    """
+
+    def __init__(
+        self,
+        store: BlockStore | None = None,
+        snapshots: SnapshotStore | None = None,
+        snapshot_interval: int = 100,
+        validation_workers: int | None = None,
+        compact: bool = False,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.store = store
+        self.compact = compact
+        self.metrics = metrics or Metrics()
+        self._columns: TransactionColumns | None = None
+        # processos usados para verificar hashes/PoW ao validar cadeias longas
+        self.validation_workers = validation_workers or os.cpu_count() or 1
+        self.snapshots = snapshots
+        self.snapshot_interval = max(1, snapshot_interval)
+        self._snapshot_writer: ThreadPoolExecutor | None = None
+        # Saldos confirmados (cadeia); a variacao das pendentes fica no mempool
+        self._balances = BalanceMap()
+        # Indice de IDs confirmados: id -> altura do bloco
+        self._tx_heights: dict[str, int] | TransactionIndex = {}
+        # hash do bloco -> altura na cadeia principal (localizadores de sincronizacao)
+        self._block_heights: dict[str, int] = {}
+        # endereco -> (altura, posicao) das transacoes confirmadas e totais recebido/enviado
+        self._addresses = AddressIndex()
+        self.mempool = Mempool(self._confirmed_balance)
+        self.tree = BlockTree()
+        self._lock = threading.RLock()
+        self._version = 0
+        self._snapshot: ChainSnapshot
+        self.metrics.gauge("lsd_chain_height", lambda: self._snapshot.height)
+        self.metrics.gauge("lsd_mempool_transactions", lambda: len(self.mempool))
+        self.metrics.gauge("lsd_mempool_bytes", lambda: self.mempool.bytes)
+        self.metrics.gauge("lsd_side_blocks", lambda: self.tree.side_count)
+        self.metrics.gauge("lsd_orphan_blocks", lambda: self.tree.orphan_count)
+        self.chain = [Block.create_genesis()]
+        if store is not None:
+            self._load_from_store()
+            self._publish()
+
+    def _load_from_store(self) -> None:
+        """Carrega a cadeia do disco partindo do snapshot mais recente que confere com ela.
+
+        Com snapshot, saldos e indices vem dele e so os blocos posteriores sao
+        lidos, revalidados e reaplicados; os anteriores ficam no disco
+        (StoredChain). Sem snapshot, a cadeia inteira e lida e validada. O que
+        vier depois do primeiro bloco invalido e descartado.
+        """
+        snapshot = self._matching_snapshot()
+        if snapshot is None:
+            self._load_all_blocks()
+            return
+
+        height = int(snapshot["height"])
+        rest = self.store.load(height + 1)
+        validator = ChainValidator(self.store.read(height), snapshot["balances"])
+        rest = rest[:validator.feed_many(rest, self.validation_workers, self.metrics)]
+        self.store.truncate(height + 1 + len(rest))
+        self._chain = StoredChain(self.store, height + 1)
+        self._restore_indexes(snapshot["indexes"], validator.balances)
+        for block in rest:
+            self._chain.append(block)
+            self._apply_block(block, update_balances=False)
+        for tx_data in snapshot.get("pending_transactions", []):
+            self.add_transaction(Transaction.from_dict(tx_data))
+
+    def _load_all_blocks(self) -> None:
+        blocks = self.store.load()
+        validator = ChainValidator()
+        loaded = blocks[:validator.feed_many(blocks, self.validation_workers, self.metrics)]
+        self.store.truncate(len(loaded))
+        if not loaded:
+            self.store.append(self._chain[0])
+            return
+        self._chain = loaded
+        self._rebuild_indexes(balances=validator.balances)
+
+    def _matching_snapshot(self) -> dict[str, Any] | None:
+        """Snapshot mais recente (com indices) cuja ponta esta na cadeia guardada."""
+        if self.snapshots is None:
+            return None
+        for height in self.snapshots.heights():
+            if height >= len(self.store):
+                continue
+            snapshot = self.snapshots.load(height)
+            if (
+                snapshot is not None
+                and "indexes" in snapshot
+                and snapshot.get("tip_hash") == self.store.read(height).hash
+            ):
+                return snapshot
+        return None
+
+    def save_snapshot(self, wait: bool = True) -> None:
+        """Grava saldos, pendentes, indices e ponta atuais como snapshot.
+
+        Sob o lock so e tirada uma copia do estado (a versao publicada ja e
+        imutavel); a conversao para JSON e a escrita em disco rodam na thread
+        de snapshots, fora do lock. Com wait=False (snapshots periodicos) a
+        chamada nao espera a escrita terminar.
+        """
+        if self.snapshots is None:
+            return
+        with self._lock:
+            state = (
+                self._snapshot,
+                list(self.mempool),
+                dict(self._block_heights),
+                self._tx_heights.copy(),
+                self._addresses.copy(),
+            )
+            if self._snapshot_writer is None:
+                self._snapshot_writer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="lsd-snapshot"
+                )
+            # um unico worker: snapshots sao gravados na ordem em que foram tirados
+            future = self._snapshot_writer.submit(self._write_snapshot, *state)
+        if wait:
+            future.result()
+
+    def _write_snapshot(
+        self,
+        view: ChainSnapshot,
+        pending: list[Transaction],
+        block_heights: dict[str, int],
+        tx_heights: dict[str, int] | TransactionIndex,
+        addresses: AddressIndex,
+    ) -> None:
+        try:
+            self.snapshots.save(
+                {
+                    "height": view.height,
+                    "tip_hash": view.tip.hash,
+                    "balances": view._balances.to_dict(),
+                    "pending_transactions": [tx.to_dict() for tx in pending],
+                    # indices da cadeia ate a ponta: a carga nao precisa reler os blocos
+                    "indexes": {
+                        "blocks": block_heights,
+                        "transactions": (
+                            tx_heights.to_dict()
+                            if isinstance(tx_heights, TransactionIndex)
+                            else tx_heights
+                        ),
+                        "addresses": addresses.to_dict(),
+                    },
+                }
+            )
+        except OSError:
+            self.metrics.inc("lsd_snapshot_errors_total")
+            raise
+
+    def close(self) -> None:
+        """Espera os snapshots em andamento e encerra a thread que os grava."""
+        with self._lock:
+            writer, self._snapshot_writer = self._snapshot_writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    @property
+    def chain(self) -> Sequence[Block]:
+        return self._chain
+
+    @chain.setter
+    def chain(self, blocks: list[Block]) -> None:
+        with self._lock:
+            # lista propria: versoes publicadas nunca veem alteracoes feitas pelo chamador
+            self._chain = list(blocks)
+            self.tree.clear()
+            self._rebuild_indexes()
+            self._publish()
+
+    def snapshot(self) -> ChainSnapshot:
+        """Ultima versao publicada da cadeia; leitura sem lock."""
+        return self._snapshot
+
+    def _publish(self) -> None:
+        """Publica a cadeia atual como nova versao (chamado ao fim de cada escrita)."""
+        self._version += 1
+        # so os enderecos alterados desde a versao anterior viram uma camada nova
+        self._snapshot = ChainSnapshot(
+            self._version, self._chain, len(self._chain), self._balances.publish()
+        )
+
+    @property
+    def pending_transactions(self) -> list[Transaction]:
+        """Copia das pendentes em ordem de chegada (o pool em si e self.mempool)."""
+        return self.mempool.transactions()
+
+    @pending_transactions.setter
+    def pending_transactions(self, transactions: list[Transaction]) -> None:
+        with self._lock:
+            self.mempool.replace(transactions)
 
     @property
     def last_block(self) -> Block:
-        return self.chain[-1]
+        return self._snapshot.tip
 
     ## Funções do saldo 
     def get_balance(self, address: str) -> float:
-        """Calcula o saldo de um endereço percorrendo toda a cadeia e as transações pendentes."""
-
-        balance = 0.0
-        # Soma/Sub valores de todos os blocos já confirmados
-        for block in self.chain:
-            for tx in block.transactions:
-                if tx.destino == address:
-                    balance += tx.valor
-                if tx.origem == address:
-                    balance -= tx.valor
+        """Saldo confirmado mais a variacao das transacoes pendentes, em O(1)."""
         # Considera transacoes que estao na fila para evitar gasto duplo antes da mineracao
-        for tx in self.pending_transactions:
-            if tx.destino == address:
-                balance += tx.valor
-            if tx.origem == address:
-                balance -= tx.valor
-        return balance
-
-    def _get_chain_balances(self, target_chain: list[Block] | None = None) -> dict[str, float]:
-        """Gera um dicionario de saldos de todos os endereços de uma determinada corrente."""
-        if target_chain is None:
-            target_chain = self.chain
-                    
-        balances: dict[str, float] = defaultdict(float)
-        for block in target_chain:
-            for tx in block.transactions:
-                balances[tx.destino] += tx.valor
-                balances[tx.origem] -= tx.valor
-        return balances
+        return self._balances.get(address, 0.0) + self.mempool.delta(address)
+
+    def _confirmed_balance(self, address: str) -> float:
+        return self._balances.get(address, 0.0)
+
+    @staticmethod
+    def _apply_transaction(balances: BalanceMap, tx: Transaction, sign: float = 1.0) -> None:
+        """Aplica (sign=1) ou desfaz (sign=-1) o efeito de uma transacao num mapa de saldos."""
+        balances[tx.destino] = balances.get(tx.destino, 0.0) + sign * tx.valor
+        balances[tx.origem] = balances.get(tx.origem, 0.0) - sign * tx.valor
+
+    def _rebuild_indexes(self, balances: dict[str, float] | None = None) -> None:
+        """Recalcula os indices confirmados a partir da cadeia inteira.
+
+        Se os saldos ja forem conhecidos (validador), so os demais indices sao refeitos.
+        """
+        self._balances = BalanceMap(balances)
+        self._block_heights = {}
+        self._addresses = AddressIndex()
+        self._tx_heights = TransactionIndex() if self.compact else {}
+        if self.compact:
+            # armazenamento novo: o anterior segue valido para versoes ja publicadas
+            self._columns = TransactionColumns()
+        for block in self._chain:
+            self._apply_block(block, update_balances=balances is None)
+
+    def _restore_indexes(self, indexes: dict[str, Any], balances: dict[str, float]) -> None:
+        """Indices e saldos confirmados gravados num snapshot (ver save_snapshot)."""
+        self._balances = BalanceMap(balances)
+        self._block_heights = dict(indexes["blocks"])
+        self._addresses = AddressIndex.from_dict(indexes["addresses"])
+        if self.compact:
+            self._columns = TransactionColumns()
+            self._tx_heights = TransactionIndex.from_dict(indexes["transactions"])
+        else:
+            self._tx_heights = dict(indexes["transactions"])
+
+    def _apply_block(self, block: Block, update_balances: bool = True) -> None:
+        self._block_heights[block.hash] = block.index
+        for tx in block.transactions:
+            if update_balances:
+                self._apply_transaction(self._balances, tx)
+            self._tx_heights[tx.id] = block.index
+        self._addresses.add_block(block.index, block.transactions)
+        columns = self._columns
+        if columns is not None and not (
+            isinstance(block.transactions, TransactionRange)
+            and block.transactions.columns is columns
+        ):
+            block.transactions = columns.extend(block.transactions)
+
+    def _revert_block(self, block: Block) -> None:
+        self._block_heights.pop(block.hash, None)
+        for tx in reversed(block.transactions):
+            self._apply_transaction(self._balances, tx, sign=-1.0)
+            if self._tx_heights.get(tx.id) == block.index:
+                del self._tx_heights[tx.id]
+        self._addresses.remove_block(block.index, block.transactions)
 
     # funções pra gestão de transações
     def add_transaction(self, transaction: Transaction) -> bool:
         """Valida e add uma nova transacao ao pool de pendentes."""
+        with self._lock:
+            result = self._admit(transaction)
+        self.metrics.inc("lsd_transactions_total", result=result or ACCEPTED)
+        return result is None
+
+    def add_transactions(self, transactions: Iterable[Transaction]) -> list[str | None]:
+        """Admite um lote numa unica passada sobre o estado de saldos.
 
+        Cada transacao ve os saldos ja alterados pelas anteriores do lote, e os
+        limites do pool sao aplicados uma vez no fim. Retorna, na ordem de
+        entrada, None para as aceitas ou o motivo da rejeicao (REJECT_*).
+        """
+        transactions = list(transactions)
+        with self._lock:
+            results = [self._admit(tx, enforce_limits=False) for tx in transactions]
+            self.mempool.enforce_limits()
+            # ainda sob o lock: so os limites do pool tiraram itens desde a insercao
+            # (um bloco aplicado depois nao pode ser confundido com pool cheio)
+            results = [
+                REJECT_POOL_FULL if result is None and tx.id not in self.mempool else result
+                for tx, result in zip(transactions, results)
+            ]
+            counts: dict[str, int] = {}
+            for result in results:
+                counts[result or ACCEPTED] = counts.get(result or ACCEPTED, 0) + 1
+            for result, count in counts.items():
+                self.metrics.inc("lsd_transactions_total", count, result=result)
+        return results
+
+    def _admit(self, transaction: Transaction, enforce_limits: bool = True) -> str | None:
+        """Valida e insere no pool; retorna o motivo da rejeicao ou None se aceita."""
         if self._is_duplicate(transaction): ## msm id
-            return False
-        
+            return REJECT_DUPLICATE
+
         if not self._validate_transaction_basic(transaction):# verifica campos básicos ( valores positivos e existencia de enderecos)
-            return False
-        
+            return REJECT_INVALID
+
         if transaction.origem == COINBASE_SENDER: # só pode ser usado em transações de recompensa, não pode ser add diretamente no pool de pendentes
-            return False
-        
+            return REJECT_COINBASE
+
         if transaction.origem not in (COINBASE_SENDER, "genesis"):#Verifica se o remetente possui saldo suficiente (exceto no genesis)
             if self.get_balance(transaction.origem) < transaction.valor:
-                return False
-            
-        self.pending_transactions.append(transaction)
-        return True
+                return REJECT_BALANCE
+
+        if not self.mempool.add(transaction, enforce_limits=enforce_limits):
+            return REJECT_POOL_FULL
+        return None
 
     def _is_duplicate(self, transaction: Transaction) -> bool:
         """Verifica se o ID da transacao ja existe nos pendentes ou na blockchain confirmada."""
-        for tx in self.pending_transactions:
-            if tx.id == transaction.id:
-                return True
-        for block in self.chain:
-            for tx in block.transactions:
-                if tx.id == transaction.id:
-                    return True
-        return False
+        return transaction.id in self.mempool or transaction.id in self._tx_heights
+
+    def get_transaction(self, tx_id: str) -> Transaction | None:
+        """Busca uma transacao pelo ID (pendente ou confirmada) usando o indice de IDs."""
+        pending = self.mempool.get(tx_id)
+        if pending is not None:
+            return pending
+        height = self._tx_heights.get(tx_id)
+        view = self._snapshot
+        if height is None or height >= view.length:
+            return None
+        transactions = view[height].transactions
+        if isinstance(transactions, TransactionRange):
+            return transactions.find(tx_id)
+        for tx in transactions:
+            if tx.id == tx_id:
+                return tx
+        return None
+
+    def find_transaction(self, tx_id: str) -> tuple[Transaction, int | None] | None:
+        """Transacao pelo ID e altura do bloco que a confirmou (None se pendente)."""
+        pending = self.mempool.get(tx_id)
+        if pending is not None:
+            return pending, None
+        height = self._tx_heights.get(tx_id)
+        tx = self.get_transaction(tx_id) if height is not None else None
+        return None if tx is None else (tx, height)
+
+    def address_history(
+        self, address: str, offset: int = 0, limit: int = 50
+    ) -> list[tuple[int, Transaction]]:
+        """Transacoes confirmadas do endereco (altura, transacao), da mais recente a mais antiga.
+
+        O indice de enderecos guarda (altura, posicao) de cada uma, entao a
+        pagina [offset, offset + limit) custa `limit` leituras, qualquer que
+        seja o tamanho da cadeia.
+        """
+        view = self._snapshot
+        found: list[tuple[int, Transaction]] = []
+        for height, position in self._addresses.page(address, offset, limit):
+            transactions = view[height].transactions if height < view.length else ()
+            if position >= len(transactions):
+                # indice a frente da versao publicada (troca de cadeia em andamento)
+                continue
+            tx = transactions[position]
+            if tx.origem == address or tx.destino == address:
+                found.append((height, tx))
+        return found
+
+    def address_summary(self, address: str) -> AddressSummary:
+        """Quantidade de transacoes confirmadas e totais recebido/enviado do endereco."""
+        return self._addresses.summary(address)
+
+    def get_block(self, block_hash: str) -> Block | None:
+        """Busca um bloco da cadeia principal pelo hash."""
+        height = self._block_heights.get(block_hash)
+        view = self._snapshot
+        if height is None or height >= view.length:
+            return None
+        block = view[height]
+        # o indice pode estar a frente da versao publicada durante uma troca de cadeia
+        return block if block.hash == block_hash else None
+
+    def block_template(
+        self, max_count: int, max_bytes: int
+    ) -> tuple[ChainSnapshot, list[Transaction]]:
+        """Ponta atual e transacoes para o proximo bloco, lidas de forma consistente."""
+        with self._lock:
+            return self._snapshot, self.mempool.block_template(max_count, max_bytes)
 
     def _validate_transaction_basic(self, transaction: Transaction) -> bool:
         """Checagem simples: valor deve ser positivo e campos de endereco preenchidos."""
-        try:
-            return transaction.valor > 0 and transaction.origem and transaction.destino
-        except Exception:
-            return False
+        return _validate_transaction_basic(transaction)
 
     ## gestão de bloco 
     def add_block(self, block: Block) -> bool:
-        """Valida e anexa um novo bloco minerado a corrente oficial."""
-        if not self.is_valid_block(block):
+        """Valida e anexa um novo bloco; True se ele entrou na cadeia principal.
+
+        Blocos de outros ramos ficam guardados na arvore (ver process_block).
+        """
+        return self.process_block(block) == ACCEPTED
+
+    def process_block(self, block: Block) -> str:
+        """Encaixa um bloco na arvore e retorna o resultado.
+
+        - ACCEPTED: esta na cadeia principal (estendeu a ponta, ou seu ramo ficou
+          o mais longo, inclusive com orfaos que o seguiam)
+        - BLOCK_SIDE: guardado num ramo lateral que ainda nao e o mais longo
+        - BLOCK_ORPHAN: pai desconhecido; o bloco entra quando o pai chegar
+        - REJECT_*: invalido, repetido ou abaixo da profundidade guardada
+
+        Orfaos que esperavam pelo bloco sao processados em seguida.
+        """
+        with self._lock:
+            result = self._place_block(block)
+            self.metrics.inc("lsd_blocks_total", result=result)
+            if result in (ACCEPTED, BLOCK_SIDE):
+                self._connect_orphans([block.hash])
+            if result == BLOCK_SIDE and block.hash in self._block_heights:
+                return ACCEPTED
+            return result
+
+    def _connect_orphans(self, parents: list[str]) -> None:
+        """Processa os orfaos que esperavam pelos blocos dados (e, em cascata, os filhos deles)."""
+        while parents:
+            for orphan in self.tree.pop_orphans(parents.pop()):
+                placed = self._place_block(orphan)
+                self.metrics.inc("lsd_blocks_total", result=placed)
+                if placed in (ACCEPTED, BLOCK_SIDE):
+                    parents.append(orphan.hash)
+
+    def has_block(self, block_hash: str) -> bool:
+        """True se o bloco esta na cadeia principal, num ramo lateral ou entre os orfaos."""
+        return block_hash in self._block_heights or block_hash in self.tree
+
+    def _known_block(self, block_hash: str) -> Block | None:
+        height = self._block_heights.get(block_hash)
+        if height is not None:
+            return self._chain[height]
+        return self.tree.get(block_hash)
+
+    def _place_block(self, block: Block) -> str:
+        # um orfao repetido nao conta: pode chegar de novo quando o pai ja e conhecido
+        if block.hash in self._block_heights or self.tree.get(block.hash) is not None:
+            return REJECT_BLOCK_DUPLICATE
+        tip = self._chain[-1]
+        if block.previous_hash == tip.hash:
+            rejected = self._block_rejection(block)
+            if rejected is not None:
+                return rejected
+            self._extend(block)
+            return ACCEPTED
+
+        if block.index <= tip.index - self.tree.max_depth:
+            return REJECT_BLOCK_STALE
+        parent = self._known_block(block.previous_hash)
+        if parent is None:
+            # so hash e PoW: o encadeamento e conferido quando o pai chegar
+            if block.hash != block.calculate_hash() or not block.is_valid_pow(DIFFICULTY_PREFIX):
+                return REJECT_BLOCK_HEADER
+            self.tree.add_orphan(block)
+            return BLOCK_ORPHAN
+        if not _check_block_header(block, parent):
+            return REJECT_BLOCK_HEADER
+        self.tree.add_side(block)
+        if block.index <= tip.index:
+            return BLOCK_SIDE
+
+        fork_hash, branch = self.tree.branch(block.hash)
+        fork_height = self._block_heights.get(fork_hash)
+        if fork_height is None:
+            # a base do ramo ja foi podada: so a sincronizacao completa resolve
+            self.tree.remove(branch[0].hash)
+            return REJECT_BLOCK_STALE
+        if not self._reorganize(fork_height + 1, branch):
+            return REJECT_BLOCK_TRANSACTIONS
+        return ACCEPTED
+
+    def _extend(self, block: Block) -> None:
+        """Anexa a ponta um bloco ja validado."""
+        self._chain.append(block)
+        self._apply_block(block)
+        self.tree.discard([block])
+        self._publish()
+        self.mempool.remove(tx.id for tx in block.transactions)
+        # gastos pendentes que conflitam com o bloco (saldo ja consumido) saem do pool
+        self.mempool.settle({tx.origem for tx in block.transactions})
+        self.tree.prune(block.index)
+        if self.store is not None:
+            self.store.append(block)
+        if self.snapshots is not None and block.index % self.snapshot_interval == 0:
+            self.save_snapshot(wait=False)
+
+    def _reorganize(self, fork: int, branch: list[Block], validate: bool = True) -> bool:
+        """Troca os blocos da cadeia a partir da altura `fork` pelos do ramo dado.
+
+        Os saldos voltam ao ponto de bifurcacao e so as transacoes do ramo sao
+        validadas (validate=False: o ramo ja veio validado). Se um bloco for
+        invalido a cadeia anterior e restaurada e ele sai da arvore junto com
+        os descendentes.
+        """
+        if isinstance(self._chain, StoredChain):
+            # o disco a partir de `fork` vai ser reescrito; versoes publicadas leem da memoria
+            self._chain.detach(fork)
+        old = self._chain[fork:]
+        # o ramo e aplicado numa copia dos saldos: o original volta intacto se ele falhar
+        saved = self._balances
+        self._balances = saved.fork()
+        for block in reversed(old):
+            self._revert_block(block)
+        applied = 0
+        for block in branch:
+            if validate and _validate_block_transactions(block, self._balances) is None:
+                break
+            self._apply_block(block)
+            applied += 1
+        if applied < len(branch):
+            for block in reversed(branch[:applied]):
+                self._revert_block(block)
+            for block in old:
+                self._apply_block(block, update_balances=False)
+            self._balances = saved
+            self.tree.remove(branch[applied].hash)
             return False
 
-        included_ids = {tx.id for tx in block.transactions}
-        self.pending_transactions = [
-            tx for tx in self.pending_transactions if tx.id not in included_ids
-        ]
-        self.chain.append(block)
+        if isinstance(self._chain, StoredChain):
+            self._chain = self._chain.with_branch(fork, branch)
+        else:
+            self._chain = self._chain[:fork] + branch
+        self.tree.discard(branch)
+        for block in old:
+            self.tree.add_side(block)
+        self.tree.prune(branch[-1].index)
+        self._publish()
+        self._restore_transactions(old, branch)
+        if self.store is not None:
+            # no disco so o trecho depois da bifurcacao e reescrito
+            self.store.truncate(fork)
+            for block in branch:
+                self.store.append(block)
+        if old:
+            self.metrics.inc("lsd_reorgs_total")
+            self.metrics.inc("lsd_reorg_blocks_total", len(old))
+        if self.snapshots is not None and branch[-1].index % self.snapshot_interval == 0:
+            self.save_snapshot(wait=False)
         return True
 
+    def _restore_transactions(self, abandoned: list[Block], confirmed: list[Block]) -> None:
+        """Acerta o pool depois de uma troca de ramo.
+
+        Transacoes dos blocos abandonados que o novo ramo nao confirmou voltam
+        ao pool (menos as coinbase); as que o novo ramo confirmou saem dele.
+        """
+        touched: set[str] = set()
+        for block in abandoned:
+            for position, tx in enumerate(block.transactions):
+                touched.update((tx.origem, tx.destino))
+                if position and tx.id not in self._tx_heights:
+                    self.mempool.add(tx, enforce_limits=False)
+        self.mempool.enforce_limits()
+        for block in confirmed:
+            self.mempool.remove(tx.id for tx in block.transactions)
+            touched.update(tx.origem for tx in block.transactions)
+        # os saldos confirmados mudaram: gastos pendentes sem cobertura saem do pool
+        self.mempool.settle(touched)
+
     def is_valid_block(self, block: Block) -> bool:
         """Verifica se um bloco segue todas as regras de integridade e Proof of Work."""
-        if block.index != len(self.chain): # indice segue a ordem correta
-            return False
-        if block.previous_hash != self.last_block.hash:
-            return False
-        if block.hash != block.calculate_hash():
-            return False
-        if not block.is_valid_pow(DIFFICULTY_PREFIX):
-            return False
-        if not self._validate_block_transactions(block):
-            return False
-        return True
+        return self._block_rejection(block) is None
 
-    def _validate_block_transactions(self, block: Block, target_chain: list[Block] | None = None) -> bool:
-        """Valida a legalidade de todas as transacoes dentro de um bloco especifico."""
-        if not block.transactions:
-            return False
+    def _block_rejection(self, block: Block) -> str | None:
+        """Motivo pelo qual o bloco nao pode ser anexado a ponta atual, ou None se valido."""
+        if not _check_block_header(block, self.last_block):
+            return REJECT_BLOCK_HEADER
+        if _validate_block_transactions(block, self._balances) is None:
+            return REJECT_BLOCK_TRANSACTIONS
+        return None
 
-        first = block.transactions[0]
-        if first.origem != COINBASE_SENDER:
-            return False
-        if first.valor != COINBASE_REWARD:
-            return False
-        if first.timestamp != block.timestamp:
+    def is_valid_chain(self, chain: Sequence[Block]) -> bool:
+        """Valida uma blockchain completa (usado ao sincronizar com outros nós)."""
+        if not chain:
             return False
+        blocks = list(chain)
+        with self.metrics.timer("lsd_chain_validation_seconds"):
+            return ChainValidator().feed_many(blocks, self.validation_workers, self.metrics) == len(blocks)
 
-        balances = self._get_chain_balances(target_chain)
-        for idx, tx in enumerate(block.transactions):
-            if not self._validate_transaction_basic(tx):
-                return False
-            if idx == 0 and tx.origem == COINBASE_SENDER:
-                balances[tx.destino] += tx.valor
-                continue
-            if tx.origem == COINBASE_SENDER:
-                return False
-            if balances[tx.origem] < tx.valor:
-                return False
-            balances[tx.origem] -= tx.valor
-            balances[tx.destino] += tx.valor
-        return True
+    def replace_chain(
+        self,
+        new_chain: list[Block],
+        validator: ChainValidator | None = None,
+        start: int = 0,
+    ) -> bool:
+        """Implementa o consenso: a maior cadeia valida substitui a atual.
 
-    def is_valid_chain(self, chain: list[Block]) -> bool:
-        """Valida uma blockchain completa (usado ao sincronizar com outros nós)."""
-        if not chain:
+        So os blocos depois do ultimo em comum com a cadeia local sao
+        validados; o prefixo comum ja foi verificado quando entrou aqui.
+        `validator` pode ser um ChainValidator que ja consumiu new_chain inteira
+        desde o genesis (ex.: blocos validados enquanto chegavam pela rede).
+
+        Com start > 0, new_chain traz so os blocos a partir dessa altura (um
+        ramo) e o restante e o prefixo local ate start - 1, sem ser copiado.
+        """
+        with self._lock:
+            return self._replace_chain(new_chain, validator, start)
+
+    def _replace_chain(
+        self, new_chain: list[Block], validator: ChainValidator | None, start: int
+    ) -> bool:
+        if not new_chain or start < 0 or start + len(new_chain) <= len(self._chain):
             return False
-        genesis = chain[0]
-        if (
-            genesis.index != 0
-            or genesis.previous_hash != GENESIS_PREVIOUS_HASH
-            or genesis.hash != GENESIS_HASH
-            or genesis.timestamp != 0
-            or genesis.nonce != 0
-            or genesis.transactions
-        ):
+        fork = self._common_length(new_chain, start)
+        if fork == 0:
+            # o genesis e fixo: cadeia sem nenhum bloco em comum e invalida
             return False
-        for i in range(1, len(chain)):
-            current = chain[i]
-            previous = chain[i - 1]
-            if current.index != i:
-                return False
-            if current.previous_hash != previous.hash:
-                return False
-            if current.hash != current.calculate_hash():
-                return False
-            if not current.is_valid_pow(DIFFICULTY_PREFIX):
-                return False
-            if not self._validate_block_transactions(current, target_chain=chain[:i]):
+        prevalidated = (
+            start == 0
+            and validator is not None
+            and validator.from_genesis
+            and validator.previous is new_chain[-1]
+        )
+        branch = list(new_chain[fork - start:])
+        with self.metrics.timer("lsd_chain_validation_seconds"):
+            if not prevalidated:
+                valid = _count_valid_headers(
+                    branch, self._chain[fork - 1], self.validation_workers, self.metrics
+                )
+                if valid < len(branch):
+                    return False
+            if not self._reorganize(fork, branch, validate=not prevalidated):
                 return False
+        self._connect_orphans([block.hash for block in branch])
         return True
 
-    def replace_chain(self, new_chain: list[Block]) -> bool:
-        """Implementa o consenso: a maior cadeia valida substitui a atual."""
-        if len(new_chain) <= len(self.chain):
-            return False
-        if not self.is_valid_chain(new_chain):
-            return False
-        self.chain = new_chain
-        return True
+    def _common_length(self, chain: list[Block], start: int = 0) -> int:
+        """Quantos blocos iniciais a cadeia candidata (chain[0] na altura start) tem em comum com a local.
+
+        A busca vai da ponta para tras, entao uma bifurcacao recente custa
+        poucas comparacoes. Os blocos da candidata antes desse ponto nao sao
+        usados: a cadeia resultante mantem os blocos locais ja validados.
+        """
+        for height in range(min(start + len(chain), len(self._chain)) - 1, start - 1, -1):
+            if chain[height - start].hash == self._chain[height].hash:
+                return height + 1
+        if 0 < start <= len(self._chain) and chain[0].previous_hash == self._chain[start - 1].hash:
+            # o ramo sai logo depois do prefixo local
+            return start
+        return 0
+
+    ## sincronizacao incremental
+    def get_locator(self) -> list[str]:
+        """Hashes conhecidos da ponta para tras: os 10 ultimos e depois em passos dobrados ate o genesis."""
+        view = self._snapshot
+        locator: list[str] = []
+        height = view.height
+        step = 1
+        while height > 0:
+            locator.append(view[height].hash)
+            if len(locator) >= 10:
+                step *= 2
+            height -= step
+        locator.append(view[0].hash)
+        return locator
+
+    def find_common_height(self, locator: list[str]) -> int:
+        """Altura do primeiro hash do localizador presente na cadeia local (0 = genesis)."""
+        for block_hash in locator:
+            height = self._block_heights.get(block_hash)
+            if height is not None:
+                return height
+        return 0
+
+    def get_blocks(self, start: int, limit: int) -> list[Block]:
+        return self._snapshot.blocks(start, limit)
 
     def to_dict(self) -> dict[str, Any]:
         return {
-            "chain": [block.to_dict() for block in self.chain],
+            "chain": [block.to_dict() for block in self._snapshot],
             "pending_transactions": [tx.to_dict() for tx in self.pending_transactions],
         }
 
@@ -0,0 +1,128 @@
+"""Arvore de blocos fora da cadeia principal: ramos laterais e orfaos."""
+
+from __future__ import annotations
+
+from .block import Block
+
+# Profundidade maxima (blocos abaixo da ponta) de um ramo guardado em memoria;
+# bifurcacoes mais antigas so sao resolvidas pela sincronizacao (replace_chain)
+DEFAULT_MAX_DEPTH = 100
+DEFAULT_MAX_ORPHANS = 256
+
+
+class BlockTree:
+    """Blocos conhecidos que nao estao na cadeia principal, indexados por hash.
+
+    - laterais: o pai e conhecido (cadeia principal ou outro ramo) e o
+      cabecalho (encadeamento, hash, PoW) ja foi verificado; as transacoes so
+      sao validadas se o ramo ficar mais longo que a cadeia principal
+    - orfaos: o pai ainda nao chegou; ficam agrupados pelo hash do pai ate
+      ele aparecer, limitados a max_orphans (sai o mais antigo)
+
+    A cadeia principal continua na Blockchain; aqui so ficam os demais ramos.
+    """
+
+    def __init__(
+        self, max_depth: int = DEFAULT_MAX_DEPTH, max_orphans: int = DEFAULT_MAX_ORPHANS
+    ) -> None:
+        self.max_depth = max_depth
+        self.max_orphans = max_orphans
+        self._side: dict[str, Block] = {}
+        # hash do pai -> filhos laterais (para descartar ramos invalidos inteiros)
+        self._children: dict[str, dict[str, None]] = {}
+        self._orphans: dict[str, Block] = {}
+        self._orphans_by_parent: dict[str, dict[str, None]] = {}
+
+    def __contains__(self, block_hash: object) -> bool:
+        return block_hash in self._side or block_hash in self._orphans
+
+    @property
+    def side_count(self) -> int:
+        return len(self._side)
+
+    @property
+    def orphan_count(self) -> int:
+        return len(self._orphans)
+
+    def get(self, block_hash: str) -> Block | None:
+        """Bloco lateral pelo hash (orfaos nao contam: ainda nao estao ligados a arvore)."""
+        return self._side.get(block_hash)
+
+    def add_side(self, block: Block) -> None:
+        if block.hash in self._orphans:
+            self._drop_orphan(block.hash)
+        self._side[block.hash] = block
+        self._children.setdefault(block.previous_hash, {})[block.hash] = None
+
+    def add_orphan(self, block: Block) -> None:
+        self._orphans[block.hash] = block
+        self._orphans_by_parent.setdefault(block.previous_hash, {})[block.hash] = None
+        while len(self._orphans) > self.max_orphans:
+            self._drop_orphan(next(iter(self._orphans)))
+
+    def _drop_orphan(self, block_hash: str) -> None:
+        block = self._orphans.pop(block_hash)
+        waiting = self._orphans_by_parent[block.previous_hash]
+        del waiting[block_hash]
+        if not waiting:
+            del self._orphans_by_parent[block.previous_hash]
+
+    def pop_orphans(self, parent_hash: str) -> list[Block]:
+        """Retira os orfaos que esperavam pelo bloco parent_hash."""
+        waiting = self._orphans_by_parent.pop(parent_hash, {})
+        return [self._orphans.pop(block_hash) for block_hash in waiting]
+
+    def branch(self, block_hash: str) -> tuple[str, list[Block]]:
+        """Ramo lateral que termina em block_hash, do mais antigo ao mais novo.
+
+        Retorna tambem o hash do pai do primeiro bloco (o ponto de
+        bifurcacao, se estiver na cadeia principal).
+        """
+        blocks: list[Block] = []
+        block = self._side.get(block_hash)
+        while block is not None:
+            blocks.append(block)
+            block_hash = block.previous_hash
+            block = self._side.get(block_hash)
+        blocks.reverse()
+        return block_hash, blocks
+
+    def discard(self, blocks: list[Block]) -> None:
+        """Remove blocos (laterais ou orfaos) que passaram para a cadeia principal."""
+        for block in blocks:
+            if block.hash in self._orphans:
+                self._drop_orphan(block.hash)
+            if self._side.pop(block.hash, None) is None:
+                continue
+            siblings = self._children.get(block.previous_hash)
+            if siblings is not None:
+                siblings.pop(block.hash, None)
+                if not siblings:
+                    del self._children[block.previous_hash]
+
+    def remove(self, block_hash: str) -> int:
+        """Remove um bloco lateral e todos os seus descendentes (ramo invalido)."""
+        removed = 0
+        stack = [block_hash]
+        while stack:
+            current = stack.pop()
+            stack.extend(self._children.pop(current, ()))
+            block = self._side.get(current)
+            if block is not None:
+                self.discard([block])
+                removed += 1
+            for orphan in self.pop_orphans(current):
+                stack.append(orphan.hash)
+        return removed
+
+    def prune(self, tip_index: int) -> None:
+        """Descarta laterais e orfaos mais de max_depth blocos abaixo da ponta."""
+        floor = tip_index - self.max_depth
+        stale = [block for block in self._side.values() if block.index <= floor]
+        self.discard(stale)
+        for block_hash in [h for h, block in self._orphans.items() if block.index <= floor]:
+            self._drop_orphan(block_hash)
+
+    def clear(self) -> None:
+        self._side, self._children = {}, {}
+        self._orphans, self._orphans_by_parent = {}, {}
@@ -0,0 +1,215 @@
+"""Armazenamento colunar das transacoes confirmadas (modo compacto)."""
+
+from __future__ import annotations
+
+from array import array
+import re
+from typing import Any, Iterable, Iterator, Sequence, overload
+
+from .transaction import Transaction
+
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+_UUID_SIZE = 16
+
+
+def _format_uuid(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _is_uuid(tx_id: str) -> bool:
+    return len(tx_id) == 36 and _UUID_RE.fullmatch(tx_id) is not None
+
+
+def id_key(tx_id: str) -> int | str:
+    """Chave compacta de um ID: inteiro de 128 bits para UUIDs canonicos, senao o proprio ID."""
+    if _is_uuid(tx_id):
+        return int(tx_id.replace("-", ""), 16)
+    return tx_id
+
+
+class TransactionIndex:
+    """Indice ID de transacao -> altura do bloco com chaves compactas (ver id_key).
+
+    Mesma interface usada do dict (in, get, [] =, del); nao guarda as strings de ID.
+    """
+
+    __slots__ = ("_heights",)
+
+    def __init__(self) -> None:
+        self._heights: dict[int | str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._heights)
+
+    def __contains__(self, tx_id: object) -> bool:
+        return isinstance(tx_id, str) and id_key(tx_id) in self._heights
+
+    def get(self, tx_id: str, default: int | None = None) -> int | None:
+        return self._heights.get(id_key(tx_id), default)
+
+    def __setitem__(self, tx_id: str, height: int) -> None:
+        self._heights[id_key(tx_id)] = height
+
+    def __delitem__(self, tx_id: str) -> None:
+        del self._heights[id_key(tx_id)]
+
+    def copy(self) -> "TransactionIndex":
+        index = TransactionIndex()
+        index._heights = dict(self._heights)
+        return index
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            key if isinstance(key, str) else _format_uuid(key.to_bytes(_UUID_SIZE, "big")): height
+            for key, height in self._heights.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, int]) -> "TransactionIndex":
+        index = cls()
+        index._heights = {id_key(tx_id): height for tx_id, height in data.items()}
+        return index
+
+
+class TransactionColumns:
+    """Transacoes confirmadas guardadas por coluna, sem um objeto por transacao.
+
+    - IDs UUID em 16 bytes cada (IDs fora do formato ficam num dict a parte)
+    - origem/destino como indices numa tabela de enderecos
+    - valor e timestamp em arrays de double
+
+    So cresce (append/extend): linhas de blocos abandonados continuam la, e
+    versoes publicadas da cadeia podem seguir lendo seus blocos. Os objetos
+    Transaction sao recriados a cada acesso, via TransactionRange.
+    """
+
+    def __init__(self) -> None:
+        self._ids = bytearray()
+        self._other_ids: dict[int, str] = {}
+        self._addresses: list[str] = []
+        self._address_index: dict[str, int] = {}
+        self._origem = array("I")
+        self._destino = array("I")
+        self._valor = array("d")
+        self._timestamp = array("d")
+
+    def __len__(self) -> int:
+        return len(self._valor)
+
+    def _address(self, address: str) -> int:
+        index = self._address_index.get(address)
+        if index is None:
+            index = len(self._addresses)
+            self._addresses.append(address)
+            self._address_index[address] = index
+        return index
+
+    def append(self, tx: Transaction) -> int:
+        row = len(self._valor)
+        if _is_uuid(tx.id):
+            self._ids += bytes.fromhex(tx.id.replace("-", ""))
+        else:
+            self._ids += bytes(_UUID_SIZE)
+            self._other_ids[row] = tx.id
+        self._origem.append(self._address(tx.origem))
+        self._destino.append(self._address(tx.destino))
+        self._valor.append(tx.valor)
+        self._timestamp.append(tx.timestamp)
+        return row
+
+    def extend(self, transactions: Iterable[Transaction]) -> "TransactionRange":
+        """Guarda as transacoes e devolve a sequencia que as representa."""
+        start = len(self._valor)
+        for tx in transactions:
+            self.append(tx)
+        return TransactionRange(self, start, len(self._valor))
+
+    def id_at(self, row: int) -> str:
+        other = self._other_ids.get(row)
+        if other is not None:
+            return other
+        offset = row * _UUID_SIZE
+        return _format_uuid(self._ids[offset:offset + _UUID_SIZE])
+
+    def find(self, tx_id: str, start: int, stop: int) -> int | None:
+        """Linha com o ID dado entre [start, stop), sem recriar as transacoes."""
+        if not _is_uuid(tx_id):
+            rows = (row for row, other in self._other_ids.items() if other == tx_id)
+            return next((row for row in rows if start <= row < stop), None)
+        raw = bytes.fromhex(tx_id.replace("-", ""))
+        offset = self._ids.find(raw, start * _UUID_SIZE, stop * _UUID_SIZE)
+        while offset != -1:
+            row, misaligned = divmod(offset, _UUID_SIZE)
+            if not misaligned and row not in self._other_ids:
+                return row
+            offset = self._ids.find(raw, offset + 1, stop * _UUID_SIZE)
+        return None
+
+    def get(self, row: int) -> Transaction:
+        return Transaction(
+            origem=self._addresses[self._origem[row]],
+            destino=self._addresses[self._destino[row]],
+            valor=self._valor[row],
+            id=self.id_at(row),
+            timestamp=self._timestamp[row],
+        )
+
+    def nbytes(self) -> int:
+        """Bytes ocupados pelas colunas (sem a tabela de enderecos)."""
+        return (
+            len(self._ids)
+            + sum(column.itemsize * len(column) for column in (
+                self._origem, self._destino, self._valor, self._timestamp
+            ))
+        )
+
+
+class TransactionRange(Sequence[Transaction]):
+    """Transacoes de um bloco: as linhas [start, stop) de um TransactionColumns."""
+
+    __slots__ = ("columns", "start", "stop")
+
+    def __init__(self, columns: TransactionColumns, start: int, stop: int) -> None:
+        self.columns = columns
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @overload
+    def __getitem__(self, index: int) -> Transaction: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Transaction]: ...
+
+    def __getitem__(self, index: int | slice) -> Transaction | list[Transaction]:
+        if isinstance(index, slice):
+            return [self.columns.get(self.start + i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("indice de transacao fora do bloco")
+        return self.columns.get(self.start + index)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        get = self.columns.get
+        for row in range(self.start, self.stop):
+            yield get(row)
+
+    def find(self, tx_id: str) -> Transaction | None:
+        row = self.columns.find(tx_id, self.start, self.stop)
+        return None if row is None else self.columns.get(row)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TransactionRange, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TransactionRange({list(self)!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # enviado a outro processo (validacao paralela) como lista simples
+        return list, (list(self),)
@@ -0,0 +1,209 @@
+"""Pool de transacoes pendentes (mempool) com limites e templates de bloco."""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from .transaction import Transaction
+
+DEFAULT_MAX_COUNT = 50000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Bytes de uma transacao em JSON alem dos campos de texto (chaves, numeros, pontuacao)
+TX_BASE_SIZE = 96
+# Remetentes aceitos no pool sem checagem de saldo (ver Blockchain.add_transaction)
+UNCHECKED_SENDERS = frozenset({"genesis"})
+# Tolerancia de ponto flutuante ao detectar saldo pendente negativo
+BALANCE_EPSILON = 1e-9
+
+
+def estimate_size(tx: Transaction) -> int:
+    """Tamanho aproximado da transacao serializada, usado nos limites de bytes."""
+    return TX_BASE_SIZE + len(tx.id) + len(tx.origem) + len(tx.destino)
+
+
+class Mempool:
+    """Transacoes pendentes em ordem de chegada, indexadas por ID.
+
+    - variacao de saldo e gasto pendente por endereco, mantidos a cada entrada/saida
+    - limites de quantidade e de bytes: ao exceder, saem as transacoes mais
+      antigas e, em cascata, os gastos pendentes que dependiam delas
+    - remocao de k transacoes em O(k) (dict ordenado, sem reconstruir listas)
+    - block_template() monta a lista de transacoes de um bloco limitada em
+      quantidade e bytes
+
+    A validacao de entrada (saldo, duplicidade) e feita pela Blockchain; o
+    pool so recebe o saldo confirmado de cada endereco para as cascatas.
+    """
+
+    def __init__(
+        self,
+        confirmed_balance: Callable[[str], float],
+        max_count: int = DEFAULT_MAX_COUNT,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._confirmed_balance = confirmed_balance
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self._txs: dict[str, Transaction] = {}
+        self._sizes: dict[str, int] = {}
+        # remetente -> IDs pendentes em ordem de chegada
+        self._by_sender: dict[str, dict[str, None]] = {}
+        self._deltas: dict[str, float] = {}
+        self._spend: dict[str, float] = {}
+        self.bytes = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._txs)
+
+    def __contains__(self, tx_id: object) -> bool:
+        return tx_id in self._txs
+
+    def __iter__(self) -> Iterator[Transaction]:
+        return iter(list(self._txs.values()))
+
+    def get(self, tx_id: str) -> Transaction | None:
+        return self._txs.get(tx_id)
+
+    def transactions(self) -> list[Transaction]:
+        return list(self._txs.values())
+
+    def page(self, offset: int, limit: int) -> list[Transaction]:
+        """Transacoes [offset, offset + limit) em ordem de chegada, sem copiar o pool."""
+        return list(islice(self._txs.values(), offset, offset + limit))
+
+    def senders(self) -> list[str]:
+        return list(self._by_sender)
+
+    def delta(self, address: str) -> float:
+        """Variacao liquida de saldo do endereco causada pelas pendentes."""
+        return self._deltas.get(address, 0.0)
+
+    def pending_spend(self, address: str) -> float:
+        """Total que o endereco envia em transacoes pendentes."""
+        return self._spend.get(address, 0.0)
+
+    def _insert(self, tx: Transaction) -> None:
+        size = estimate_size(tx)
+        self._txs[tx.id] = tx
+        self._sizes[tx.id] = size
+        self.bytes += size
+        self._by_sender.setdefault(tx.origem, {})[tx.id] = None
+        self._spend[tx.origem] = self._spend.get(tx.origem, 0.0) + tx.valor
+        self._deltas[tx.origem] = self._deltas.get(tx.origem, 0.0) - tx.valor
+        self._deltas[tx.destino] = self._deltas.get(tx.destino, 0.0) + tx.valor
+
+    def _discard(self, tx_id: str) -> Transaction | None:
+        tx = self._txs.pop(tx_id, None)
+        if tx is None:
+            return None
+        self.bytes -= self._sizes.pop(tx_id)
+        own = self._by_sender[tx.origem]
+        del own[tx_id]
+        if own:
+            self._spend[tx.origem] -= tx.valor
+        else:
+            del self._by_sender[tx.origem]
+            del self._spend[tx.origem]
+        self._deltas[tx.origem] = self._deltas.get(tx.origem, 0.0) + tx.valor
+        self._deltas[tx.destino] = self._deltas.get(tx.destino, 0.0) - tx.valor
+        if not self._txs:
+            # zera residuos de ponto flutuante quando o pool esvazia
+            self._deltas = {}
+            self.bytes = 0
+        return tx
+
+    def add(self, tx: Transaction, enforce_limits: bool = True) -> bool:
+        """Insere uma transacao ja validada; False se duplicada ou se nao coube no pool.
+
+        Com enforce_limits=False (lotes) o chamador aplica enforce_limits() no fim.
+        """
+        if tx.id in self._txs:
+            return False
+        self._insert(tx)
+        if enforce_limits:
+            self.enforce_limits()
+        return tx.id in self._txs
+
+    def replace(self, transactions: Iterable[Transaction]) -> None:
+        """Troca todo o conteudo do pool (sincronizacao com um peer)."""
+        self._txs, self._sizes, self._by_sender = {}, {}, {}
+        self._deltas, self._spend = {}, {}
+        self.bytes = 0
+        for tx in transactions:
+            if tx.id not in self._txs:
+                self._insert(tx)
+        self.enforce_limits()
+
+    def remove(self, tx_ids: Iterable[str]) -> list[Transaction]:
+        """Remove as transacoes com os IDs dados (ex.: incluidas num bloco) em O(k)."""
+        removed: list[Transaction] = []
+        for tx_id in tx_ids:
+            tx = self._discard(tx_id)
+            if tx is not None:
+                removed.append(tx)
+        return removed
+
+    def enforce_limits(self) -> None:
+        while self._txs and (len(self._txs) > self.max_count or self.bytes > self.max_bytes):
+            self._evict(next(iter(self._txs)))
+
+    def _evict(self, tx_id: str) -> None:
+        tx = self._discard(tx_id)
+        if tx is None:
+            return
+        self.evicted += 1
+        # o destino perdeu um credito pendente: seus gastos podem ter ficado sem saldo
+        self.settle([tx.destino])
+
+    def settle(self, addresses: Iterable[str]) -> int:
+        """Retira os gastos pendentes mais recentes de enderecos com saldo final negativo.
+
+        Chamado apos evictions e quando a cadeia muda (blocos com gastos
+        conflitantes). Retorna quantas transacoes sairam, incluindo a cascata.
+        """
+        before = self.evicted
+        stack = list(addresses)
+        while stack:
+            address = stack.pop()
+            if address in UNCHECKED_SENDERS:
+                continue
+            own = self._by_sender.get(address)
+            while own and self._confirmed_balance(address) + self.delta(address) < -BALANCE_EPSILON:
+                tx = self._discard(next(reversed(own)))
+                self.evicted += 1
+                stack.append(tx.destino)
+                own = self._by_sender.get(address)
+        return self.evicted - before
+
+    def block_template(self, max_count: int, max_bytes: int) -> list[Transaction]:
+        """Transacoes para o proximo bloco, em ordem de chegada, dentro dos limites.
+
+        Cada transacao escolhida e conferida contra o saldo confirmado mais as ja
+        escolhidas (as mesmas regras da validacao de bloco), entao o template e
+        sempre valido mesmo que o pool tenha transacoes que dependem de outras
+        deixadas de fora.
+        """
+        selected: list[Transaction] = []
+        balances: dict[str, float] = {}
+        used = 0
+        for tx in self._txs.values():
+            if len(selected) >= max_count:
+                break
+            size = self._sizes[tx.id]
+            if used + size > max_bytes:
+                break
+            sender = balances.get(tx.origem)
+            if sender is None:
+                sender = self._confirmed_balance(tx.origem)
+            if sender < tx.valor:
+                continue
+            balances[tx.origem] = sender - tx.valor
+            recipient = balances.get(tx.destino)
+            if recipient is None:
+                recipient = self._confirmed_balance(tx.destino)
+            balances[tx.destino] = recipient + tx.valor
+            selected.append(tx)
+            used += size
+        return selected
@@ -0,0 +1,218 @@
+"""Metricas de execucao: contadores, gauges e histogramas de latencia."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+# Limites superiores (segundos) dos buckets de latencia
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, Any]) -> _Labels:
+    # caminho rapido para o caso comum (nenhum ou um rotulo): chamado a cada evento
+    if not labels:
+        return ()
+    if len(labels) == 1:
+        ((key, value),) = labels.items()
+        return ((key, value if type(value) is str else str(value)),)
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _label_text(labels: _Labels) -> str:
+    """Rotulos no formato Prometheus: {a="1",b="2"} (vazio sem rotulos)."""
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        position = bisect_left(self.buckets, value)
+        if position < len(self.counts):
+            self.counts[position] += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((float("inf"), self.count))
+        return result
+
+
+class Metrics:
+    """Registro de metricas de um no, seguro entre threads.
+
+    - inc(): contadores (so crescem), com rotulos opcionais
+    - set()/gauge(): valores instantaneos; gauge() registra uma funcao lida
+      so na hora da consulta (tamanho do mempool, peers, filas)
+    - observe()/timer(): histogramas de latencia em segundos
+
+    snapshot() devolve tudo como dict (mensagem STATS) e render_prometheus()
+    no formato texto do Prometheus.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[_Labels, float]] = {}
+        self._gauges: dict[str, dict[_Labels, float]] = {}
+        self._callbacks: dict[str, Callable[[], float]] = {}
+        self._histograms: dict[str, dict[_Labels, _Histogram]] = {}
+        self._help: dict[str, str] = {}
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.get(name)
+            if series is None:
+                series = self._counters[name] = {}
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        with self._lock:
+            self._callbacks[name] = read
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name: str, **labels: Any) -> float:
+        """Valor atual de um contador ou gauge (0 se nunca registrado)."""
+        key = _labels(labels)
+        with self._lock:
+            for series in (self._counters, self._gauges):
+                if name in series and key in series[name]:
+                    return series[name][key]
+            read = self._callbacks.get(name) if not labels else None
+        return float(read()) if read is not None else 0.0
+
+    def _read_callbacks(self) -> dict[str, float]:
+        with self._lock:
+            callbacks = list(self._callbacks.items())
+        values: dict[str, float] = {}
+        for name, read in callbacks:
+            try:
+                values[name] = float(read())
+            except Exception:
+                continue
+        return values
+
+    def snapshot(self) -> dict[str, Any]:
+        """Todas as series como dict serializavel (chave da serie: rotulos "a=1,b=2")."""
+        polled = self._read_callbacks()
+        with self._lock:
+            counters = {
+                name: {_flat(key): value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            gauges = {
+                name: {_flat(key): value for key, value in series.items()}
+                for name, series in self._gauges.items()
+            }
+            histograms = {
+                name: {
+                    _flat(key): {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": [
+                            [_number(bound), count] for bound, count in histogram.cumulative()
+                        ],
+                    }
+                    for key, histogram in series.items()
+                }
+                for name, series in self._histograms.items()
+            }
+        for name, value in polled.items():
+            gauges.setdefault(name, {})[""] = value
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def render_prometheus(self) -> str:
+        """Exposicao no formato texto do Prometheus (versao 0.0.4)."""
+        polled = self._read_callbacks()
+        lines: list[str] = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name in sorted(self._counters):
+                header(name, "counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_label_text(key)} {_number(value)}")
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            histograms = {
+                name: [(key, histogram.cumulative(), histogram.sum, histogram.count)
+                       for key, histogram in sorted(series.items())]
+                for name, series in self._histograms.items()
+            }
+        for name, value in polled.items():
+            gauges.setdefault(name, {})[()] = value
+        for name in sorted(gauges):
+            header(name, "gauge")
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f"{name}{_label_text(key)} {_number(value)}")
+        for name in sorted(histograms):
+            header(name, "histogram")
+            for key, buckets, total, count in histograms[name]:
+                for bound, cumulative in buckets:
+                    bucket_key = key + (("le", _number(bound)),)
+                    lines.append(f"{name}_bucket{_label_text(bucket_key)} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(key)} {_number(total)}")
+                lines.append(f"{name}_count{_label_text(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _flat(labels: _Labels) -> str:
+    return ",".join(f"{key}={value}" for key, value in labels)
@@ -2,29 +2,165 @@
 
 from __future__ import annotations
 
+import multiprocessing
+import queue
+import threading
 import time
-from typing import Callable
+from typing import Any, Callable
 
-from .block import Block
-from .blockchain import Blockchain, COINBASE_REWARD, COINBASE_SENDER, DIFFICULTY_PREFIX
+from .block import Block, BlockHashTemplate
+from .blockchain import (
+    COINBASE_REWARD,
+    COINBASE_SENDER,
+    DIFFICULTY_PREFIX,
+    VALIDATION_START_METHOD,
+    Blockchain,
+)
 from .transaction import Transaction
 
+PROGRESS_INTERVAL = 10000
+# Quantos nonces cada worker testa entre checagens do sinal de parada
+CANCEL_CHECK_INTERVAL = 1000
+# Limites do template de bloco (transacoes alem da coinbase)
+MAX_BLOCK_TRANSACTIONS = 2000
+MAX_BLOCK_BYTES = 1024 * 1024
+# Mineracao continua: novas pendentes que fazem o template ser refeito e
+# intervalo minimo (segundos) depois de cada bloco achado
+REFRESH_TRANSACTIONS = 50
+BLOCK_INTERVAL = 1.0
+
+# Resultado de cada busca (metricas)
+MINING_FOUND = "found"
+MINING_STOPPED = "stopped"
+MINING_STALE = "stale"
+
+
+def _search_worker(jobs: Any, results: Any, current: Any, counter: Any) -> None:
+    """Processo de busca: atende templates ate receber None.
+
+    Cada job (numero, bloco, inicio, passo) testa os nonces inicio,
+    inicio+passo, ... ate achar um valido ou ate `current` deixar de ser o
+    numero do job (achado por outro worker, template velho, parada).
+    """
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, block_data, start, step = job
+        template = BlockHashTemplate(Block.from_dict(block_data))
+        nonce = start
+        checked = 0
+        while True:
+            digest = template.hash_for(nonce)
+            if digest.startswith(DIFFICULTY_PREFIX):
+                results.put((job_id, nonce, digest))
+                break
+            nonce += step
+            checked += 1
+            if checked % CANCEL_CHECK_INTERVAL == 0:
+                with counter.get_lock():
+                    counter.value += CANCEL_CHECK_INTERVAL
+                if current.value != job_id:
+                    break
+
+
+class _SearchWorkers:
+    """Processos de busca de nonce que ficam vivos entre blocos.
+
+    Nascem de um processo limpo (VALIDATION_START_METHOD, como os workers de
+    validacao: o no ja tem threads de rede e de mineracao rodando) e cada
+    busca so envia o template novo. O worker i testa i, i+n, i+2n, ...
+    """
+
+    def __init__(self, count: int) -> None:
+        context = multiprocessing.get_context(VALIDATION_START_METHOD)
+        # numero do job em andamento; 0 = nenhum (workers ociosos)
+        self.current = context.Value("q", 0)
+        self.counter = context.Value("q", 0)
+        self.results = context.Queue()
+        self._last_job = 0
+        self._jobs = [context.SimpleQueue() for _ in range(count)]
+        self._processes = [
+            context.Process(
+                target=_search_worker,
+                args=(jobs, self.results, self.current, self.counter),
+                daemon=True,
+            )
+            for jobs in self._jobs
+        ]
+        for process in self._processes:
+            process.start()
+
+    def alive(self) -> bool:
+        return all(process.is_alive() for process in self._processes)
+
+    def submit(self, block_data: dict[str, Any]) -> int:
+        """Troca o template de todos os workers; retorna o numero do job."""
+        self._last_job += 1
+        job_id = self.current.value = self._last_job
+        step = len(self._jobs)
+        for start, jobs in enumerate(self._jobs):
+            jobs.put((job_id, block_data, start, step))
+        return job_id
+
+    def cancel(self) -> None:
+        """Interrompe o job atual; os workers voltam a esperar o proximo."""
+        self.current.value = 0
+
+    def close(self) -> None:
+        self.cancel()
+        for jobs in self._jobs:
+            jobs.put(None)
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.results.close()
+
 
 class Miner:
-    """Minerador que procura um nonce com hash iniciando em '000'."""
+    """Minerador que procura um nonce com hash iniciando em '000'.
+
+    Com workers > 1 o espaco de nonces e dividido entre processos
+    (worker i testa i, i+workers, i+2*workers, ...). Os processos sobem na
+    primeira busca e atendem as seguintes; close() os encerra. Como nascem
+    por forkserver/spawn, scripts que minerem em paralelo precisam do
+    `if __name__ == "__main__":` (os filhos importam o modulo principal).
+
+    Cada execucao registra nas metricas da blockchain os hashes testados e a
+    taxa de hash (lsd_miner_hashes_total, lsd_miner_hash_rate).
 
-    def __init__(self, blockchain: Blockchain, miner_address: str) -> None:
+    should_restart(bloco) e consultado durante a busca; se devolver True o
+    template ficou velho (nova ponta, novas pendentes) e mine_block retorna
+    None para o chamador montar outro.
+    """
+
+    def __init__(self, blockchain: Blockchain, miner_address: str, workers: int = 1) -> None:
         self.blockchain = blockchain
         self.miner_address = miner_address
+        self.workers = max(1, workers)
         self._mining = False
+        self._search: _SearchWorkers | None = None
+        # uma busca paralela por vez; close() espera a atual terminar
+        self._search_lock = threading.Lock()
+
+    def _record(self, hashes: int, elapsed: float, result: str) -> None:
+        metrics = self.blockchain.metrics
+        metrics.inc("lsd_miner_hashes_total", hashes)
+        metrics.inc("lsd_miner_runs_total", result=result)
+        if elapsed > 0:
+            metrics.set("lsd_miner_hash_rate", hashes / elapsed)
 
     def mine_block(
         self,
         transactions: list[Transaction] | None = None,
         on_progress: Callable[[int], None] | None = None,
+        should_restart: Callable[[Block], bool] | None = None,
     ) -> Block | None:
+        view, template = self.blockchain.block_template(MAX_BLOCK_TRANSACTIONS, MAX_BLOCK_BYTES)
         if transactions is None:
-            transactions = list(self.blockchain.pending_transactions)
+            transactions = template
 
         block_timestamp = time.time()
         reward_tx = Transaction(
@@ -36,23 +172,201 @@ class Miner:
         block_transactions = [reward_tx] + transactions
 
         block = Block(
-            index=len(self.blockchain.chain),
-            previous_hash=self.blockchain.last_block.hash,
+            index=view.length,
+            previous_hash=view.tip.hash,
             transactions=block_transactions,
             nonce=0,
             timestamp=block_timestamp,
         )
 
         self._mining = True
+        if self.workers > 1:
+            with self._search_lock:
+                return self._mine_parallel(block, on_progress, should_restart)
+        return self._mine_sequential(block, on_progress, should_restart)
+
+    def _mine_sequential(
+        self,
+        block: Block,
+        on_progress: Callable[[int], None] | None,
+        should_restart: Callable[[Block], bool] | None = None,
+    ) -> Block | None:
+        started = time.perf_counter()
+        template = BlockHashTemplate(block)
+        nonce = 0
+        outcome = MINING_STOPPED
         while self._mining:
-            block.hash = block.calculate_hash()
-            if block.is_valid_pow(DIFFICULTY_PREFIX):
+            digest = template.hash_for(nonce)
+            if digest.startswith(DIFFICULTY_PREFIX):
                 self._mining = False
+                block.nonce, block.hash = nonce, digest
+                self._record(nonce + 1, time.perf_counter() - started, MINING_FOUND)
                 return block
-            block.nonce += 1
-            if on_progress and block.nonce % 10000 == 0:
-                on_progress(block.nonce)
+            nonce += 1
+            if on_progress and nonce % PROGRESS_INTERVAL == 0:
+                on_progress(nonce)
+            if should_restart and nonce % CANCEL_CHECK_INTERVAL == 0 and should_restart(block):
+                outcome = MINING_STALE
+                break
+        self._mining = False
+        self._record(nonce, time.perf_counter() - started, outcome)
         return None
 
+    def _search_workers(self) -> _SearchWorkers:
+        search = self._search
+        if search is None or not search.alive():
+            if search is not None:
+                search.close()
+            search = self._search = _SearchWorkers(self.workers)
+        return search
+
+    def _mine_parallel(
+        self,
+        block: Block,
+        on_progress: Callable[[int], None] | None,
+        should_restart: Callable[[Block], bool] | None = None,
+    ) -> Block | None:
+        started = time.perf_counter()
+        search = self._search_workers()
+        counted = search.counter.value
+        job_id = search.submit(block.to_dict())
+
+        reported = 0
+        winner: tuple[int, str] | None = None
+        outcome = MINING_STOPPED
+        broken = False
+        try:
+            while self._mining:
+                try:
+                    found_job, nonce, digest = search.results.get(timeout=0.05)
+                    if found_job != job_id:
+                        # nonce de um template anterior, achado antes do cancelamento
+                        continue
+                    winner = (nonce, digest)
+                    outcome = MINING_FOUND
+                    break
+                except queue.Empty:
+                    pass
+                if not search.alive():
+                    # worker morreu (ex.: script sem `if __name__ == "__main__":`)
+                    broken = True
+                    break
+                if should_restart and should_restart(block):
+                    outcome = MINING_STALE
+                    break
+                if on_progress:
+                    attempts = search.counter.value - counted
+                    if attempts - reported >= PROGRESS_INTERVAL:
+                        reported = attempts - attempts % PROGRESS_INTERVAL
+                        on_progress(reported)
+        finally:
+            # Primeiro nonce valido vence: os demais workers largam o template
+            search.cancel()
+            self._mining = False
+            # o contador dos workers avanca em passos de CANCEL_CHECK_INTERVAL
+            self._record(
+                search.counter.value - counted, time.perf_counter() - started, outcome
+            )
+
+        if broken:
+            self.blockchain.metrics.inc("lsd_miner_worker_failures_total")
+            self._search = None
+            search.close()
+            # esta busca segue num unico processo; a proxima sobe workers novos
+            self._mining = True
+            return self._mine_sequential(block, on_progress, should_restart)
+        if winner is None:
+            return None
+        block.nonce, block.hash = winner
+        return block
+
     def stop(self) -> None:
         self._mining = False
+
+    def close(self) -> None:
+        """Para a busca e encerra os processos de mineracao paralela."""
+        self.stop()
+        with self._search_lock:
+            search, self._search = self._search, None
+        if search is not None:
+            search.close()
+
+
+class MiningService:
+    """Mineracao continua em thread propria, enquanto o no atende a rede.
+
+    Cada busca parte de um template novo (ponta + pendentes) e e abandonada
+    assim que fica velha: a ponta mudou (bloco de outro no, reorganizacao) ou
+    entraram refresh_transactions novas pendentes que ainda cabem no bloco.
+    O recomeco e imediato, sobre o pai novo. Blocos achados vao para
+    on_block (ex.: Node.broadcast_block); block_interval espaca os blocos
+    proprios, ja que com a dificuldade fixa a busca leva milissegundos.
+    """
+
+    def __init__(
+        self,
+        miner: Miner,
+        on_block: Callable[[Block], Any],
+        refresh_transactions: int = REFRESH_TRANSACTIONS,
+        block_interval: float = BLOCK_INTERVAL,
+    ) -> None:
+        self.miner = miner
+        self.on_block = on_block
+        self.refresh_transactions = max(1, refresh_transactions)
+        self.block_interval = max(0.0, block_interval)
+        self.blocks_found = 0
+        self._running = False
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        # tamanho do mempool quando o template atual foi montado
+        self._pending_at_start = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Inicia a thread de mineracao; False se ja estava rodando."""
+        if self.running:
+            return False
+        self._running = True
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name="mining", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._running = False
+        self._wake.set()
+        self.miner.stop()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def _should_restart(self, block: Block) -> bool:
+        if not self._running:
+            return True
+        blockchain = self.miner.blockchain
+        if blockchain.snapshot().tip.hash != block.previous_hash:
+            return True
+        if len(block.transactions) - 1 >= MAX_BLOCK_TRANSACTIONS:
+            # bloco ja cheio: novas pendentes nao mudariam o template
+            return False
+        return len(blockchain.mempool) - self._pending_at_start >= self.refresh_transactions
+
+    def _run(self) -> None:
+        metrics = self.miner.blockchain.metrics
+        while self._running:
+            self._pending_at_start = len(self.miner.blockchain.mempool)
+            block = self.miner.mine_block(should_restart=self._should_restart)
+            if block is None or not self._running:
+                continue
+            try:
+                self.on_block(block)
+            except Exception:
+                metrics.inc("lsd_miner_errors_total")
+                continue
+            self.blocks_found += 1
+            # stop() acorda a espera na hora
+            self._wake.wait(self.block_interval)
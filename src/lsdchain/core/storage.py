@@ -0,0 +1,273 @@
+"""Armazenamento persistente de blocos (append-only) em disco."""
+
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator, Sequence, overload
+import json
+import mmap
+import os
+import threading
+
+from .block import Block
+
+RECORD_HEADER_SIZE = 4
+OFFSET_SIZE = 8
+
+
+class BlockStore:
+    """Guarda a cadeia em um arquivo de segmento append-only com indice por altura.
+
+    - blocks.dat: registros [4 bytes tamanho big-endian][JSON do bloco]
+    - blocks.idx: offset (8 bytes big-endian) do registro de cada altura,
+      lido via mmap na abertura
+
+    Escritas parciais (queda no meio de um append) sao descartadas na abertura.
+    """
+
+    SEGMENT_FILE = "blocks.dat"
+    INDEX_FILE = "blocks.idx"
+
+    def __init__(self, data_dir: str) -> None:
+        os.makedirs(data_dir, exist_ok=True)
+        self.data_dir = data_dir
+        self._segment = self._open(os.path.join(data_dir, self.SEGMENT_FILE))
+        self._index = self._open(os.path.join(data_dir, self.INDEX_FILE))
+        self._offsets = self._load_offsets()
+        self._recover()
+
+    @staticmethod
+    def _open(path: str):
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        return open(path, "r+b")
+
+    def _load_offsets(self) -> array:
+        offsets = array("Q")
+        size = os.fstat(self._index.fileno()).st_size
+        count = size // OFFSET_SIZE
+        if count == 0:
+            return offsets
+        with mmap.mmap(self._index.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for i in range(count):
+                start = i * OFFSET_SIZE
+                offsets.append(int.from_bytes(view[start:start + OFFSET_SIZE], "big"))
+        return offsets
+
+    def _recover(self) -> None:
+        """Descarta entradas do indice e bytes do segmento que nao formam um registro completo."""
+        segment_size = os.fstat(self._segment.fileno()).st_size
+        valid = len(self._offsets)
+        while valid:
+            offset = self._offsets[valid - 1]
+            length = self._record_length(offset, segment_size)
+            if length is not None:
+                break
+            valid -= 1
+        del self._offsets[valid:]
+        self._index.truncate(valid * OFFSET_SIZE)
+        self._segment.truncate(self._end_offset())
+
+    def _record_length(self, offset: int, segment_size: int) -> int | None:
+        if offset + RECORD_HEADER_SIZE > segment_size:
+            return None
+        header = os.pread(self._segment.fileno(), RECORD_HEADER_SIZE, offset)
+        length = int.from_bytes(header, "big")
+        if offset + RECORD_HEADER_SIZE + length > segment_size:
+            return None
+        return length
+
+    def _end_offset(self) -> int:
+        if not self._offsets:
+            return 0
+        last = self._offsets[-1]
+        header = os.pread(self._segment.fileno(), RECORD_HEADER_SIZE, last)
+        return last + RECORD_HEADER_SIZE + int.from_bytes(header, "big")
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def read(self, height: int) -> Block:
+        offset = self._offsets[height]
+        header = os.pread(self._segment.fileno(), RECORD_HEADER_SIZE, offset)
+        length = int.from_bytes(header, "big")
+        body = os.pread(self._segment.fileno(), length, offset + RECORD_HEADER_SIZE)
+        return Block.from_dict(json.loads(body))
+
+    def load(self, start: int = 0, stop: int | None = None) -> list[Block]:
+        """Le os blocos guardados com altura em [start, stop), em ordem de altura."""
+        offsets = self._offsets[start:stop]
+        if not offsets:
+            return []
+        blocks: list[Block] = []
+        with mmap.mmap(self._segment.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for offset in offsets:
+                length = int.from_bytes(view[offset:offset + RECORD_HEADER_SIZE], "big")
+                start = offset + RECORD_HEADER_SIZE
+                blocks.append(Block.from_dict(json.loads(view[start:start + length])))
+        return blocks
+
+    def append(self, block: Block) -> None:
+        if block.index != len(self._offsets):
+            raise ValueError("Bloco fora de ordem para o armazenamento")
+        body = json.dumps(block.to_dict(), separators=(",", ":")).encode("utf-8")
+        offset = self._end_offset()
+        self._segment.seek(offset)
+        self._segment.write(len(body).to_bytes(RECORD_HEADER_SIZE, "big") + body)
+        self._segment.flush()
+        # o indice so aponta para o registro depois que ele esta inteiro no segmento
+        self._index.seek(len(self._offsets) * OFFSET_SIZE)
+        self._index.write(offset.to_bytes(OFFSET_SIZE, "big"))
+        self._index.flush()
+        self._offsets.append(offset)
+
+    def truncate(self, height: int) -> None:
+        """Mantem apenas os blocos com altura < height."""
+        if height >= len(self._offsets):
+            return
+        end = self._offsets[height]
+        del self._offsets[height:]
+        self._index.truncate(height * OFFSET_SIZE)
+        self._index.flush()
+        self._segment.truncate(end)
+        self._segment.flush()
+
+    def close(self) -> None:
+        self._segment.close()
+        self._index.close()
+
+
+class StoredChain(Sequence[Block]):
+    """Cadeia principal cujos blocos antigos continuam no BlockStore.
+
+    As alturas abaixo de `base` sao lidas do disco sob demanda (com um cache
+    LRU dos ultimos blocos lidos); as demais ficam em memoria. Assim a carga
+    a partir de um snapshot decodifica so os blocos posteriores a ele.
+
+    Como uma lista da cadeia, so cresce por append; trocas de ramo criam uma
+    nova StoredChain (with_branch), e a anterior segue valida para versoes ja
+    publicadas.
+    """
+
+    CACHE_SIZE = 256
+
+    def __init__(self, store: BlockStore, base: int, tail: Iterable[Block] = ()) -> None:
+        self.store = store
+        # (base, tail) num unico atributo: leitores sem lock nunca veem um par misturado
+        self._state: tuple[int, list[Block]] = (base, list(tail))
+        self._cache: OrderedDict[int, Block] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def base(self) -> int:
+        return self._state[0]
+
+    def __len__(self) -> int:
+        base, tail = self._state
+        return base + len(tail)
+
+    @overload
+    def __getitem__(self, index: int) -> Block: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Block]: ...
+
+    def __getitem__(self, index: int | slice) -> Block | list[Block]:
+        base, tail = self._state
+        if isinstance(index, slice):
+            return [self._get(base, tail, i) for i in range(*index.indices(base + len(tail)))]
+        if index < 0:
+            index += base + len(tail)
+        if not 0 <= index < base + len(tail):
+            raise IndexError("altura fora da cadeia")
+        return self._get(base, tail, index)
+
+    def __iter__(self) -> Iterator[Block]:
+        base, tail = self._state
+        for height in range(base):
+            yield self._get(base, tail, height)
+        yield from tail
+
+    def _get(self, base: int, tail: list[Block], height: int) -> Block:
+        if height >= base:
+            return tail[height - base]
+        with self._cache_lock:
+            block = self._cache.get(height)
+            if block is not None:
+                self._cache.move_to_end(height)
+                return block
+        block = self.store.read(height)
+        with self._cache_lock:
+            self._cache[height] = block
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return block
+
+    def append(self, block: Block) -> None:
+        self._state[1].append(block)
+
+    def detach(self, height: int) -> None:
+        """Traz para a memoria os blocos a partir de `height` (antes de o disco ser reescrito)."""
+        base, tail = self._state
+        if height < base:
+            self._state = (height, self.store.load(height, base) + tail)
+
+    def with_branch(self, fork: int, branch: list[Block]) -> "StoredChain":
+        """Nova cadeia com os `fork` primeiros blocos desta seguidos do ramo."""
+        base, tail = self._state
+        if fork < base:
+            return StoredChain(self.store, fork, branch)
+        return StoredChain(self.store, base, tail[:fork - base] + branch)
+
+
+class SnapshotStore:
+    """Snapshots dos saldos, dos indices da cadeia, do pool de pendentes e da ponta.
+
+    Cada snapshot e um JSON `snapshot-<altura>.json` escrito de forma atomica
+    (arquivo temporario + os.replace); so os mais recentes sao mantidos.
+    """
+
+    PREFIX = "snapshot-"
+    SUFFIX = ".json"
+
+    def __init__(self, data_dir: str, keep: int = 2) -> None:
+        os.makedirs(data_dir, exist_ok=True)
+        self.data_dir = data_dir
+        self.keep = max(1, keep)
+
+    def _path(self, height: int) -> str:
+        return os.path.join(self.data_dir, f"{self.PREFIX}{height}{self.SUFFIX}")
+
+    def heights(self) -> list[int]:
+        """Alturas dos snapshots disponiveis, da mais recente para a mais antiga."""
+        found: list[int] = []
+        for name in os.listdir(self.data_dir):
+            if name.startswith(self.PREFIX) and name.endswith(self.SUFFIX):
+                try:
+                    found.append(int(name[len(self.PREFIX):-len(self.SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(found, reverse=True)
+
+    def save(self, snapshot: dict[str, Any]) -> None:
+        height = int(snapshot["height"])
+        path = self._path(height)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle, separators=(",", ":"))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+        for old in self.heights()[self.keep:]:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def load(self, height: int) -> dict[str, Any] | None:
+        try:
+            with open(self._path(height), encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
@@ -4,11 +4,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from typing import Any
+import sys
 import time
 import uuid
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     """Representa uma transacao na blockchain.
 
@@ -18,6 +19,9 @@ class Transaction:
     - destino
     - valor
     - timestamp
+
+    Sem __dict__ (slots) e com enderecos internados: todas as transacoes de um
+    mesmo endereco compartilham uma unica string.
     """
 
     origem: str
@@ -27,10 +31,16 @@ class Transaction:
     timestamp: float = field(default_factory=time.time)
 
     def __post_init__(self) -> None:
+        # sempre float: 1 e 1.0 serializam diferente, e o hash do bloco tem que
+        # sobreviver ao JSON, ao formato binario e ao modo compacto (doubles)
+        self.valor = float(self.valor)
+        self.timestamp = float(self.timestamp)
         if not self.origem or not self.destino:
             raise ValueError("Origem e destino são obrigatorios. Faça o ajuste e tente novamente.")
         if self.valor <= 0:
             raise ValueError("Valor da transaçãoo deve ser positivo. Faça o ajuste e tente novamente.")
+        self.origem = sys.intern(self.origem)
+        self.destino = sys.intern(self.destino)
 
     def to_dict(self) -> dict[str, Any]:
         return {
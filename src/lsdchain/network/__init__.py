@@ -1,6 +1,7 @@
 """Camada de rede e protocolo."""
 
-from .protocol import Message, MessageType, Protocol
+from .protocol import FrameReader, Message, MessageType, Protocol, StreamResponse
 from .node import Node
+from .async_node import AsyncNode
 
-__all__ = ["Message", "MessageType", "Protocol", "Node"]
+__all__ = ["FrameReader", "Message", "MessageType", "Protocol", "StreamResponse", "Node", "AsyncNode"]
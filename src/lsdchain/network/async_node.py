@@ -0,0 +1,239 @@
+"""Motor de rede asyncio para o no (alternativa a uma thread por conexao)."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+import time
+from typing import Any, Coroutine, Iterator, TypeVar
+
+from .node import Node
+from .protocol import (
+    FEATURE_PERSISTENT,
+    FRAME_HEADER_SIZE,
+    MAX_FRAME_SIZE,
+    Message,
+    StreamResponse,
+    wire_format,
+)
+
+T = TypeVar("T")
+
+# Frames de uma resposta em streaming serializados por vez no executor
+STREAM_CHUNK_FRAMES = 64
+
+
+async def _read_frame(reader: asyncio.StreamReader, limit: int = MAX_FRAME_SIZE) -> bytes | None:
+    """Le um frame [4 bytes tamanho][corpo]; None em EOF."""
+    try:
+        header = await reader.readexactly(FRAME_HEADER_SIZE)
+        length = int.from_bytes(header, "big")
+        if length > limit:
+            raise ValueError(f"Frame de {length} bytes excede o limite de {limit}")
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+
+
+def _take(frames: Iterator[bytes], count: int) -> list[bytes]:
+    chunk: list[bytes] = []
+    for frame in frames:
+        chunk.append(frame)
+        if len(chunk) >= count:
+            break
+    return chunk
+
+
+class _LoopConnection:
+    """Conexao asyncio usada de forma sincrona: o I/O roda no event loop e o
+    chamador (thread de CLI ou do executor) espera o resultado."""
+
+    def __init__(
+        self,
+        node: "AsyncNode",
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        reused: bool,
+    ) -> None:
+        self._node = node
+        self.reader = reader
+        self.writer = writer
+        self.reused = reused
+        self.frames_read = 0
+
+    async def _write(self, data: bytes) -> None:
+        self.writer.write(data)
+        await self.writer.drain()
+
+    def send(self, data: bytes) -> None:
+        self._node._call(self._write(data))
+
+    def read_frame(self, limit: int = MAX_FRAME_SIZE) -> bytes | None:
+        body = self._node._call(_read_frame(self.reader, limit))
+        if body is not None:
+            self.frames_read += 1
+        return body
+
+    def close(self) -> None:
+        self._node._loop.call_soon_threadsafe(self.writer.close)
+
+
+class AsyncNode(Node):
+    """No cujo servidor e cliente usam asyncio (start_server + streams).
+
+    Um unico event loop (em thread propria) atende todas as conexoes, com o
+    mesmo framing de 4 bytes do protocolo. O processamento das mensagens
+    (parse, validacao, escrita em disco) roda num ThreadPoolExecutor para o
+    loop continuar respondendo; os workers de broadcast fazem o I/O pelo loop.
+    """
+
+    EXECUTOR_WORKERS = 4
+    CALL_TIMEOUT = 30.0
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.EXECUTOR_WORKERS, thread_name_prefix=f"node-{self.port}"
+        )
+        self._async_server: asyncio.AbstractServer | None = None
+        # tarefas que atendem conexoes de entrada, canceladas no stop
+        self._client_tasks: set[asyncio.Task] = set()
+        # conexoes de saida ociosas por peer; so acessado na thread do loop
+        self._idle: dict[str, list[tuple[asyncio.StreamReader, asyncio.StreamWriter, float]]] = {}
+
+    def _start_transport(self) -> None:
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        self._running = True
+        self._async_server = self._call(
+            asyncio.start_server(
+                self._handle_stream, self.host, self.port, reuse_address=True, backlog=128
+            )
+        )
+        self.logger.info("No iniciado em %s (asyncio)", self.address)
+
+    def _stop_transport(self) -> None:
+        if self._loop_thread is None:
+            return
+        self._call(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+    async def _shutdown(self) -> None:
+        if self._async_server is not None:
+            self._async_server.close()
+        for task in list(self._client_tasks):
+            task.cancel()
+        if self._client_tasks:
+            await asyncio.gather(*self._client_tasks, return_exceptions=True)
+        for idle in self._idle.values():
+            for _, writer, _ in idle:
+                writer.close()
+        self._idle.clear()
+
+    def _call(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Executa uma corrotina no loop e espera o resultado (nunca chamar da thread do loop)."""
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("Chamada bloqueante dentro do event loop")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(self.CALL_TIMEOUT)
+        finally:
+            # no timeout a corrotina seguiria no loop (ex.: presa lendo de um peer parado)
+            if not future.done():
+                future.cancel()
+
+    ## servidor
+    async def _handle_stream(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        self._client_tasks.add(task)
+        try:
+            while self._running:
+                try:
+                    body = await asyncio.wait_for(_read_frame(reader), self.SERVER_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    return
+                if body is None:
+                    return
+                response, wire = await loop.run_in_executor(
+                    self._executor, self._handle_frame, body
+                )
+                if isinstance(response, StreamResponse):
+                    response.header.sender = self.address
+                    response.header.features = self.features
+                    frames = response.iter_frames(*wire)
+                    while True:
+                        chunk = await loop.run_in_executor(
+                            self._executor, _take, frames, STREAM_CHUNK_FRAMES
+                        )
+                        if not chunk:
+                            break
+                        writer.writelines(chunk)
+                        await writer.drain()
+                elif response:
+                    response.sender = self.address
+                    response.features = self.features
+                    writer.write(response.to_bytes(*wire))
+                    await writer.drain()
+        except asyncio.CancelledError:
+            # cancelada por _shutdown; sem isso o asyncio registra o erro a cada stop()
+            pass
+        except Exception as exc:
+            self.logger.error("Erro ao processar cliente: %s", exc)
+        finally:
+            self._client_tasks.discard(task)
+            writer.close()
+
+    def _handle_frame(
+        self, body: bytes
+    ) -> tuple[Message | StreamResponse | None, tuple[bool, bool]]:
+        message = Message.from_bytes(body)
+        return self._process_message(message), wire_format(message.features, self.features)
+
+    ## cliente
+    async def _acquire(
+        self, peer: str
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        now = time.monotonic()
+        idle = self._idle.get(peer, [])
+        while idle:
+            reader, writer, last_used = idle.pop()
+            if (
+                now - last_used < self.CLIENT_IDLE_TIMEOUT
+                and not reader.at_eof()
+                and not writer.is_closing()
+            ):
+                return reader, writer, True
+            writer.close()
+        host, port = peer.rsplit(":", 1)
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), 10)
+        return reader, writer, False
+
+    def _release(
+        self, peer: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        idle = self._idle.setdefault(peer, [])
+        if FEATURE_PERSISTENT in self.peer_features.get(peer, ()) and len(idle) < 4:
+            idle.append((reader, writer, time.monotonic()))
+        else:
+            writer.close()
+
+    @contextmanager
+    def _connection(self, peer: str) -> Iterator[_LoopConnection]:
+        reader, writer, reused = self._call(self._acquire(peer))
+        conn = _LoopConnection(self, reader, writer, reused)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self._loop.call_soon_threadsafe(self._release, peer, reader, writer)
@@ -0,0 +1,167 @@
+"""Envio de broadcasts por filas limitadas por peer e um pool fixo de workers."""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+import threading
+from typing import Any, Callable, Iterable
+
+KIND_TRANSACTION = "transaction"
+KIND_BLOCK = "block"
+
+
+@dataclass
+class _Outbound:
+    key: str
+    kind: str
+    data: bytes
+
+
+class _PeerQueue:
+    """Fila de saida de um peer; o indice por chave permite coalescer e descartar."""
+
+    def __init__(self) -> None:
+        self.items: OrderedDict[str, _Outbound] = OrderedDict()
+        # True enquanto um worker envia para este peer (no maximo um por vez)
+        self.busy = False
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+
+class BroadcastDispatcher:
+    """Distribui mensagens para os peers sem uma thread por envio.
+
+    Cada peer tem uma fila limitada (max_queue). Um numero fixo de workers
+    atende os peers com trabalho, um worker por peer de cada vez, preservando
+    a ordem de envio. Quando a fila de um peer lento enche, a transacao mais
+    antiga e descartada (blocos so saem se nao houver transacoes); mensagens
+    repetidas que ainda estao na fila sao coalescidas, e transacoes incluidas
+    num bloco podem ser retiradas de todas as filas com discard().
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, bytes], None],
+        workers: int = 4,
+        max_queue: int = 256,
+    ) -> None:
+        self._send = send
+        self.max_queue = max(1, max_queue)
+        self._queues: dict[str, _PeerQueue] = {}
+        # peers com mensagens na fila e nenhum worker atendendo
+        self._ready: deque[str] = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self.counters = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "dropped_overflow": 0,
+            "dropped_stale": 0,
+            "sent": 0,
+            "failed": 0,
+        }
+        self._workers = [
+            threading.Thread(target=self._worker, daemon=True) for _ in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, peers: Iterable[str], key: str, kind: str, data: bytes) -> None:
+        with self._cond:
+            if not self._running:
+                return
+            for peer in peers:
+                queue = self._queues.setdefault(peer, _PeerQueue())
+                if key in queue.items:
+                    self.counters["coalesced"] += 1
+                    continue
+                if len(queue.items) >= self.max_queue:
+                    self._evict(queue)
+                queue.items[key] = _Outbound(key, kind, data)
+                self.counters["enqueued"] += 1
+                if not queue.busy and len(queue.items) == 1:
+                    self._ready.append(peer)
+            self._cond.notify_all()
+
+    def _evict(self, queue: _PeerQueue) -> None:
+        victim = next(
+            (k for k, item in queue.items.items() if item.kind == KIND_TRANSACTION),
+            next(iter(queue.items)),
+        )
+        del queue.items[victim]
+        queue.dropped += 1
+        self.counters["dropped_overflow"] += 1
+
+    def discard(self, keys: Iterable[str]) -> int:
+        """Retira das filas mensagens que ficaram obsoletas (ex.: transacoes ja mineradas)."""
+        keys = set(keys)
+        removed = 0
+        with self._cond:
+            for queue in self._queues.values():
+                for key in keys & queue.items.keys():
+                    del queue.items[key]
+                    queue.dropped += 1
+                    removed += 1
+            self.counters["dropped_stale"] += removed
+        return removed
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._ready:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                peer = self._ready.popleft()
+                queue = self._queues[peer]
+                if queue.busy or not queue.items:
+                    # entrada repetida em _ready (a fila esvaziou e voltou a encher)
+                    continue
+                _, item = queue.items.popitem(last=False)
+                queue.busy = True
+            ok = True
+            try:
+                self._send(peer, item.data)
+            except Exception:
+                ok = False
+            with self._cond:
+                queue.busy = False
+                if ok:
+                    queue.sent += 1
+                    self.counters["sent"] += 1
+                else:
+                    queue.failed += 1
+                    self.counters["failed"] += 1
+                if queue.items:
+                    self._ready.append(peer)
+                    self._cond.notify()
+
+    def depth(self) -> int:
+        """Total de mensagens esperando envio, somando todos os peers."""
+        with self._cond:
+            return sum(len(queue.items) for queue in self._queues.values())
+
+    def stats(self) -> dict[str, Any]:
+        """Contadores globais e, por peer, profundidade da fila e descartes."""
+        with self._cond:
+            return {
+                **self.counters,
+                "peers": {
+                    peer: {
+                        "depth": len(queue.items),
+                        "sent": queue.sent,
+                        "failed": queue.failed,
+                        "dropped": queue.dropped,
+                    }
+                    for peer, queue in self._queues.items()
+                },
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._running = False
+            self._queues.clear()
+            self._ready.clear()
+            self._cond.notify_all()
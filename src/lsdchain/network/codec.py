@@ -0,0 +1,374 @@
+"""Codificacao binaria compacta dos frames (alternativa negociada ao JSON).
+
+Os valores sao os mesmos do JSON (dict, list, str, int, float, bool, None),
+escritos com tags de 1 byte:
+
+- inteiros como varint zigzag, floats como double de 8 bytes
+- UUIDs canonicos em 16 bytes e hashes hex de 64 caracteres em 32 bytes
+- chaves de dict frequentes do protocolo como um indice de tabela
+- strings repetidas na mesma mensagem viram referencias (enderecos)
+- listas de dicts com as mesmas chaves (transacoes, blocos) vao por coluna:
+  doubles, UUIDs e hashes de uma coluna sao lidos numa unica operacao
+
+O corpo comeca com um byte magico (MAGIC_BINARY ou MAGIC_ZLIB) que nunca
+inicia um JSON, entao quem recebe distingue o formato pelo primeiro byte.
+Os hashes dos blocos continuam calculados sobre o JSON canonico.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import struct
+import zlib
+from typing import Any
+
+MAGIC_BINARY = 0xB1
+MAGIC_ZLIB = 0xB2
+# Corpos menores que isso nao compensam a compressao
+COMPRESS_MIN_SIZE = 1024
+# Limite ao descomprimir (protege contra frames pequenos que expandem demais)
+MAX_DECOMPRESSED_SIZE = 256 * 1024 * 1024
+
+_NONE = 0x00
+_FALSE = 0x01
+_TRUE = 0x02
+_INT = 0x03
+_FLOAT = 0x04
+_STR = 0x05
+_STR_REF = 0x06
+_UUID = 0x07
+_HASH = 0x08
+_LIST = 0x09
+_DICT = 0x0A
+_TABLE = 0x0B
+
+# Tipos de coluna de uma _TABLE
+_COLUMN_ANY = 0x00
+_COLUMN_FLOAT = 0x01
+_COLUMN_UUID = 0x02
+_COLUMN_HASH = 0x03
+_COLUMN_INT = 0x04
+_COLUMN_STR = 0x05
+
+# Chaves conhecidas (so acrescentar no fim: o indice e parte do formato)
+KEYS = (
+    "type", "payload", "sender", "features",
+    "transaction", "transactions", "block", "blocks",
+    "id", "origem", "destino", "valor", "timestamp",
+    "index", "previous_hash", "nonce", "hash",
+    "blockchain", "chain", "pending_transactions",
+    "locator", "limit", "stream", "start", "count", "more",
+    "ack", "results",
+)
+_KEY_INDEX = {key: position + 1 for position, key in enumerate(KEYS)}
+
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+_HASH_RE = re.compile(r"[0-9a-f]{64}")
+_DOUBLE = struct.Struct(">d")
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+# Largura dos indices de uma coluna de strings, conforme o numero de valores distintos
+_INDEX_FORMATS = ((1 << 8, "B"), (1 << 16, "H"), (1 << 32, "I"))
+# Strings curtas nao valem uma entrada na tabela de referencias
+_MIN_REF_SIZE = 4
+
+
+class CodecError(ValueError):
+    """Corpo binario malformado."""
+
+
+def _is_uuid(value: Any) -> bool:
+    return type(value) is str and len(value) == 36 and _UUID_RE.fullmatch(value) is not None
+
+
+def _is_hash(value: Any) -> bool:
+    return type(value) is str and len(value) == 64 and _HASH_RE.fullmatch(value) is not None
+
+
+class _Encoder:
+    __slots__ = ("out", "strings")
+
+    def __init__(self) -> None:
+        self.out = bytearray()
+        self.strings: dict[str, int] = {}
+
+    def varint(self, value: int) -> None:
+        out = self.out
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    def text(self, value: str) -> None:
+        data = value.encode("utf-8")
+        self.varint(len(data))
+        self.out += data
+
+    def key(self, key: Any) -> None:
+        known = _KEY_INDEX.get(key)
+        if known is not None:
+            self.varint(known)
+        else:
+            self.out.append(0)
+            self.text(str(key))
+
+    def value(self, value: Any) -> None:
+        out = self.out
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, int):
+            out.append(_INT)
+            self.varint(value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif isinstance(value, str):
+            self.string(value)
+        elif isinstance(value, (list, tuple)):
+            if not self.table(value):
+                out.append(_LIST)
+                self.varint(len(value))
+                for item in value:
+                    self.value(item)
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            self.varint(len(value))
+            for key, item in value.items():
+                self.key(key)
+                self.value(item)
+        else:
+            raise TypeError(f"Tipo nao suportado pelo codec: {type(value).__name__}")
+
+    def string(self, value: str) -> None:
+        out = self.out
+        ref = self.strings.get(value)
+        if ref is not None:
+            out.append(_STR_REF)
+            self.varint(ref)
+        elif _is_uuid(value):
+            out.append(_UUID)
+            out += bytes.fromhex(value.replace("-", ""))
+        elif _is_hash(value):
+            out.append(_HASH)
+            out += bytes.fromhex(value)
+        else:
+            out.append(_STR)
+            self.text(value)
+            if len(value) >= _MIN_REF_SIZE:
+                self.strings[value] = len(self.strings)
+
+    def table(self, rows: list[Any] | tuple[Any, ...]) -> bool:
+        """Lista de dicts com as mesmas chaves, escrita coluna a coluna."""
+        if len(rows) < 2 or type(rows[0]) is not dict or not rows[0]:
+            return False
+        keys = tuple(rows[0])
+        if not all(type(row) is dict and tuple(row) == keys for row in rows):
+            return False
+        out = self.out
+        out.append(_TABLE)
+        self.varint(len(rows))
+        self.varint(len(keys))
+        for key in keys:
+            self.key(key)
+        for key in keys:
+            column = [row[key] for row in rows]
+            if all(type(item) is float for item in column):
+                out.append(_COLUMN_FLOAT)
+                out += struct.pack(f">{len(column)}d", *column)
+            elif all(type(item) is int and _INT64_MIN <= item <= _INT64_MAX for item in column):
+                out.append(_COLUMN_INT)
+                out += struct.pack(f">{len(column)}q", *column)
+            elif all(_is_uuid(item) for item in column):
+                out.append(_COLUMN_UUID)
+                out += bytes.fromhex("".join(column).replace("-", ""))
+            elif all(_is_hash(item) for item in column):
+                out.append(_COLUMN_HASH)
+                out += bytes.fromhex("".join(column))
+            elif all(type(item) is str for item in column):
+                # strings novas entram na tabela da mensagem; cada linha vira um indice
+                strings = self.strings
+                fresh = [item for item in dict.fromkeys(column) if item not in strings]
+                out.append(_COLUMN_STR)
+                self.varint(len(fresh))
+                for item in fresh:
+                    self.text(item)
+                    strings[item] = len(strings)
+                code = next(c for limit, c in _INDEX_FORMATS if len(strings) <= limit)
+                out += code.encode("ascii")
+                out += struct.pack(f">{len(column)}{code}", *(strings[item] for item in column))
+            else:
+                out.append(_COLUMN_ANY)
+                for item in column:
+                    self.value(item)
+        return True
+
+
+class _Decoder:
+    __slots__ = ("data", "pos", "strings")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+        self.strings: list[str] = []
+
+    def take(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise CodecError("corpo binario truncado")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        result = 0
+        shift = 0
+        try:
+            while True:
+                byte = data[pos]
+                pos += 1
+                result |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    self.pos = pos
+                    return result
+                shift += 7
+        except IndexError:
+            raise CodecError("corpo binario truncado") from None
+
+    def text(self) -> str:
+        try:
+            return str(self.take(self.varint()), "utf-8")
+        except UnicodeDecodeError as exc:
+            raise CodecError(str(exc)) from None
+
+    def key(self) -> str:
+        known = self.varint()
+        if not known:
+            return self.text()
+        if known > len(KEYS):
+            raise CodecError("chave desconhecida")
+        return KEYS[known - 1]
+
+    def value(self) -> Any:
+        if self.pos >= len(self.data):
+            raise CodecError("corpo binario truncado")
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _STR_REF:
+            ref = self.varint()
+            if ref >= len(self.strings):
+                raise CodecError("referencia de string invalida")
+            return self.strings[ref]
+        if tag == _FLOAT:
+            return _DOUBLE.unpack(self.take(8))[0]
+        if tag == _INT:
+            value = self.varint()
+            return value >> 1 if not value & 1 else -((value + 1) >> 1)
+        if tag == _STR:
+            value = self.text()
+            if len(value) >= _MIN_REF_SIZE:
+                self.strings.append(value)
+            return value
+        if tag == _UUID:
+            return _uuids(self.take(16), 1)[0]
+        if tag == _HASH:
+            return self.take(32).hex()
+        if tag == _TABLE:
+            return self.table()
+        if tag == _DICT:
+            result: dict[str, Any] = {}
+            for _ in range(self.varint()):
+                key = self.key()
+                result[key] = self.value()
+            return result
+        if tag == _LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        raise CodecError(f"tag desconhecida: {tag}")
+
+    def table(self) -> list[dict[str, Any]]:
+        count = self.varint()
+        keys = [self.key() for _ in range(self.varint())]
+        if not keys:
+            raise CodecError("tabela sem colunas")
+        columns: list[list[Any]] = []
+        for _ in keys:
+            kind = self.take(1)[0]
+            if kind == _COLUMN_FLOAT:
+                columns.append(list(struct.unpack(f">{count}d", self.take(8 * count))))
+            elif kind == _COLUMN_INT:
+                columns.append(list(struct.unpack(f">{count}q", self.take(8 * count))))
+            elif kind == _COLUMN_STR:
+                strings = self.strings
+                strings.extend([self.text() for _ in range(self.varint())])
+                code = chr(self.take(1)[0])
+                if code not in "BHI":
+                    raise CodecError("coluna invalida")
+                size = struct.calcsize(">" + code) * count
+                indexes = struct.unpack(f">{count}{code}", self.take(size))
+                try:
+                    columns.append([strings[i] for i in indexes])
+                except IndexError:
+                    raise CodecError("indice de string invalido") from None
+            elif kind == _COLUMN_UUID:
+                columns.append(_uuids(self.take(16 * count), count))
+            elif kind == _COLUMN_HASH:
+                raw = self.take(32 * count).hex()
+                columns.append([raw[i:i + 64] for i in range(0, 64 * count, 64)])
+            elif kind == _COLUMN_ANY:
+                columns.append([self.value() for _ in range(count)])
+            else:
+                raise CodecError("coluna invalida")
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def _uuids(raw: bytes, count: int) -> list[str]:
+    h = raw.hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
+
+def dumps(value: Any, compress: bool = False) -> bytes:
+    """Codifica value; com compress, corpos grandes saem comprimidos com zlib."""
+    encoder = _Encoder()
+    encoder.value(value)
+    out = encoder.out
+    if compress and len(out) >= COMPRESS_MIN_SIZE:
+        return bytes([MAGIC_ZLIB]) + zlib.compress(out)
+    return bytes([MAGIC_BINARY]) + out
+
+
+def loads(body: bytes | memoryview) -> Any:
+    """Decodifica um corpo de frame em qualquer formato: JSON ou binario (comprimido ou nao)."""
+    if not len(body):
+        raise CodecError("corpo vazio")
+    magic = body[0]
+    if magic == MAGIC_BINARY:
+        data = bytes(body[1:])
+    elif magic == MAGIC_ZLIB:
+        inflater = zlib.decompressobj()
+        try:
+            data = inflater.decompress(body[1:], MAX_DECOMPRESSED_SIZE)
+        except zlib.error as exc:
+            raise CodecError(str(exc)) from None
+        if inflater.unconsumed_tail:
+            raise CodecError("frame descomprimido excede o limite")
+    else:
+        return json.loads(str(body, "utf-8"))
+    decoder = _Decoder(data)
+    value = decoder.value()
+    if decoder.pos != len(data):
+        raise CodecError("bytes sobrando no corpo binario")
+    return value
@@ -0,0 +1,156 @@
+"""Conexoes TCP persistentes entre peers (pool por endereco)."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import select
+import socket
+import threading
+import time
+from typing import Iterator
+
+from .protocol import MAX_FRAME_SIZE, FrameReader
+
+
+class PeerConnection:
+    """Conexao com um peer que transporta varios frames em sequencia."""
+
+    def __init__(self, peer: str, sock: socket.socket, buffer_size: int) -> None:
+        self.peer = peer
+        self.sock = sock
+        self.reader = FrameReader(sock, buffer_size)
+        self.last_used = time.monotonic()
+        self.reused = False
+        self.frames_read = 0
+
+    def send(self, data: bytes) -> None:
+        self.sock.sendall(data)
+
+    def read_frame(self, limit: int = MAX_FRAME_SIZE) -> memoryview | None:
+        body = self.reader.read_frame(limit)
+        if body is not None:
+            self.frames_read += 1
+        return body
+
+    def is_alive(self) -> bool:
+        """Conexao ociosa reutilizavel: nada pendente para leitura (nem EOF)."""
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool:
+    """Mantem conexoes ociosas por peer, com timeout de ociosidade e backoff de reconexao.
+
+    Uma conexao e usada por um chamador de cada vez (acquire/release); chamadas
+    concorrentes para o mesmo peer abrem conexoes adicionais, e ate
+    max_idle_per_peer delas ficam guardadas para reuso.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int,
+        connect_timeout: float = 10.0,
+        idle_timeout: float = 60.0,
+        max_idle_per_peer: int = 4,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.max_idle_per_peer = max_idle_per_peer
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._idle: dict[str, list[PeerConnection]] = {}
+        # peer -> (atraso atual, instante a partir do qual pode tentar de novo)
+        self._backoff: dict[str, tuple[float, float]] = {}
+        self._last_prune = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, peer: str) -> PeerConnection:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(peer, [])
+            while idle:
+                conn = idle.pop()
+                if now - conn.last_used < self.idle_timeout and conn.is_alive():
+                    conn.reused = True
+                    conn.frames_read = 0
+                    return conn
+                conn.close()
+            backoff = self._backoff.get(peer)
+        if backoff and now < backoff[1]:
+            raise ConnectionError(f"Peer {peer} em backoff de reconexao")
+        return self._connect(peer)
+
+    def _connect(self, peer: str) -> PeerConnection:
+        host, port = peer.rsplit(":", 1)
+        try:
+            sock = socket.create_connection((host, int(port)), timeout=self.connect_timeout)
+        except OSError:
+            with self._lock:
+                previous = self._backoff.get(peer, (self.base_backoff / 2, 0.0))[0]
+                delay = min(self.max_backoff, previous * 2)
+                self._backoff[peer] = (delay, time.monotonic() + delay)
+            raise
+        with self._lock:
+            self._backoff.pop(peer, None)
+        return PeerConnection(peer, sock, self.buffer_size)
+
+    def release(self, conn: PeerConnection) -> None:
+        now = time.monotonic()
+        conn.last_used = now
+        with self._lock:
+            idle = self._idle.setdefault(conn.peer, [])
+            kept = len(idle) < self.max_idle_per_peer
+            if kept:
+                idle.append(conn)
+            prune_due = now - self._last_prune > self.idle_timeout / 2
+            if prune_due:
+                self._last_prune = now
+        if not kept:
+            conn.close()
+        if prune_due:
+            self.prune()
+
+    @contextmanager
+    def connection(self, peer: str) -> Iterator[PeerConnection]:
+        """Empresta uma conexao; em caso de erro ela e descartada em vez de devolvida."""
+        conn = self.acquire(peer)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self.release(conn)
+
+    def prune(self) -> None:
+        """Fecha conexoes ociosas ha mais de idle_timeout."""
+        now = time.monotonic()
+        expired: list[PeerConnection] = []
+        with self._lock:
+            for peer, idle in list(self._idle.items()):
+                alive = [c for c in idle if now - c.last_used < self.idle_timeout]
+                expired.extend(c for c in idle if now - c.last_used >= self.idle_timeout)
+                if alive:
+                    self._idle[peer] = alive
+                else:
+                    del self._idle[peer]
+        for conn in expired:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
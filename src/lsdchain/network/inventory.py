@@ -0,0 +1,43 @@
+"""Cache LRU de itens ja vistos na rede (IDs de transacao e hashes de bloco)."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+
+
+class SeenCache:
+    """Conjunto limitado de chaves recentes; a mais antiga sai quando enche.
+
+    Consultado antes de desserializar e validar uma mensagem recebida, para
+    descartar de imediato o que ja foi processado (ex.: a mesma transacao
+    chegando de varios peers).
+    """
+
+    def __init__(self, capacity: int = 10000) -> None:
+        self.capacity = max(1, capacity)
+        self._items: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            if key not in self._items:
+                return False
+            self._items.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, key: str) -> bool:
+        """Registra a chave; retorna False se ela ja estava no cache."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return False
+            self._items[key] = None
+            if len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+            return True
@@ -0,0 +1,51 @@
+"""Endpoint HTTP local com as metricas do no no formato texto do Prometheus."""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+from ..core.metrics import Metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """Servidor HTTP em thread propria: GET /metrics devolve Metrics.render_prometheus()."""
+
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9100) -> None:
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer | None = None
+
+    def start(self) -> None:
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                # sem uma linha de log por coleta
+                return
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        # porta 0: o sistema escolhe uma livre
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -2,52 +2,166 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import logging
 import socket
 import threading
-from typing import Any
+from typing import Any, Callable, Iterator, TypeVar
 
 from ..core.block import Block
-from ..core.blockchain import Blockchain
-from ..core.mining import Miner
+from ..core.blockchain import (
+    ACCEPTED,
+    BLOCK_ORPHAN,
+    REJECT_DUPLICATE,
+    REJECT_INVALID,
+    Blockchain,
+    ChainValidator,
+)
+from ..core.metrics import Metrics
+from ..core.mining import BLOCK_INTERVAL, Miner, MiningService
+from ..core.storage import BlockStore, SnapshotStore
 from ..core.transaction import Transaction
-from .protocol import Message, MessageType, Protocol
+from .broadcast import KIND_BLOCK, KIND_TRANSACTION, BroadcastDispatcher
+from .connection import ConnectionPool, PeerConnection
+from .inventory import SeenCache
+from .metrics_server import MetricsServer
+from .query_server import QueryServer
+from . import codec
+from .protocol import (
+    FEATURE_INV,
+    FEATURE_PERSISTENT,
+    FrameReader,
+    MAX_RESPONSE_FRAME_SIZE,
+    Message,
+    MessageType,
+    Protocol,
+    StreamResponse,
+    WIRE_FORMATS,
+    WIRE_JSON,
+    wire_format,
+)
 
 
 LOGGER_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Endpoints HTTP locais (metricas, API de consulta) nao seguem o host P2P, que pode ser 0.0.0.0
+HTTP_HOST = "127.0.0.1"
 
+T = TypeVar("T")
 
-def _read_exact(sock: socket.socket, size: int) -> bytes:
-    data = b""
-    while len(data) < size:
-        chunk = sock.recv(size - len(data))
-        if not chunk:
-            break
-        data += chunk
-    return data
+
+class _StreamAborted(Exception):
+    """Leitura de um BLOCK_STREAM interrompida pelo consumidor."""
+
+    def __init__(self, control: dict[str, Any]) -> None:
+        super().__init__("stream abortado")
+        self.control = control
 
 
 class Node:
     """Representa um no da rede da blockchain."""
 
     BUFFER_SIZE = 64 * 1024
-
-    def __init__(self, host: str, port: int) -> None:
+    # Maximo de blocos por lote de REQUEST_BLOCKS/RESPONSE_BLOCKS
+    SYNC_BATCH_SIZE = 500
+    # Conexoes de entrada ociosas sao fechadas depois disso; maior que o timeout
+    # do pool de saida para que normalmente o cliente feche primeiro
+    SERVER_IDLE_TIMEOUT = 120.0
+    CLIENT_IDLE_TIMEOUT = 60.0
+    # Capacidades sempre anunciadas; bin/zlib entram conforme o formato de fio escolhido
+    FEATURES = [FEATURE_PERSISTENT, FEATURE_INV]
+    # Tamanho dos caches de itens vistos e maximo de IDs por INV/GETDATA
+    SEEN_CACHE_SIZE = 20000
+    MAX_INV_ITEMS = 1000
+    FETCH_WORKERS = 2
+    # Workers que esvaziam as filas de broadcast e limite de mensagens por peer
+    BROADCAST_WORKERS = 4
+    BROADCAST_QUEUE_SIZE = 256
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        mining_workers: int = 1,
+        data_dir: str | None = None,
+        compact: bool = False,
+        metrics_port: int | None = None,
+        mining_interval: float = BLOCK_INTERVAL,
+        api_port: int | None = None,
+        wire: str = WIRE_JSON,
+        http_host: str = HTTP_HOST,
+    ) -> None:
+        if wire not in WIRE_FORMATS:
+            raise ValueError(f"Formato de fio desconhecido: {wire}")
         self.host = host
         self.port = port
         self.address = f"{host}:{port}"
-
-        self.blockchain = Blockchain()
-        self.miner = Miner(self.blockchain, self.address)
+        self.features = [*self.FEATURES, *WIRE_FORMATS[wire]]
+        self.http_host = http_host
+
+        self.metrics = Metrics()
+        if data_dir:
+            self.blockchain = Blockchain(
+                store=BlockStore(data_dir),
+                snapshots=SnapshotStore(data_dir),
+                compact=compact,
+                metrics=self.metrics,
+            )
+        else:
+            self.blockchain = Blockchain(compact=compact, metrics=self.metrics)
+        self.miner = Miner(self.blockchain, self.address, workers=mining_workers)
+        # mineracao continua em segundo plano (start_mining/stop_mining), com minerador proprio
+        self.mining_service = MiningService(
+            Miner(self.blockchain, self.address, workers=mining_workers),
+            self._on_mined_block,
+            block_interval=mining_interval,
+        )
 
         self.peers: set[str] = set()
+        # capacidades anunciadas por cada peer (campo "features" do envelope)
+        self.peer_features: dict[str, set[str]] = {}
+        self._pool = ConnectionPool(self.BUFFER_SIZE, idle_timeout=self.CLIENT_IDLE_TIMEOUT)
+        self._dispatcher = BroadcastDispatcher(
+            self._deliver, workers=self.BROADCAST_WORKERS, max_queue=self.BROADCAST_QUEUE_SIZE
+        )
+        self._seen_transactions = SeenCache(self.SEEN_CACHE_SIZE)
+        self._seen_blocks = SeenCache(self.SEEN_CACHE_SIZE)
+        # IDs pedidos via GETDATA ainda sem resposta (evita pedir o mesmo item a varios peers)
+        self._inflight: set[str] = set()
+        self._inflight_lock = threading.Lock()
+        self._fetcher = ThreadPoolExecutor(
+            max_workers=self.FETCH_WORKERS, thread_name_prefix=f"fetch-{self.port}"
+        )
         self._server: socket.socket | None = None
         self._running = False
+        self.metrics.gauge("lsd_peers", lambda: len(self.peers))
+        self.metrics.gauge("lsd_outbound_queue_depth", self._dispatcher.depth)
+        # endpoint Prometheus opcional (texto em http://http_host:metrics_port/metrics)
+        self._metrics_server = (
+            MetricsServer(self.metrics, http_host, metrics_port)
+            if metrics_port is not None
+            else None
+        )
+        # API de consulta opcional (JSON somente leitura em http://http_host:api_port/)
+        self._query_server = (
+            QueryServer(self.blockchain, http_host, api_port) if api_port is not None else None
+        )
 
         logging.basicConfig(level=logging.INFO, format=LOGGER_FORMAT)
         self.logger = logging.getLogger(f"Node:{self.port}")
 
     def start(self) -> None:
+        self._start_transport()
+        if self._metrics_server is not None:
+            self._metrics_server.start()
+            self.logger.info(
+                "Metricas em http://%s:%s/metrics", self.http_host, self._metrics_server.port
+            )
+        if self._query_server is not None:
+            self._query_server.start()
+            self.logger.info("API de consulta em http://%s:%s/", self.http_host, self._query_server.port)
+
+    def _start_transport(self) -> None:
         self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self._server.bind((self.host, self.port))
@@ -61,9 +175,26 @@ class Node:
     def stop(self) -> None:
         self._running = False
         self.miner.stop()
+        self.mining_service.stop()
+        self.miner.close()
+        self.mining_service.miner.close()
+        self._dispatcher.close()
+        self._fetcher.shutdown(wait=False, cancel_futures=True)
+        self._stop_transport()
+        if self._metrics_server is not None:
+            self._metrics_server.stop()
+        if self._query_server is not None:
+            self._query_server.stop()
+        if self.blockchain.store is not None:
+            self.blockchain.save_snapshot()
+            self.blockchain.close()
+            self.blockchain.store.close()
+        self.logger.info("No encerrado")
+
+    def _stop_transport(self) -> None:
         if self._server:
             self._server.close()
-        self.logger.info("No encerrado")
+        self._pool.close()
 
     def _accept_loop(self) -> None:
         while self._running:
@@ -78,62 +209,243 @@ class Node:
                     self.logger.error("Erro ao aceitar conexao: %s", exc)
 
     def _handle_client(self, client_socket: socket.socket) -> None:
-        try:
-            length_raw = _read_exact(client_socket, 4)
-            if not length_raw:
-                return
-            length = int.from_bytes(length_raw, "big")
-            body = _read_exact(client_socket, length)
-            if not body:
-                return
+        """Atende varios frames na mesma conexao ate EOF ou ociosidade.
 
-            message = Message.from_bytes(body)
-            response = self._process_message(message)
-            if response:
-                response.sender = self.address
-                client_socket.sendall(response.to_bytes())
+        Clientes antigos enviam um unico frame e fecham; mensagens que nao
+        sabemos decodificar encerram a conexao sem resposta, como antes.
+        """
+        client_socket.settimeout(self.SERVER_IDLE_TIMEOUT)
+        reader = FrameReader(client_socket, self.BUFFER_SIZE)
+        try:
+            while self._running:
+                body = reader.read_frame()
+                if not body:
+                    return
+
+                message = Message.from_bytes(body)
+                response = self._process_message(message)
+                # a resposta segue o formato que o cliente anunciou no pedido
+                wire = wire_format(message.features, self.features)
+                if isinstance(response, StreamResponse):
+                    response.header.sender = self.address
+                    response.header.features = self.features
+                    for frame in response.iter_frames(*wire):
+                        client_socket.sendall(frame)
+                elif response:
+                    response.sender = self.address
+                    response.features = self.features
+                    client_socket.sendall(response.to_bytes(*wire))
+        except socket.timeout:
+            pass
         except Exception as exc:
             self.logger.error("Erro ao processar cliente: %s", exc)
         finally:
             client_socket.close()
 
-    def _process_message(self, message: Message) -> Message | None:
+    def _note_features(self, peer: str, message: Message) -> None:
+        if peer and peer != self.address:
+            self.peer_features[peer] = set(message.features)
+
+    def _knows_transaction(self, tx_id: str) -> bool:
+        if tx_id in self._seen_transactions:
+            return True
+        if self.blockchain.get_transaction(tx_id) is not None:
+            self._seen_transactions.add(tx_id)
+            return True
+        return False
+
+    def _knows_block(self, block_hash: str) -> bool:
+        if block_hash in self._seen_blocks:
+            return True
+        if self.blockchain.has_block(block_hash):
+            self._seen_blocks.add(block_hash)
+            return True
+        return False
+
+    def _receive_transactions(
+        self, tx_datas: list[dict[str, Any]], sender: str
+    ) -> list[str | None]:
+        """Admite transacoes recebidas (uma ou um lote) e repassa as aceitas num unico broadcast.
+
+        Retorna, na ordem recebida, None para as aceitas ou o motivo da rejeicao.
+        """
+        results: list[str | None] = [REJECT_DUPLICATE] * len(tx_datas)
+        candidates: list[tuple[int, Transaction]] = []
+        for position, tx_data in enumerate(tx_datas):
+            # itens ja vistos sao descartados antes de desserializar e validar
+            if self._knows_transaction(str(tx_data.get("id", ""))):
+                continue
+            try:
+                candidates.append((position, Transaction.from_dict(tx_data)))
+            except Exception as exc:
+                self.logger.warning("Transacao invalida recebida: %s", exc)
+                results[position] = REJECT_INVALID
+        admitted = self.blockchain.add_transactions(tx for _, tx in candidates)
+        accepted: list[Transaction] = []
+        for (position, transaction), result in zip(candidates, admitted):
+            results[position] = result
+            if result is None:
+                self._seen_transactions.add(transaction.id)
+                accepted.append(transaction)
+        if len(accepted) == 1:
+            self.logger.info("Transacao adicionada: %s", accepted[0].id)
+        elif accepted:
+            self.logger.info("%s transacoes adicionadas", len(accepted))
+        self._broadcast_transactions(accepted, exclude=sender)
+        return results
+
+    def _receive_transaction(self, tx_data: dict[str, Any], sender: str) -> None:
+        self._receive_transactions([tx_data], sender)
+
+    def _receive_block(self, block_data: dict[str, Any], sender: str) -> None:
+        if self._knows_block(str(block_data.get("hash", ""))):
+            return
+        try:
+            block = Block.from_dict(block_data)
+        except Exception as exc:
+            self.logger.warning("Bloco invalido recebido: %s", exc)
+            return
+        result = self.blockchain.process_block(block)
+        if result == ACCEPTED:
+            self._seen_blocks.add(block.hash)
+            self.logger.info("Bloco #%s adicionado", block.index)
+            self.miner.stop()
+            self._broadcast(Protocol.new_block(block.to_dict()), exclude=sender)
+        elif result == BLOCK_ORPHAN and sender:
+            # faltam ancestrais: busca o trecho com o remetente (o orfao entra ao final)
+            self.logger.info("Bloco #%s orfao; sincronizando com %s", block.index, sender)
+            try:
+                self._fetcher.submit(self._sync_with, sender)
+            except RuntimeError:
+                # executor ja encerrado (no parando)
+                pass
+
+    def _schedule_fetch(self, peer: str, inventory: dict[str, Any]) -> None:
+        """Pede com GETDATA so os itens de um INV que ainda nao temos nem pedimos.
+
+        O pedido sai de um executor proprio para nao prender a thread que
+        atende a conexao de quem anunciou.
+        """
+        if not peer:
+            return
+        tx_ids = [
+            tx_id
+            for tx_id in map(str, inventory.get("transactions", [])[: self.MAX_INV_ITEMS])
+            if not self._knows_transaction(tx_id)
+        ]
+        hashes = [
+            block_hash
+            for block_hash in map(str, inventory.get("blocks", [])[: self.MAX_INV_ITEMS])
+            if not self._knows_block(block_hash)
+        ]
+        with self._inflight_lock:
+            tx_ids = [i for i in tx_ids if i not in self._inflight]
+            hashes = [h for h in hashes if h not in self._inflight]
+            self._inflight.update(tx_ids)
+            self._inflight.update(hashes)
+        if not tx_ids and not hashes:
+            return
+        try:
+            self._fetcher.submit(self._fetch, peer, tx_ids, hashes)
+        except RuntimeError:
+            # executor ja encerrado (no parando)
+            self._release_inflight(tx_ids + hashes)
+
+    def _fetch(self, peer: str, tx_ids: list[str], hashes: list[str]) -> None:
+        try:
+            response = self._send_message(
+                peer, Protocol.getdata(tx_ids, hashes), expect_response=True
+            )
+        finally:
+            self._release_inflight(tx_ids + hashes)
+        if response is None or response.type != MessageType.DATA:
+            return
+        # blocos primeiro: transacoes que eles confirmam ja nao entram no pool
+        for block_data in response.payload.get("blocks", []):
+            self._receive_block(block_data, peer)
+        self._receive_transactions(response.payload.get("transactions", []), peer)
+
+    def _release_inflight(self, keys: list[str]) -> None:
+        with self._inflight_lock:
+            self._inflight.difference_update(keys)
+
+    def _process_message(self, message: Message) -> Message | StreamResponse | None:
+        """Trata uma mensagem recebida, registrando contagem e latencia por tipo."""
+        kind = message.type.value
+        self.metrics.inc("lsd_messages_total", type=kind)
+        with self.metrics.timer("lsd_message_duration_seconds", type=kind):
+            try:
+                return self._handle_message(message)
+            except Exception:
+                self.metrics.inc("lsd_message_errors_total", type=kind)
+                raise
+
+    def _handle_message(self, message: Message) -> Message | StreamResponse | None:
         self.logger.info("Mensagem %s de %s", message.type.value, message.sender)
         if message.sender and message.sender != self.address:
             self.peers.add(message.sender)
+            self._note_features(message.sender, message)
 
         if message.type == MessageType.NEW_TRANSACTION:
-            tx_data = message.payload.get("transaction", {})
-            try:
-                transaction = Transaction.from_dict(tx_data)
-            except Exception as exc:
-                self.logger.warning("Transacao invalida recebida: %s", exc)
-                return None
-            if self.blockchain.add_transaction(transaction):
-                self.logger.info("Transacao adicionada: %s", transaction.id)
-                self._broadcast(
-                    Protocol.new_transaction(transaction.to_dict()),
-                    exclude=message.sender,
-                )
+            self._receive_transaction(message.payload.get("transaction", {}), message.sender)
+
+        elif message.type == MessageType.NEW_TRANSACTIONS:
+            results = self._receive_transactions(
+                message.payload.get("transactions", []), message.sender
+            )
+            if message.payload.get("ack"):
+                return Protocol.transactions_ack(results)
 
         elif message.type == MessageType.NEW_BLOCK:
-            block_data = message.payload.get("block", {})
-            try:
-                block = Block.from_dict(block_data)
-            except Exception as exc:
-                self.logger.warning("Bloco invalido recebido: %s", exc)
-                return None
-            if self.blockchain.add_block(block):
-                self.logger.info("Bloco #%s adicionado", block.index)
-                self.miner.stop()
-                self._broadcast(
-                    Protocol.new_block(block.to_dict()),
-                    exclude=message.sender,
+            self._receive_block(message.payload.get("block", {}), message.sender)
+
+        elif message.type == MessageType.INV:
+            self._schedule_fetch(message.sender, message.payload)
+
+        elif message.type == MessageType.GETDATA:
+            tx_ids = message.payload.get("transactions", [])[: self.MAX_INV_ITEMS]
+            hashes = message.payload.get("blocks", [])[: self.MAX_INV_ITEMS]
+            transactions = [self.blockchain.get_transaction(str(i)) for i in tx_ids]
+            blocks = [self.blockchain.get_block(str(h)) for h in hashes]
+            return Protocol.data(
+                [tx.to_dict() for tx in transactions if tx is not None],
+                [block.to_dict() for block in blocks if block is not None],
+            )
+
+        elif message.type == MessageType.REQUEST_BLOCKS:
+            locator = [str(h) for h in message.payload.get("locator", [])]
+            limit = min(int(message.payload.get("limit", self.SYNC_BATCH_SIZE)), self.SYNC_BATCH_SIZE)
+            view = self.blockchain.snapshot()
+            start = min(self.blockchain.find_common_height(locator) + 1, view.length)
+            blocks = view.blocks(start, limit)
+            more = start + len(blocks) < view.length
+            pending = [] if more else [
+                tx.to_dict() for tx in self.blockchain.pending_transactions
+            ]
+            if message.payload.get("stream"):
+                return StreamResponse(
+                    header=Protocol.block_stream(start, len(blocks), more, pending),
+                    items=(block.to_dict() for block in blocks),
                 )
+            return Protocol.response_blocks(
+                [block.to_dict() for block in blocks], start, more, pending
+            )
+
+        elif message.type == MessageType.REQUEST_CHAIN and message.payload.get("stream"):
+            # versao imutavel: o envio pode seguir enquanto novos blocos chegam
+            view = self.blockchain.snapshot()
+            pending = [tx.to_dict() for tx in self.blockchain.pending_transactions]
+            return StreamResponse(
+                header=Protocol.block_stream(0, len(view), False, pending),
+                items=(block.to_dict() for block in view),
+            )
 
         elif message.type == MessageType.REQUEST_CHAIN:
             return Protocol.response_chain(self.blockchain.to_dict())
 
+        elif message.type == MessageType.STATS and "stats" not in message.payload:
+            return Protocol.stats(self.stats())
+
         elif message.type == MessageType.RESPONSE_CHAIN:
             chain_data = message.payload.get("blockchain", {})
             new_chain = [Block.from_dict(b) for b in chain_data.get("chain", [])]
@@ -149,70 +461,352 @@ class Node:
 
         return None
 
+    @contextmanager
+    def _connection(self, peer: str) -> Iterator[PeerConnection]:
+        """Conexao do pool para peers que anunciaram suporte; senao, conexao de uso unico."""
+        if FEATURE_PERSISTENT in self.peer_features.get(peer, ()):
+            with self._pool.connection(peer) as conn:
+                yield conn
+            return
+        host, port = peer.rsplit(":", 1)
+        sock = socket.create_connection((host, int(port)), timeout=10)
+        conn = PeerConnection(peer, sock, self.BUFFER_SIZE)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _exchange(self, peer: str, action: Callable[[PeerConnection], T]) -> T:
+        """Executa action numa conexao com o peer.
+
+        Se uma conexao reaproveitada do pool falhar antes de qualquer resposta
+        (o peer pode te-la fechado), tenta de novo uma unica vez com outra. O
+        erro sai do bloco with, entao a conexao morta e fechada, nao devolvida.
+        """
+        for attempt in range(2):
+            conn: PeerConnection | None = None
+            try:
+                with self._connection(peer) as conn:
+                    return action(conn)
+            except OSError:
+                if attempt or conn is None or not conn.reused or conn.frames_read:
+                    raise
+        raise ConnectionError(f"Falha ao falar com {peer}")
+
     def _send_message(
         self, peer: str, message: Message, expect_response: bool = False
     ) -> Message | None:
+        message.sender = self.address
+        message.features = self.features
+        data = message.to_bytes(*self._wire(peer))
+
+        def action(conn: PeerConnection) -> Message | None:
+            conn.send(data)
+            if not expect_response:
+                return None
+            body = conn.read_frame()
+            if not body:
+                raise ConnectionError("Conexao encerrada sem resposta")
+            return Message.from_bytes(body)
+
         try:
-            host, port = peer.split(":")
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(10)
-                sock.connect((host, int(port)))
-                message.sender = self.address
-                sock.sendall(message.to_bytes())
-
-                if not expect_response:
-                    return None
-                length_raw = _read_exact(sock, 4)
-                if not length_raw:
-                    return None
-                length = int.from_bytes(length_raw, "big")
-                body = _read_exact(sock, length)
-                if not body:
-                    return None
-                return Message.from_bytes(body)
+            response = self._exchange(peer, action)
         except Exception as exc:
             self.logger.error("Erro ao enviar para %s: %s", peer, exc)
             return None
+        if response is not None:
+            self._note_features(peer, response)
+        return response
+
+    def _request_blocks(
+        self, peer: str, message: Message, on_block: Callable[[Block], bool]
+    ) -> dict[str, Any] | None:
+        """Envia um pedido de blocos e entrega cada bloco a on_block assim que chega.
+
+        Aceita a resposta em streaming (BLOCK_STREAM, um bloco por frame) ou as
+        respostas de frame unico (RESPONSE_BLOCKS/RESPONSE_CHAIN). Se on_block
+        retornar False a leitura para. Retorna o payload de controle
+        (start, more, pending_transactions) ou None se nao houve resposta valida.
+        """
+        message.sender = self.address
+        message.features = self.features
+        data = message.to_bytes(*self._wire(peer))
+
+        def action(conn: PeerConnection) -> dict[str, Any] | None:
+            conn.send(data)
+            # peers antigos respondem com a cadeia inteira num frame so
+            body = conn.read_frame(MAX_RESPONSE_FRAME_SIZE)
+            if not body:
+                raise ConnectionError("Conexao encerrada sem resposta")
+            header = Message.from_bytes(body)
+            self._note_features(peer, header)
+            if header.type == MessageType.BLOCK_STREAM:
+                count = int(header.payload.get("count", 0))
+                for received in range(count):
+                    body = conn.read_frame()
+                    if body is None:
+                        raise ConnectionError("Stream de blocos interrompido")
+                    if not on_block(Block.from_dict(codec.loads(body))):
+                        # frames restantes ficariam pendentes: a conexao nao pode voltar ao pool
+                        if received + 1 < count:
+                            raise _StreamAborted(header.payload)
+                        break
+                return header.payload
+
+            if header.type == MessageType.RESPONSE_BLOCKS:
+                control = header.payload
+                blocks_data = control.get("blocks", [])
+            elif header.type == MessageType.RESPONSE_CHAIN:
+                chain_data = header.payload.get("blockchain", {})
+                blocks_data = chain_data.get("chain", [])
+                control = {
+                    "start": 0,
+                    "more": False,
+                    "pending_transactions": chain_data.get("pending_transactions", []),
+                }
+            else:
+                return None
+            for block_data in blocks_data:
+                if not on_block(Block.from_dict(block_data)):
+                    break
+            return control
 
-    def _broadcast(self, message: Message, exclude: str | None = None) -> None:
-        for peer in list(self.peers):
-            if exclude and peer == exclude:
+        try:
+            return self._exchange(peer, action)
+        except _StreamAborted as aborted:
+            return aborted.control
+        except Exception as exc:
+            self.logger.error("Erro ao pedir blocos a %s: %s", peer, exc)
+            return None
+
+    def _wire(self, peer: str) -> tuple[bool, bool]:
+        return wire_format(self.peer_features.get(peer, ()), self.features)
+
+    def _submit(self, peers: list[str], key: str, kind: str, message: Message) -> None:
+        """Enfileira a mensagem para os peers, codificada uma vez por formato de fio."""
+        message.sender = self.address
+        message.features = self.features
+        groups: dict[tuple[bool, bool], list[str]] = {}
+        for peer in peers:
+            groups.setdefault(self._wire(peer), []).append(peer)
+        for wire, group in groups.items():
+            self._dispatcher.submit(group, key, kind, message.to_bytes(*wire))
+
+    def _split_peers(self, exclude: str | None) -> tuple[list[str], list[str]]:
+        """Separa os peers que aceitam INV dos que precisam do payload completo."""
+        inv_peers: list[str] = []
+        full_peers: list[str] = []
+        for peer in self.peers:
+            if peer == exclude:
                 continue
-            thread = threading.Thread(
-                target=self._send_message,
-                args=(peer, message, False),
-                daemon=True,
+            if FEATURE_INV in self.peer_features.get(peer, ()):
+                inv_peers.append(peer)
+            else:
+                full_peers.append(peer)
+        return inv_peers, full_peers
+
+    def _broadcast(self, message: Message, exclude: str | None = None) -> None:
+        """Enfileira a mensagem para os peers; o envio fica com o dispatcher."""
+        if message.type == MessageType.NEW_BLOCK:
+            block = message.payload["block"]
+            key, kind = str(block["hash"]), KIND_BLOCK
+            # transacoes do bloco ainda nas filas nao precisam mais ser enviadas
+            self._dispatcher.discard(str(tx["id"]) for tx in block.get("transactions", []))
+            announce = Protocol.inv([], [key])
+        else:
+            key, kind = str(message.payload["transaction"]["id"]), KIND_TRANSACTION
+            announce = Protocol.inv([key], [])
+        # peers com suporte recebem so o anuncio (INV) e pedem o conteudo se faltar
+        inv_peers, full_peers = self._split_peers(exclude)
+        if inv_peers:
+            self._submit(inv_peers, key, kind, announce)
+        if full_peers:
+            self._submit(full_peers, key, kind, message)
+
+    def _broadcast_transactions(
+        self, transactions: list[Transaction], exclude: str | None = None
+    ) -> None:
+        """Repassa um lote: um INV por ate MAX_INV_ITEMS IDs; peers antigos recebem uma a uma."""
+        if len(transactions) <= 1:
+            for transaction in transactions:
+                self._broadcast(Protocol.new_transaction(transaction.to_dict()), exclude)
+            return
+        inv_peers, full_peers = self._split_peers(exclude)
+        if inv_peers:
+            for start in range(0, len(transactions), self.MAX_INV_ITEMS):
+                ids = [tx.id for tx in transactions[start:start + self.MAX_INV_ITEMS]]
+                self._submit(
+                    inv_peers, f"inv:{ids[0]}:{len(ids)}", KIND_TRANSACTION, Protocol.inv(ids, [])
+                )
+        if full_peers:
+            for transaction in transactions:
+                message = Protocol.new_transaction(transaction.to_dict())
+                self._submit(full_peers, transaction.id, KIND_TRANSACTION, message)
+
+    def _deliver(self, peer: str, data: bytes) -> None:
+        try:
+            self._exchange(peer, lambda conn: conn.send(data))
+        except Exception as exc:
+            self.logger.error("Erro ao enviar para %s: %s", peer, exc)
+            raise
+
+    def broadcast_stats(self) -> dict[str, Any]:
+        """Profundidade das filas de saida e contadores de envio/descarte."""
+        return self._dispatcher.stats()
+
+    def stats(self) -> dict[str, Any]:
+        """Metricas locais (as mesmas do endpoint Prometheus) e identificacao do no."""
+        return {"address": self.address, **self.metrics.snapshot()}
+
+    def request_stats(self, peer: str) -> dict[str, Any] | None:
+        """Pede as metricas de um peer com a mensagem STATS."""
+        response = self._send_message(peer, Protocol.stats(), expect_response=True)
+        if response is None or response.type != MessageType.STATS:
+            return None
+        return response.payload.get("stats")
+
+    def _sync_blocks(self, peer: str) -> bool:
+        """Baixa so os blocos depois do ancestral comum, em lotes (REQUEST_BLOCKS).
+
+        Blocos que estendem a ponta local sao validados e anexados conforme chegam.
+        Retorna False se o peer nao responder ao protocolo incremental.
+        """
+        locator = self.blockchain.get_locator()
+        # altura do primeiro bloco que nao estende a ponta local (inicio do ramo do peer)
+        fork: int | None = None
+        fork_blocks: list[Block] = []
+        last_hash: str | None = None
+        rejected = False
+
+        def on_block(block: Block) -> bool:
+            nonlocal fork, last_hash, rejected
+            last_hash = block.hash
+            if fork is None and block.previous_hash == self.blockchain.last_block.hash:
+                rejected = not self.blockchain.add_block(block)
+                return not rejected
+            if fork is None:
+                fork = block.index
+            fork_blocks.append(block)
+            return True
+
+        first = True
+        while True:
+            last_hash = None
+            control = self._request_blocks(
+                peer,
+                Protocol.request_blocks(locator, self.SYNC_BATCH_SIZE, stream=True),
+                on_block,
             )
-            thread.start()
+            if control is None:
+                return not first
+            first = False
+            if rejected or last_hash is None or not control.get("more"):
+                break
+            locator = [last_hash]
+
+        if fork is not None and self.blockchain.replace_chain(fork_blocks, start=fork):
+            self.logger.info("Blockchain atualizada (%s blocos)", len(self.blockchain.chain))
+        for tx_data in control.get("pending_transactions", []):
+            try:
+                self.blockchain.add_transaction(Transaction.from_dict(tx_data))
+            except Exception as exc:
+                self.logger.warning("Transacao invalida recebida: %s", exc)
+        return True
+
+    def _sync_full_chain(self, peer: str) -> bool:
+        """Sincronizacao legada: pede a cadeia inteira (REQUEST_CHAIN).
+
+        Com peers que suportam streaming, cada bloco e validado ao chegar e a
+        transferencia e abortada no primeiro bloco invalido.
+        """
+        validator = ChainValidator()
+        new_chain: list[Block] = []
+
+        def on_block(block: Block) -> bool:
+            if not validator.feed(block):
+                return False
+            new_chain.append(block)
+            return True
+
+        control = self._request_blocks(peer, Protocol.request_chain(stream=True), on_block)
+        if control is None:
+            return False
+        if self.blockchain.replace_chain(new_chain, validator=validator):
+            self.blockchain.pending_transactions = [
+                Transaction.from_dict(tx)
+                for tx in control.get("pending_transactions", [])
+            ]
+            self.logger.info("Blockchain atualizada (%s blocos)", len(self.blockchain.chain))
+        return True
+
+    def _sync_with(self, peer: str) -> bool:
+        # peers que so falam o protocolo original descartam REQUEST_BLOCKS sem responder
+        if self._is_legacy_peer(peer):
+            return self._sync_full_chain(peer)
+        return self._sync_blocks(peer) or self._sync_full_chain(peer)
+
+    def _is_legacy_peer(self, peer: str) -> bool:
+        """Peer do protocolo original: ja mandou mensagens, mas sem "features".
+
+        Todo no desta versao anuncia capacidades em cada mensagem; depois da
+        primeira resposta de um peer antigo a sincronizacao vai direto para
+        REQUEST_CHAIN, sem o REQUEST_BLOCKS que ele rejeitaria (com erro nos
+        dois lados) a cada rodada.
+        """
+        features = self.peer_features.get(peer)
+        return features is not None and not features
 
     def connect_to_peer(self, peer: str) -> bool:
         if peer == self.address:
             return False
-        response = self._send_message(peer, Protocol.request_chain(), True)
-        if response and response.type == MessageType.RESPONSE_CHAIN:
+        if self._sync_with(peer):
             self.peers.add(peer)
-            self._process_message(response)
             return True
         return False
 
     def sync_blockchain(self) -> None:
         for peer in list(self.peers):
-            response = self._send_message(peer, Protocol.request_chain(), True)
-            if response and response.type == MessageType.RESPONSE_CHAIN:
-                self._process_message(response)
+            self._sync_with(peer)
 
     def broadcast_transaction(self, transaction: Transaction) -> bool:
         if not self.blockchain.add_transaction(transaction):
             return False
+        self._seen_transactions.add(transaction.id)
         self._broadcast(Protocol.new_transaction(transaction.to_dict()))
         return True
 
+    def broadcast_transactions(self, transactions: list[Transaction]) -> list[str | None]:
+        """Admite um lote local e repassa as aceitas de uma vez (ver Blockchain.add_transactions)."""
+        results = self.blockchain.add_transactions(transactions)
+        accepted = [tx for tx, result in zip(transactions, results) if result is None]
+        for transaction in accepted:
+            self._seen_transactions.add(transaction.id)
+        self._broadcast_transactions(accepted)
+        return results
+
     def broadcast_block(self, block: Block) -> bool:
         if not self.blockchain.add_block(block):
             return False
+        self._seen_blocks.add(block.hash)
         self._broadcast(Protocol.new_block(block.to_dict()))
         return True
 
+    def start_mining(self) -> bool:
+        """Liga a mineracao continua; False se ja estava ligada."""
+        if not self.mining_service.start():
+            return False
+        self.logger.info("Mineracao continua iniciada")
+        return True
+
+    def stop_mining(self) -> None:
+        if self.mining_service.running:
+            self.mining_service.stop()
+            self.logger.info("Mineracao continua parada")
+
+    def _on_mined_block(self, block: Block) -> None:
+        if self.broadcast_block(block):
+            self.logger.info("Bloco minerado #%s", block.index)
+
     def mine(self) -> Block | None:
         self.logger.info("Mineracao iniciada")
         block = self.miner.mine_block()
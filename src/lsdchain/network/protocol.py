@@ -2,17 +2,61 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import Any, Iterable, Iterator
 import json
+import socket
+
+from . import codec
+
+FRAME_HEADER_SIZE = 4
+# Maior frame aceito de um peer; o tamanho vem do cabecalho, que nao e confiavel
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+# Limite da primeira resposta a um pedido de blocos feito por este no: peers
+# antigos mandam a cadeia inteira num unico RESPONSE_CHAIN, que passa de
+# MAX_FRAME_SIZE em cadeias longas. O frame e lido em pedacos, entao a memoria
+# cresce com os bytes que chegam, nao com o tamanho anunciado.
+MAX_RESPONSE_FRAME_SIZE = 1024 * 1024 * 1024
+# Leitura de frames maiores que o buffer da conexao, em pedacos de ate este tamanho
+LARGE_FRAME_CHUNK = 1024 * 1024
+
+# Capacidades anunciadas no envelope (campo opcional "features")
+FEATURE_PERSISTENT = "persistent"
+FEATURE_INV = "inv"
+# Formato binario compacto (codec.py) e compressao zlib de frames grandes
+FEATURE_BINARY = "bin"
+FEATURE_ZLIB = "zlib"
+# Formatos de fio que um no pode habilitar (--wire) e as capacidades que cada um anuncia.
+# JSON e o padrao: o decodificador binario e Python puro e mais lento que o json em C,
+# entao bin/zlib so compensam quando a banda pesa mais que a CPU.
+WIRE_JSON = "json"
+WIRE_FORMATS: dict[str, tuple[str, ...]] = {
+    WIRE_JSON: (),
+    FEATURE_BINARY: (FEATURE_BINARY,),
+    FEATURE_ZLIB: (FEATURE_BINARY, FEATURE_ZLIB),
+}
 
 
 class MessageType(str, Enum):
     NEW_TRANSACTION = "NEW_TRANSACTION"
     NEW_BLOCK = "NEW_BLOCK"
+    # Lote de transacoes; com "ack": true o no responde TRANSACTIONS_ACK com o resultado de cada uma
+    NEW_TRANSACTIONS = "NEW_TRANSACTIONS"
+    TRANSACTIONS_ACK = "TRANSACTIONS_ACK"
     REQUEST_CHAIN = "REQUEST_CHAIN"
     RESPONSE_CHAIN = "RESPONSE_CHAIN"
+    # Sincronizacao incremental (localizador de blocos + lotes limitados)
+    REQUEST_BLOCKS = "REQUEST_BLOCKS"
+    RESPONSE_BLOCKS = "RESPONSE_BLOCKS"
+    # Cabecalho de resposta em streaming: seguido de `count` frames, um bloco JSON por frame
+    BLOCK_STREAM = "BLOCK_STREAM"
+    # Gossip por inventario: INV anuncia IDs, GETDATA pede os que faltam, DATA os entrega
+    INV = "INV"
+    GETDATA = "GETDATA"
+    DATA = "DATA"
+    # Metricas do no: pedido com payload vazio, resposta com "stats"
+    STATS = "STATS"
 
 
 @dataclass
@@ -20,32 +64,116 @@ class Message:
     type: MessageType
     payload: dict[str, Any]
     sender: str = ""
+    # Extensao opcional: capacidades do remetente. Peers antigos ignoram o campo.
+    features: list[str] = field(default_factory=list)
+
+    def _envelope(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "type": self.type.value,
+            "payload": self.payload,
+            "sender": self.sender,
+        }
+        if self.features:
+            data["features"] = self.features
+        return data
 
     def to_json(self) -> str:
-        return json.dumps(
-            {
-                "type": self.type.value,
-                "payload": self.payload,
-                "sender": self.sender,
-            },
-            sort_keys=True,
-        )
+        return json.dumps(self._envelope(), sort_keys=True)
 
-    def to_bytes(self) -> bytes:
-        body = self.to_json().encode("utf-8")
-        length = len(body)
-        return length.to_bytes(4, "big") + body
+    def to_bytes(self, binary: bool = False, compress: bool = False) -> bytes:
+        if binary:
+            return encode_frame(codec.dumps(self._envelope(), compress))
+        return encode_frame(self.to_json().encode("utf-8"))
 
     @classmethod
-    def from_bytes(cls, data: bytes) -> "Message":
-        parsed = json.loads(data.decode("utf-8"))
+    def from_bytes(cls, data: bytes | memoryview) -> "Message":
+        # JSON ou binario, conforme o primeiro byte do corpo
+        parsed = codec.loads(data)
         return cls(
             type=MessageType(parsed["type"]),
             payload=parsed["payload"],
             sender=parsed.get("sender", ""),
+            features=list(parsed.get("features", [])),
         )
 
 
+def wire_format(
+    features: Iterable[str], local: Iterable[str] = (FEATURE_BINARY, FEATURE_ZLIB)
+) -> tuple[bool, bool]:
+    """(binario, zlib) a usar com um peer: so o que ele anunciou e o no local habilitou."""
+    features = set(features).intersection(local)
+    binary = FEATURE_BINARY in features
+    return binary, binary and FEATURE_ZLIB in features
+
+
+def encode_frame(body: bytes) -> bytes:
+    """Framing do protocolo: [4 bytes tamanho big-endian][corpo]."""
+    return len(body).to_bytes(FRAME_HEADER_SIZE, "big") + body
+
+
+class FrameReader:
+    """Le frames de um socket para um buffer pre-alocado e reaproveitado.
+
+    Cada frame e devolvido como memoryview, valido ate a proxima leitura. Frames
+    maiores que o buffer (ate o limite, MAX_FRAME_SIZE por padrao) vao para um buffer proprio que
+    cresce conforme os bytes chegam e nao fica preso a conexao.
+    """
+
+    def __init__(self, sock: socket.socket, initial_size: int = 64 * 1024) -> None:
+        self._sock = sock
+        self._buffer = bytearray(initial_size)
+
+    def _fill(self, size: int) -> memoryview | None:
+        view = memoryview(self._buffer)[:size]
+        received = 0
+        while received < size:
+            count = self._sock.recv_into(view[received:])
+            if not count:
+                return None
+            received += count
+        return view
+
+    def _fill_large(self, size: int) -> memoryview | None:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self._sock.recv(min(size - len(data), LARGE_FRAME_CHUNK))
+            if not chunk:
+                return None
+            data += chunk
+        return memoryview(data)
+
+    def read_frame(self, limit: int = MAX_FRAME_SIZE) -> memoryview | None:
+        header = self._fill(FRAME_HEADER_SIZE)
+        if header is None:
+            return None
+        length = int.from_bytes(header, "big")
+        if length > limit:
+            raise ValueError(f"Frame de {length} bytes excede o limite de {limit}")
+        if length > len(self._buffer):
+            return self._fill_large(length)
+        return self._fill(length)
+
+
+@dataclass
+class StreamResponse:
+    """Resposta enviada em varios frames: o cabecalho e depois um frame por item.
+
+    Os itens sao serializados sob demanda, entao o remetente nunca monta a
+    resposta inteira em memoria.
+    """
+
+    header: Message
+    items: Iterable[dict[str, Any]]
+
+    def iter_frames(self, binary: bool = False, compress: bool = False) -> Iterator[bytes]:
+        yield self.header.to_bytes(binary, compress)
+        for item in self.items:
+            if binary:
+                yield encode_frame(codec.dumps(item, compress))
+            else:
+                yield encode_frame(json.dumps(item, sort_keys=True).encode("utf-8"))
+
+
 class Protocol:
     """Factory de mensagens do protocolo."""
 
@@ -56,6 +184,23 @@ class Protocol:
             payload={"transaction": transaction_dict},
         )
 
+    @staticmethod
+    def new_transactions(
+        transaction_dicts: list[dict[str, Any]], ack: bool = False
+    ) -> Message:
+        payload: dict[str, Any] = {"transactions": transaction_dicts}
+        if ack:
+            payload["ack"] = True
+        return Message(type=MessageType.NEW_TRANSACTIONS, payload=payload)
+
+    @staticmethod
+    def transactions_ack(results: list[str | None]) -> Message:
+        # um item por transacao do lote: null se aceita, senao o motivo da rejeicao
+        return Message(
+            type=MessageType.TRANSACTIONS_ACK,
+            payload={"results": results},
+        )
+
     @staticmethod
     def new_block(block_dict: dict[str, Any]) -> Message:
         return Message(
@@ -64,10 +209,11 @@ class Protocol:
         )
 
     @staticmethod
-    def request_chain() -> Message:
+    def request_chain(stream: bool = False) -> Message:
+        # peers sem suporte a streaming ignoram o campo e respondem RESPONSE_CHAIN
         return Message(
             type=MessageType.REQUEST_CHAIN,
-            payload={},
+            payload={"stream": True} if stream else {},
         )
 
     @staticmethod
@@ -76,3 +222,75 @@ class Protocol:
             type=MessageType.RESPONSE_CHAIN,
             payload={"blockchain": blockchain_dict},
         )
+
+    @staticmethod
+    def request_blocks(locator: list[str], limit: int, stream: bool = False) -> Message:
+        return Message(
+            type=MessageType.REQUEST_BLOCKS,
+            payload={"locator": locator, "limit": limit, "stream": stream},
+        )
+
+    @staticmethod
+    def response_blocks(
+        blocks: list[dict[str, Any]],
+        start: int,
+        more: bool,
+        pending_transactions: list[dict[str, Any]] | None = None,
+    ) -> Message:
+        return Message(
+            type=MessageType.RESPONSE_BLOCKS,
+            payload={
+                "blocks": blocks,
+                "start": start,
+                "more": more,
+                "pending_transactions": pending_transactions or [],
+            },
+        )
+
+    @staticmethod
+    def block_stream(
+        start: int,
+        count: int,
+        more: bool,
+        pending_transactions: list[dict[str, Any]] | None = None,
+    ) -> Message:
+        return Message(
+            type=MessageType.BLOCK_STREAM,
+            payload={
+                "start": start,
+                "count": count,
+                "more": more,
+                "pending_transactions": pending_transactions or [],
+            },
+        )
+
+    @staticmethod
+    def inv(transaction_ids: list[str], block_hashes: list[str]) -> Message:
+        return Message(
+            type=MessageType.INV,
+            payload={"transactions": transaction_ids, "blocks": block_hashes},
+        )
+
+    @staticmethod
+    def getdata(transaction_ids: list[str], block_hashes: list[str]) -> Message:
+        return Message(
+            type=MessageType.GETDATA,
+            payload={"transactions": transaction_ids, "blocks": block_hashes},
+        )
+
+    @staticmethod
+    def data(
+        transactions: list[dict[str, Any]], blocks: list[dict[str, Any]]
+    ) -> Message:
+        return Message(
+            type=MessageType.DATA,
+            payload={"transactions": transactions, "blocks": blocks},
+        )
+
+    @staticmethod
+    def stats(stats: dict[str, Any] | None = None) -> Message:
+        # sem argumento e o pedido; a resposta leva as metricas em "stats"
+        return Message(
+            type=MessageType.STATS,
+            payload={} if stats is None else {"stats": stats},
+        )
@@ -0,0 +1,274 @@
+"""API HTTP/JSON local, somente leitura, para consultar o no sem passar pelo menu."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from typing import Any, Callable, NamedTuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ..core.block import Block
+from ..core.blockchain import Blockchain
+
+CONTENT_TYPE = "application/json; charset=utf-8"
+# Blocos pelo hash nunca mudam; o resto pode mudar com novos blocos ou reorganizacoes
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Respostas imutaveis (blocos, transacoes confirmadas) ja serializadas
+CACHE_SIZE = 1024
+# Rotulos de endpoint nas metricas: conjunto fixo, o resto do caminho vem do cliente
+ENDPOINTS = frozenset({"tip", "blocks", "transactions", "addresses", "mempool"})
+UNKNOWN_ENDPOINT = "unknown"
+
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+    etag: str | None = None
+    cache_control: str = REVALIDATE
+
+
+class QueryError(Exception):
+    """Erro de consulta devolvido ao cliente com o status HTTP dado."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _digest_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _json(payload: Any) -> Response:
+    """Resposta de dado mutavel: ETag pelo conteudo, sempre revalidada."""
+    body = _encode(payload)
+    return Response(200, body, _digest_etag(body))
+
+
+def _matches(header: str | None, etag: str | None) -> bool:
+    """If-None-Match confere com a ETag (lista separada por virgulas, W/ ou *)."""
+    if not header or etag is None:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _page(query: dict[str, list[str]]) -> tuple[int, int]:
+    try:
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", [str(DEFAULT_PAGE_SIZE)])[0])
+    except ValueError:
+        raise QueryError(400, "offset e limit devem ser inteiros") from None
+    if offset < 0 or limit < 1:
+        raise QueryError(400, "offset >= 0 e limit >= 1")
+    return offset, min(limit, MAX_PAGE_SIZE)
+
+
+class QueryServer:
+    """Servidor HTTP em thread propria com consultas de leitura sobre a Blockchain.
+
+    - GET /tip
+    - GET /blocks/<altura ou hash>
+    - GET /transactions/<id>
+    - GET /addresses/<endereco>/balance
+    - GET /addresses/<endereco>/history?offset=&limit=
+    - GET /mempool?offset=&limit=
+
+    Tudo sai dos indices da Blockchain e da versao publicada da cadeia (sem
+    lock). Toda resposta leva ETag e If-None-Match devolve 304; blocos e
+    transacoes confirmadas ficam serializados num cache LRU pelo hash do bloco.
+    """
+
+    def __init__(self, blockchain: Blockchain, host: str = "127.0.0.1", port: int = 8080) -> None:
+        self.blockchain = blockchain
+        self.metrics = blockchain.metrics
+        self.host = host
+        self.port = port
+        self._cache: OrderedDict[str, Response] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    def start(self) -> None:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                response = server.respond(self.path, self.headers.get("If-None-Match"))
+                self.send_response(response.status)
+                if response.etag is not None:
+                    self.send_header("ETag", response.etag)
+                self.send_header("Cache-Control", response.cache_control)
+                if response.status == 304:
+                    self.end_headers()
+                    return
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                self.wfile.write(response.body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                return
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        # porta 0: o sistema escolhe uma livre
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def respond(self, path: str, if_none_match: str | None = None) -> Response:
+        """Resolve um GET (caminho com query string) sem depender do transporte HTTP."""
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        query = parse_qs(url.query)
+        endpoint = parts[0] if parts and parts[0] in ENDPOINTS else UNKNOWN_ENDPOINT
+        try:
+            response = self._route(parts, query)
+        except QueryError as exc:
+            response = Response(exc.status, _encode({"error": str(exc)}))
+        self.metrics.inc("lsd_api_requests_total", endpoint=endpoint, status=response.status)
+        if response.status == 200 and _matches(if_none_match, response.etag):
+            return Response(304, b"", response.etag, response.cache_control)
+        return response
+
+    def _route(self, parts: list[str], query: dict[str, list[str]]) -> Response:
+        if parts == ["tip"]:
+            return self._tip()
+        if len(parts) == 2 and parts[0] == "blocks":
+            return self._block(parts[1])
+        if len(parts) == 2 and parts[0] == "transactions":
+            return self._transaction(parts[1])
+        if len(parts) == 3 and parts[0] == "addresses" and parts[2] == "balance":
+            return self._balance(parts[1])
+        if len(parts) == 3 and parts[0] == "addresses" and parts[2] == "history":
+            return self._history(parts[1], *_page(query))
+        if parts == ["mempool"]:
+            return self._mempool(*_page(query))
+        raise QueryError(404, "endpoint desconhecido")
+
+    def _cached(self, key: str, build: Callable[[], Response]) -> Response:
+        with self._cache_lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+        if response is not None:
+            self.metrics.inc("lsd_api_cache_hits_total")
+            return response
+        response = build()
+        with self._cache_lock:
+            self._cache[key] = response
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return response
+
+    def _tip(self) -> Response:
+        tip = self.blockchain.snapshot().tip
+        body = _encode({
+            "height": tip.index,
+            "hash": tip.hash,
+            "timestamp": tip.timestamp,
+            "transactions": len(tip.transactions),
+        })
+        return Response(200, body, f'"{tip.hash}"')
+
+    def _block(self, key: str) -> Response:
+        view = self.blockchain.snapshot()
+        if key.isdigit() and len(key) < 64:
+            height = int(key)
+            if height >= view.length:
+                raise QueryError(404, "altura alem da ponta")
+            block = view[height]
+            # a altura pode apontar para outro bloco depois de uma reorganizacao
+            return self._block_response(block)._replace(cache_control=REVALIDATE)
+        block = self.blockchain.get_block(key)
+        if block is None:
+            raise QueryError(404, "bloco nao esta na cadeia principal")
+        return self._block_response(block)
+
+    def _block_response(self, block: Block) -> Response:
+        return self._cached(
+            f"block:{block.hash}",
+            lambda: Response(200, _encode(block.to_dict()), f'"{block.hash}"', IMMUTABLE),
+        )
+
+    def _transaction(self, tx_id: str) -> Response:
+        found = self.blockchain.find_transaction(tx_id)
+        if found is None:
+            raise QueryError(404, "transacao desconhecida")
+        tx, height = found
+        view = self.blockchain.snapshot()
+        if height is None or height >= view.length:
+            return _json({"transaction": tx.to_dict(), "status": "pending"})
+        block = view[height]
+
+        def build() -> Response:
+            body = _encode({
+                "transaction": tx.to_dict(),
+                "status": "confirmed",
+                "height": height,
+                "block_hash": block.hash,
+            })
+            # confirmada num bloco: muda so se o bloco sair da cadeia (revalidada pela ETag)
+            return Response(200, body, f'"{tx_id}:{block.hash}"')
+
+        return self._cached(f"tx:{tx_id}:{block.hash}", build)
+
+    def _balance(self, address: str) -> Response:
+        view = self.blockchain.snapshot()
+        confirmed = view.get_balance(address)
+        pending = self.blockchain.mempool.delta(address)
+        summary = self.blockchain.address_summary(address)
+        return _json({
+            "address": address,
+            "height": view.height,
+            "confirmed": confirmed,
+            "received": summary.received,
+            "sent": summary.sent,
+            "pending": pending,
+            "balance": confirmed + pending,
+        })
+
+    def _history(self, address: str, offset: int, limit: int) -> Response:
+        summary = self.blockchain.address_summary(address)
+        entries = self.blockchain.address_history(address, offset, limit)
+        return _json({
+            "address": address,
+            "total": summary.transactions,
+            "received": summary.received,
+            "sent": summary.sent,
+            "offset": offset,
+            "limit": limit,
+            "more": offset + limit < summary.transactions,
+            "items": [
+                {"height": height, "transaction": tx.to_dict()}
+                for height, tx in entries
+            ],
+        })
+
+    def _mempool(self, offset: int, limit: int) -> Response:
+        mempool = self.blockchain.mempool
+        return _json({
+            "count": len(mempool),
+            "bytes": mempool.bytes,
+            "offset": offset,
+            "limit": limit,
+            "items": [tx.to_dict() for tx in mempool.page(offset, limit)],
+        })
@@ -0,0 +1,53 @@
+"""Utilitarios compartilhados pelos testes (rodar com `python -m unittest discover -s tests`)."""
+
+from __future__ import annotations
+
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from lsdchain.core.block import Block, BlockHashTemplate
+from lsdchain.core.blockchain import COINBASE_REWARD, COINBASE_SENDER, DIFFICULTY_PREFIX, Blockchain
+from lsdchain.core.mining import Miner
+from lsdchain.core.transaction import Transaction
+
+
+def mine(blockchain: Blockchain, transactions: list[Transaction] = (), miner: str = "minerador") -> Block:
+    """Admite as transacoes, minera um bloco sobre a ponta e anexa-o."""
+    for tx in transactions:
+        assert blockchain.add_transaction(tx), tx
+    block = Miner(blockchain, miner).mine_block()
+    assert blockchain.add_block(block)
+    return block
+
+
+def make_block(
+    parent: Block, transactions: list[Transaction] = (), miner: str = "minerador"
+) -> Block:
+    """Bloco valido (coinbase + transacoes, PoW resolvido) sobre qualquer pai."""
+    timestamp = time.time()
+    coinbase = Transaction(COINBASE_SENDER, miner, COINBASE_REWARD, timestamp=timestamp)
+    block = Block(parent.index + 1, parent.hash, [coinbase, *transactions], timestamp=timestamp)
+    template = BlockHashTemplate(block)
+    nonce = 0
+    while not template.hash_for(nonce).startswith(DIFFICULTY_PREFIX):
+        nonce += 1
+    block.nonce, block.hash = nonce, template.hash_for(nonce)
+    return block
+
+
+def make_branch(parent: Block, count: int, miner: str = "outro") -> list[Block]:
+    blocks: list[Block] = []
+    for _ in range(count):
+        parent = make_block(parent, miner=miner)
+        blocks.append(parent)
+    return blocks
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,58 @@
+"""AsyncNode: sincronizacao pelo event loop e chamadas bloqueantes com timeout."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import unittest
+
+from common import free_port, mine
+from lsdchain.network.async_node import AsyncNode
+
+
+class AsyncNodeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.nodes: list[AsyncNode] = []
+
+    def tearDown(self) -> None:
+        for node in self.nodes:
+            node.stop()
+        logging.disable(logging.NOTSET)
+
+    def _node(self) -> AsyncNode:
+        node = AsyncNode("127.0.0.1", free_port())
+        node.start()
+        self.nodes.append(node)
+        return node
+
+    def test_sync_between_async_nodes(self) -> None:
+        source, follower = self._node(), self._node()
+        for _ in range(3):
+            mine(source.blockchain)
+        self.assertTrue(follower.connect_to_peer(source.address))
+        self.assertEqual(follower.blockchain.last_block.hash, source.blockchain.last_block.hash)
+
+    def test_call_timeout_cancels_the_coroutine(self) -> None:
+        node = self._node()
+        node.CALL_TIMEOUT = 0.05
+        cancelled = asyncio.Event()
+
+        async def stuck() -> None:
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def wait_cancelled() -> None:
+            await asyncio.wait_for(cancelled.wait(), 5)
+
+        with self.assertRaises(TimeoutError):
+            node._call(stuck())
+        node.CALL_TIMEOUT = 5.0
+        node._call(wait_cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Saldos em camadas: versoes publicadas imutaveis e custo por bloco limitado."""
+
+from __future__ import annotations
+
+import unittest
+
+from common import make_block, mine
+from lsdchain.core.balances import BalanceMap
+from lsdchain.core.blockchain import Blockchain
+from lsdchain.core.transaction import Transaction
+
+
+class BalanceMapTest(unittest.TestCase):
+    def test_published_views_never_change(self) -> None:
+        balances = BalanceMap({"alice": 10.0})
+        first = balances.publish()
+        balances["alice"] = 7.0
+        balances["bob"] = 3.0
+        self.assertEqual(balances.get("alice"), 7.0)
+        self.assertEqual(dict(first), {"alice": 10.0})
+        second = balances.publish()
+        balances["bob"] = 0.0
+        self.assertEqual(dict(second), {"alice": 7.0, "bob": 3.0})
+        self.assertEqual(balances.publish().to_dict(), {"alice": 7.0, "bob": 0.0})
+        self.assertEqual(second.get("carol", 0.0), 0.0)
+        self.assertNotIn("carol", second)
+
+    def test_fork_is_independent(self) -> None:
+        balances = BalanceMap({"alice": 10.0})
+        balances["bob"] = 1.0
+        fork = balances.fork()
+        fork["bob"] = 5.0
+        self.assertEqual(balances.get("bob"), 1.0)
+        self.assertEqual(fork.publish().to_dict(), {"alice": 10.0, "bob": 5.0})
+
+    def test_layers_stay_logarithmic(self) -> None:
+        balances = BalanceMap({f"base{i}": 1.0 for i in range(5000)})
+        for i in range(3000):
+            balances[f"novo{i % 700}"] = float(i)
+            view = balances.publish()
+            self.assertLessEqual(view.depth, 14)
+        self.assertEqual(len(view), 5700)
+        self.assertEqual(view["novo699"], 2799.0)
+
+
+class SnapshotBalancesTest(unittest.TestCase):
+    def test_add_block_only_adds_the_touched_accounts(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        mine(blockchain, miner="alice")
+        before = blockchain.snapshot()
+        block = make_block(blockchain.last_block, [Transaction("alice", "bob", 5.0)])
+        self.assertTrue(blockchain.add_block(block))
+        after = blockchain.snapshot().balances
+        # a versao anterior e a nova compartilham as camadas antigas
+        self.assertEqual(before.get_balance("alice"), 50.0)
+        self.assertEqual(after["alice"], 45.0)
+        self.assertEqual(after["bob"], 5.0)
+        self.assertEqual(after["minerador"], 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Formato binario e zlib: ida e volta identica ao JSON e negociacao por peer."""
+
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import unittest
+
+from common import mine
+from lsdchain.core.blockchain import Blockchain
+from lsdchain.core.transaction import Transaction
+from lsdchain.network import codec
+from lsdchain.network.protocol import (
+    FEATURE_BINARY,
+    FEATURE_ZLIB,
+    MAX_FRAME_SIZE,
+    MAX_RESPONSE_FRAME_SIZE,
+    WIRE_FORMATS,
+    FrameReader,
+    Message,
+    MessageType,
+    Protocol,
+    wire_format,
+)
+
+
+def _body(frame: bytes) -> bytes:
+    return frame[4:]
+
+
+class CodecTest(unittest.TestCase):
+    def test_values_round_trip(self) -> None:
+        values = [
+            None, True, False, 0, -1, 2**40, -(2**70), 1.5, -0.0, "", "texto", "ação",
+            "0" * 64, "ABCDEF" * 10 + "abcd", "123e4567-e89b-12d3-a456-426614174000",
+            [], {}, [1, "a", None], {"x": {"y": [1.0, 2]}, "type": "NEW_BLOCK", "ab": "ab"},
+            [{"a": 1, "b": "x"}, {"a": 2.5, "b": "x"}, {"a": None, "b": "y"}],
+            [{"a": 1}, {"b": 2}],
+        ]
+        for value in values:
+            for compress in (False, True):
+                with self.subTest(value=value, compress=compress):
+                    self.assertEqual(codec.loads(codec.dumps(value, compress)), value)
+
+    def test_chain_response_round_trip(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        mine(blockchain, miner="alice")
+        mine(blockchain, [Transaction("alice", f"dest{i}", 0.5) for i in range(40)])
+        blockchain.add_transaction(Transaction("alice", "bob", 1))
+        message = Protocol.response_chain(blockchain.to_dict())
+        message.sender = "127.0.0.1:5000"
+        expected = json.loads(message.to_json())
+        sizes = {}
+        for wire, (binary, compress) in {
+            "json": (False, False), "bin": (True, False), "zlib": (True, True)
+        }.items():
+            frame = message.to_bytes(binary, compress)
+            sizes[wire] = len(frame)
+            decoded = Message.from_bytes(_body(frame))
+            self.assertEqual(decoded.type, MessageType.RESPONSE_CHAIN)
+            self.assertEqual(json.loads(decoded.to_json()), expected)
+            chain = decoded.payload["blockchain"]["chain"]
+            self.assertTrue(Blockchain(validation_workers=1).is_valid_chain(
+                [type(blockchain.chain[0]).from_dict(block) for block in chain]
+            ))
+        self.assertLess(sizes["bin"], sizes["json"])
+        self.assertLess(sizes["zlib"], sizes["bin"])
+
+    def test_json_frames_still_decode(self) -> None:
+        frame = Protocol.request_chain().to_bytes()
+        self.assertEqual(Message.from_bytes(_body(frame)).type, MessageType.REQUEST_CHAIN)
+
+    def test_malformed_bodies_raise_codec_error(self) -> None:
+        body = codec.dumps({"blocks": ["0" * 64] * 3})
+        for bad in (b"", body[:-1], body + b"\x00", bytes([codec.MAGIC_ZLIB]) + b"lixo"):
+            with self.subTest(bad=bad):
+                with self.assertRaises(ValueError):
+                    codec.loads(bad)
+
+    def test_wire_format_uses_what_both_sides_enable(self) -> None:
+        everything = (FEATURE_BINARY, FEATURE_ZLIB)
+        self.assertEqual(wire_format([], everything), (False, False))
+        self.assertEqual(wire_format([FEATURE_BINARY], everything), (True, False))
+        self.assertEqual(wire_format(everything, everything), (True, True))
+        self.assertEqual(wire_format(everything, WIRE_FORMATS["json"]), (False, False))
+        self.assertEqual(wire_format(everything, WIRE_FORMATS["bin"]), (True, False))
+        self.assertEqual(wire_format([FEATURE_ZLIB], everything), (False, False))
+
+
+class FrameReaderTest(unittest.TestCase):
+    def test_response_limit_accepts_legacy_chain_frames(self) -> None:
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+        size = MAX_FRAME_SIZE + 16
+        header = size.to_bytes(4, "big")
+        sender = threading.Thread(target=right.sendall, args=(header + b"x" * size,))
+        sender.start()
+        body = FrameReader(left).read_frame(MAX_RESPONSE_FRAME_SIZE)
+        sender.join()
+        self.assertEqual(len(body), size)
+
+        right.sendall(header)
+        with self.assertRaises(ValueError):
+            FrameReader(left).read_frame()
+
+
+if __name__ == "__main__":
+    unittest.main()
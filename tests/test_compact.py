@@ -0,0 +1,40 @@
+"""Modo compacto x modo normal: mesmos blocos, mesmos hashes."""
+
+from __future__ import annotations
+
+import unittest
+
+from common import mine
+from lsdchain.core.block import Block
+from lsdchain.core.blockchain import Blockchain
+from lsdchain.core.transaction import Transaction
+
+
+class CompactHashTest(unittest.TestCase):
+    def test_same_hashes_with_int_values(self) -> None:
+        normal = Blockchain(validation_workers=1)
+        compact = Blockchain(validation_workers=1, compact=True)
+        # valores inteiros (como chegam de um JSON "valor": 1) no meio de floats
+        mine(normal)
+        mine(normal, [Transaction("minerador", "alice", 1), Transaction("minerador", "bob", 2.5)])
+        mine(normal, [Transaction("alice", "bob", 1, timestamp=1700000000)])
+        for block in normal.chain[1:]:
+            self.assertTrue(compact.add_block(Block.from_dict(block.to_dict())))
+
+        self.assertEqual([b.hash for b in compact.chain], [b.hash for b in normal.chain])
+        for block in compact.chain[1:]:
+            self.assertEqual(block.calculate_hash(), block.hash)
+        self.assertTrue(normal.is_valid_chain(normal.chain))
+        self.assertTrue(compact.is_valid_chain(compact.chain))
+        self.assertEqual(compact.to_dict(), normal.to_dict())
+
+    def test_int_values_survive_json_round_trip(self) -> None:
+        tx = Transaction("alice", "bob", 3, timestamp=1700000000)
+        block = Block(1, "0" * 64, [tx], timestamp=1700000000.0)
+        block.hash = block.calculate_hash()
+        copy = Block.from_dict(block.to_dict())
+        self.assertEqual(copy.calculate_hash(), block.hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
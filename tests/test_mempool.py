@@ -0,0 +1,100 @@
+"""Mempool: limites, cascatas de eviction e templates de bloco."""
+
+from __future__ import annotations
+
+import unittest
+
+import common  # noqa: F401  (coloca src/ no path)
+from lsdchain.core.mempool import Mempool, estimate_size
+from lsdchain.core.transaction import Transaction
+
+
+class MempoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.confirmed = {"alice": 10.0}
+        self.pool = Mempool(lambda address: self.confirmed.get(address, 0.0))
+
+    def test_add_tracks_deltas_and_rejects_duplicates(self) -> None:
+        tx = Transaction("alice", "bob", 4.0)
+        self.assertTrue(self.pool.add(tx))
+        self.assertFalse(self.pool.add(tx))
+        self.assertEqual(len(self.pool), 1)
+        self.assertIn(tx.id, self.pool)
+        self.assertEqual(self.pool.delta("alice"), -4.0)
+        self.assertEqual(self.pool.delta("bob"), 4.0)
+        self.assertEqual(self.pool.pending_spend("alice"), 4.0)
+        self.assertEqual(self.pool.bytes, estimate_size(tx))
+
+    def test_remove_is_by_id_and_empties_state(self) -> None:
+        txs = [Transaction("alice", "bob", 1.0) for _ in range(3)]
+        for tx in txs:
+            self.pool.add(tx)
+        removed = self.pool.remove([txs[1].id, "desconhecido"])
+        self.assertEqual(removed, [txs[1]])
+        self.assertEqual(self.pool.transactions(), [txs[0], txs[2]])
+        self.pool.remove(tx.id for tx in txs)
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(self.pool.bytes, 0)
+        self.assertEqual(self.pool.delta("alice"), 0.0)
+        self.assertEqual(self.pool.senders(), [])
+
+    def test_count_limit_evicts_oldest_and_dependent_spends(self) -> None:
+        self.pool.max_count = 2
+        funding = Transaction("alice", "bob", 5.0)
+        spend = Transaction("bob", "carol", 5.0)  # so tem saldo por causa de `funding`
+        self.pool.add(funding)
+        self.pool.add(spend)
+        newest = Transaction("alice", "dave", 1.0)
+        self.assertTrue(self.pool.add(newest))
+        # `funding` saiu por ser a mais antiga e levou junto o gasto de bob
+        self.assertEqual(self.pool.transactions(), [newest])
+        self.assertEqual(self.pool.evicted, 2)
+        self.assertEqual(self.pool.delta("bob"), 0.0)
+
+    def test_byte_limit(self) -> None:
+        txs = [Transaction("alice", f"dest{i}", 1.0) for i in range(4)]
+        self.pool.max_bytes = sum(estimate_size(tx) for tx in txs[:3])
+        for tx in txs:
+            self.pool.add(tx)
+        self.assertEqual(self.pool.transactions(), txs[1:])
+        self.assertLessEqual(self.pool.bytes, self.pool.max_bytes)
+
+    def test_add_reports_when_the_new_transaction_did_not_fit(self) -> None:
+        self.pool.max_bytes = 1
+        self.assertFalse(self.pool.add(Transaction("alice", "bob", 1.0)))
+        self.assertEqual(len(self.pool), 0)
+
+    def test_settle_drops_spends_left_without_balance(self) -> None:
+        first = Transaction("alice", "bob", 6.0)
+        second = Transaction("alice", "carol", 4.0)
+        self.pool.add(first)
+        self.pool.add(second)
+        # um bloco confirmou outro gasto de alice: sobraram so 7
+        self.confirmed["alice"] = 7.0
+        self.assertEqual(self.pool.settle(["alice"]), 1)
+        self.assertEqual(self.pool.transactions(), [first])
+
+    def test_block_template_respects_limits_and_balances(self) -> None:
+        first = Transaction("alice", "bob", 8.0)
+        overdraft = Transaction("alice", "carol", 8.0)  # entrou antes de outra mudanca no saldo
+        self.pool.add(first)
+        self.pool.add(overdraft)
+        self.pool.add(Transaction("bob", "dave", 3.0))
+        template = self.pool.block_template(max_count=10, max_bytes=10**6)
+        self.assertEqual([tx.origem for tx in template], ["alice", "bob"])
+        self.assertEqual(len(self.pool.block_template(max_count=1, max_bytes=10**6)), 1)
+        self.assertEqual(self.pool.block_template(max_count=10, max_bytes=1), [])
+
+    def test_page_and_replace(self) -> None:
+        txs = [Transaction("alice", "bob", 0.5) for _ in range(5)]
+        for tx in txs:
+            self.pool.add(tx)
+        self.assertEqual(self.pool.page(1, 2), txs[1:3])
+        self.assertEqual(self.pool.page(4, 10), txs[4:])
+        self.pool.replace(txs[:2] + txs[:1])
+        self.assertEqual(self.pool.transactions(), txs[:2])
+        self.assertAlmostEqual(self.pool.delta("alice"), -1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
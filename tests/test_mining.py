@@ -0,0 +1,45 @@
+"""Mineracao: busca sequencial e workers paralelos reaproveitados entre blocos."""
+
+from __future__ import annotations
+
+import unittest
+
+from common import mine
+from lsdchain.core.blockchain import DIFFICULTY_PREFIX, Blockchain
+from lsdchain.core.mining import Miner
+from lsdchain.core.transaction import Transaction
+
+
+class MinerTest(unittest.TestCase):
+    def test_block_includes_coinbase_and_pending(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        mine(blockchain, miner="alice")
+        tx = Transaction("alice", "bob", 5.0)
+        blockchain.add_transaction(tx)
+        block = Miner(blockchain, "minerador").mine_block()
+        self.assertTrue(block.hash.startswith(DIFFICULTY_PREFIX))
+        self.assertEqual(block.transactions[0].destino, "minerador")
+        self.assertEqual(block.transactions[1:], [tx])
+        self.assertTrue(blockchain.add_block(block))
+        self.assertEqual(blockchain.pending_transactions, [])
+
+    def test_parallel_workers_survive_between_blocks(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        miner = Miner(blockchain, "minerador", workers=2)
+        self.addCleanup(miner.close)
+        self.assertTrue(blockchain.add_block(miner.mine_block()))
+        pids = [process.pid for process in miner._search._processes]
+        for _ in range(3):
+            self.assertTrue(blockchain.add_block(miner.mine_block()))
+        self.assertEqual([process.pid for process in miner._search._processes], pids)
+        self.assertTrue(blockchain.is_valid_chain(blockchain.chain))
+        self.assertGreater(blockchain.metrics.value("lsd_miner_hashes_total"), 0)
+
+        search = miner._search
+        miner.close()
+        self.assertIsNone(miner._search)
+        self.assertFalse(any(process.is_alive() for process in search._processes))
+
+
+if __name__ == "__main__":
+    unittest.main()
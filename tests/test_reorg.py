@@ -0,0 +1,153 @@
+"""Arvore de blocos: ramos laterais, orfaos e reorganizacao da cadeia principal."""
+
+from __future__ import annotations
+
+from concurrent.futures.process import BrokenProcessPool
+import unittest
+from unittest import mock
+
+from common import make_block, make_branch, mine
+from lsdchain.core import blockchain as blockchain_module
+from lsdchain.core.blockchain import (
+    ACCEPTED,
+    BLOCK_ORPHAN,
+    BLOCK_SIDE,
+    REJECT_BLOCK_DUPLICATE,
+    REJECT_BLOCK_HEADER,
+    REJECT_BLOCK_TRANSACTIONS,
+    Blockchain,
+)
+from lsdchain.core.transaction import Transaction
+
+
+class ReorgTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.blockchain = Blockchain(validation_workers=1)
+        mine(self.blockchain, miner="alice")
+        self.fork = self.blockchain.last_block
+
+    def test_longer_side_branch_becomes_main_chain(self) -> None:
+        payment = Transaction("alice", "bob", 10.0)
+        mined = mine(self.blockchain, [payment])
+        branch = make_branch(self.fork, 2)
+
+        self.assertEqual(self.blockchain.process_block(branch[0]), BLOCK_SIDE)
+        self.assertEqual(self.blockchain.last_block, mined)
+        self.assertEqual(self.blockchain.process_block(branch[1]), ACCEPTED)
+
+        self.assertEqual(list(self.blockchain.chain[2:]), branch)
+        self.assertTrue(self.blockchain.is_valid_chain(self.blockchain.chain))
+        self.assertEqual(self.blockchain.get_block(mined.hash), None)
+        self.assertIn(mined.hash, self.blockchain.tree)
+        # a transacao do bloco abandonado volta para o pool; a coinbase dele nao
+        self.assertEqual(self.blockchain.pending_transactions, [payment])
+        self.assertEqual(self.blockchain.snapshot().get_balance("minerador"), 0.0)
+        self.assertEqual(self.blockchain.snapshot().get_balance("outro"), 100.0)
+        self.assertEqual(self.blockchain.metrics.value("lsd_reorgs_total"), 1)
+
+    def test_switching_back_restores_state(self) -> None:
+        mined = mine(self.blockchain)
+        branch = make_branch(self.fork, 2)
+        for block in branch:
+            self.blockchain.process_block(block)
+        follow = make_branch(mined, 2, miner="terceiro")
+        self.assertEqual(self.blockchain.process_block(follow[0]), BLOCK_SIDE)
+        self.assertEqual(self.blockchain.process_block(follow[1]), ACCEPTED)
+        self.assertEqual(list(self.blockchain.chain[2:]), [mined, *follow])
+        self.assertEqual(self.blockchain.snapshot().get_balance("outro"), 0.0)
+        self.assertEqual(self.blockchain.snapshot().get_balance("terceiro"), 100.0)
+        self.assertEqual(self.blockchain.snapshot().get_balance("minerador"), 50.0)
+
+    def test_orphans_connect_when_parent_arrives(self) -> None:
+        branch = make_branch(self.blockchain.last_block, 3)
+        self.assertEqual(self.blockchain.process_block(branch[2]), BLOCK_ORPHAN)
+        self.assertEqual(self.blockchain.process_block(branch[1]), BLOCK_ORPHAN)
+        self.assertEqual(self.blockchain.process_block(branch[1]), BLOCK_ORPHAN)
+        self.assertEqual(self.blockchain.process_block(branch[0]), ACCEPTED)
+        self.assertEqual(self.blockchain.last_block, branch[2])
+        self.assertEqual(self.blockchain.tree.orphan_count, 0)
+        self.assertEqual(self.blockchain.process_block(branch[0]), REJECT_BLOCK_DUPLICATE)
+
+    def test_invalid_branch_is_dropped_and_chain_kept(self) -> None:
+        mined = mine(self.blockchain)
+        before = dict(self.blockchain.snapshot().balances)
+        first = make_block(self.fork, miner="outro")
+        # gasto sem saldo: so e detectado quando o ramo passa a ser o mais longo
+        second = make_block(first, [Transaction("ninguem", "outro", 5.0)], miner="outro")
+        third = make_block(second, miner="outro")
+        self.assertEqual(self.blockchain.process_block(first), BLOCK_SIDE)
+        self.assertEqual(self.blockchain.process_block(third), BLOCK_ORPHAN)
+        self.assertEqual(self.blockchain.process_block(second), REJECT_BLOCK_TRANSACTIONS)
+        self.assertEqual(self.blockchain.last_block, mined)
+        self.assertEqual(dict(self.blockchain.snapshot().balances), before)
+        self.assertNotIn(second.hash, self.blockchain.tree)
+        self.assertNotIn(third.hash, self.blockchain.tree)
+
+    def test_tampered_block_is_rejected(self) -> None:
+        block = make_block(self.blockchain.last_block)
+        block.nonce += 1
+        self.assertEqual(self.blockchain.process_block(block), REJECT_BLOCK_HEADER)
+
+    def test_published_snapshot_is_not_changed_by_reorg(self) -> None:
+        mined = mine(self.blockchain)
+        view = self.blockchain.snapshot()
+        for block in make_branch(self.fork, 2):
+            self.blockchain.process_block(block)
+        self.assertEqual(view.tip, mined)
+        self.assertEqual(view.get_balance("minerador"), 50.0)
+        self.assertEqual(view.get_balance("outro"), 0.0)
+
+
+class ReplaceChainTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.blockchain = Blockchain(validation_workers=1)
+        for _ in range(4):
+            mine(self.blockchain)
+
+    def test_full_chain(self) -> None:
+        chain = [*self.blockchain.chain[:3], *make_branch(self.blockchain.chain[2], 3)]
+        self.assertTrue(self.blockchain.replace_chain(chain))
+        self.assertEqual([b.hash for b in self.blockchain.chain], [b.hash for b in chain])
+        self.assertFalse(self.blockchain.replace_chain(chain[:-1]))
+
+    def test_branch_from_fork_height(self) -> None:
+        prefix = list(self.blockchain.chain[:3])
+        branch = make_branch(prefix[-1], 3)
+        self.assertFalse(self.blockchain.replace_chain(branch[:2], start=3))  # nao e mais longa
+        self.assertFalse(self.blockchain.replace_chain(branch, start=2))  # altura errada
+        self.assertFalse(self.blockchain.replace_chain(branch[1:], start=4))  # pai desconhecido
+        self.assertTrue(self.blockchain.replace_chain(branch, start=3))
+        self.assertEqual(list(self.blockchain.chain), [*prefix, *branch])
+        self.assertEqual(self.blockchain.snapshot().get_balance("outro"), 150.0)
+
+    def test_branch_overlapping_local_blocks(self) -> None:
+        chain = self.blockchain.chain
+        branch = make_branch(chain[4], 2)
+        # blocos 3 e 4 ja sao locais: so os novos entram
+        self.assertTrue(self.blockchain.replace_chain([chain[3], chain[4], *branch], start=3))
+        self.assertEqual(list(self.blockchain.chain[5:]), branch)
+
+
+class _BrokenPool:
+    """Pool cujos workers morreram ao subir (ex.: script sem guarda de __main__)."""
+
+    def submit(self, *args: object) -> None:
+        raise BrokenProcessPool("worker morreu")
+
+    def shutdown(self, **kwargs: object) -> None:
+        pass
+
+
+class ValidationPoolTest(unittest.TestCase):
+    def test_broken_pool_falls_back_to_serial_and_is_counted(self) -> None:
+        blockchain = Blockchain(validation_workers=2)
+        chain = [blockchain.chain[0], *make_branch(blockchain.chain[0], 4)]
+        broken = mock.patch.object(blockchain_module, "_get_validation_pool", return_value=_BrokenPool())
+        with mock.patch.object(blockchain_module, "PARALLEL_VALIDATION_MIN_BLOCKS", 2), broken:
+            self.assertTrue(blockchain.is_valid_chain(chain))
+            self.assertTrue(blockchain.replace_chain(chain))
+        self.assertEqual(blockchain.metrics.value("lsd_validation_pool_failures_total"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+"""BlockStore/SnapshotStore: reinicio do no a partir do disco."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import unittest
+
+from common import make_branch, mine
+from lsdchain.core.blockchain import Blockchain
+from lsdchain.core.mining import Miner
+from lsdchain.core.storage import BlockStore, SnapshotStore, StoredChain
+from lsdchain.core.transaction import Transaction
+
+
+class BlockStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_append_read_and_truncate(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        for _ in range(3):
+            mine(blockchain)
+        store = BlockStore(self.data_dir)
+        for block in blockchain.chain:
+            store.append(block)
+        with self.assertRaises(ValueError):
+            store.append(blockchain.chain[1])
+        store.close()
+
+        store = BlockStore(self.data_dir)
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.read(2).hash, blockchain.chain[2].hash)
+        self.assertEqual([b.hash for b in store.load(1, 3)], [b.hash for b in blockchain.chain[1:3]])
+        store.truncate(2)
+        self.assertEqual(len(store), 2)
+        store.append(blockchain.chain[2])
+        self.assertEqual(store.read(2).hash, blockchain.chain[2].hash)
+        store.close()
+
+    def test_partial_write_is_discarded(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        mine(blockchain)
+        store = BlockStore(self.data_dir)
+        for block in blockchain.chain:
+            store.append(block)
+        store.close()
+        # queda no meio do append seguinte: registro incompleto e entrada de indice orfa
+        with open(os.path.join(self.data_dir, BlockStore.SEGMENT_FILE), "ab") as handle:
+            handle.write((1000).to_bytes(4, "big") + b'{"index":')
+        with open(os.path.join(self.data_dir, BlockStore.INDEX_FILE), "ab") as handle:
+            handle.write((10**6).to_bytes(8, "big"))
+        store = BlockStore(self.data_dir)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.read(1).hash, blockchain.chain[1].hash)
+        store.close()
+
+
+class RestartTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _open(
+        self, snapshots: bool = True, compact: bool = False, interval: int = 3
+    ) -> Blockchain:
+        return Blockchain(
+            store=BlockStore(self.data_dir),
+            snapshots=SnapshotStore(self.data_dir) if snapshots else None,
+            snapshot_interval=interval,
+            validation_workers=1,
+            compact=compact,
+        )
+
+    def _fill(self, blockchain: Blockchain) -> list[Transaction]:
+        payments: list[Transaction] = []
+        mine(blockchain, miner="alice")
+        for i in range(7):
+            tx = Transaction("alice", f"dest{i % 3}", 1.5)
+            payments.append(tx)
+            mine(blockchain, [tx])
+        return payments
+
+    def _assert_same(self, loaded: Blockchain, original: Blockchain, payments: list[Transaction]) -> None:
+        self.assertEqual([b.hash for b in loaded.chain], [b.hash for b in original.chain])
+        self.assertEqual(dict(loaded.snapshot().balances), dict(original.snapshot().balances))
+        for tx in payments:
+            self.assertEqual(loaded.find_transaction(tx.id), original.find_transaction(tx.id))
+        for address in ("alice", "dest0", "minerador"):
+            self.assertEqual(loaded.address_summary(address), original.address_summary(address))
+            self.assertEqual(loaded.address_history(address), original.address_history(address))
+        block = original.chain[5]
+        self.assertEqual(loaded.get_block(block.hash).hash, block.hash)
+
+    def test_restart_from_snapshot_reads_only_the_tail(self) -> None:
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                for name in os.listdir(self.data_dir):
+                    os.remove(os.path.join(self.data_dir, name))
+                original = self._open(compact=compact, interval=100)
+                payments = self._fill(original)
+                original.add_transaction(Transaction("alice", "pendente", 2.0))
+                original.save_snapshot()
+                # bloco depois do snapshot, sem a pendente
+                self.assertTrue(original.add_block(Miner(original, "minerador").mine_block([])))
+                original.store.close()
+
+                loaded = self._open(compact=compact, interval=100)
+                self.assertIsInstance(loaded.chain, StoredChain)
+                self.assertEqual(loaded.chain.base, original.snapshot().height)
+                self._assert_same(loaded, original, payments)
+                # pendentes gravadas no snapshot voltam ao pool
+                self.assertEqual(
+                    [tx.destino for tx in loaded.pending_transactions], ["pendente"]
+                )
+                mine(loaded)
+                self.assertTrue(loaded.is_valid_chain(loaded.chain))
+                loaded.store.close()
+
+    def test_restart_without_snapshots_replays_the_chain(self) -> None:
+        original = self._open(snapshots=False)
+        payments = self._fill(original)
+        original.store.close()
+        loaded = self._open(snapshots=False)
+        self._assert_same(loaded, original, payments)
+        loaded.store.close()
+
+    def test_reorg_below_snapshot_rewrites_disk(self) -> None:
+        original = self._open()
+        self._fill(original)
+        original.close()
+        original.store.close()
+        loaded = self._open()
+        fork = loaded.chain[2]
+        old_view = loaded.snapshot()
+        old_hashes = [b.hash for b in old_view]
+        branch = make_branch(fork, len(loaded.chain) - 2)
+        for block in branch:
+            loaded.process_block(block)
+        self.assertEqual(list(loaded.chain[3:]), branch)
+        # versao publicada antes da troca continua lendo a cadeia antiga
+        self.assertEqual([b.hash for b in old_view], old_hashes)
+        hashes = [b.hash for b in loaded.chain]
+        balances = dict(loaded.snapshot().balances)
+        loaded.close()
+        loaded.store.close()
+
+        reloaded = self._open()
+        self.assertEqual([b.hash for b in reloaded.chain], hashes)
+        self.assertEqual(dict(reloaded.snapshot().balances), balances)
+        reloaded.store.close()
+
+    def test_snapshot_is_written_outside_the_lock(self) -> None:
+        original = self._open(interval=100)
+        self._fill(original)
+        writing = threading.Event()
+        release = threading.Event()
+        save = original.snapshots.save
+
+        def slow_save(snapshot: dict) -> None:
+            writing.set()
+            release.wait(5)
+            save(snapshot)
+
+        original.snapshots.save = slow_save
+        original.save_snapshot(wait=False)
+        self.assertTrue(writing.wait(5))
+        # a escrita esta parada e a cadeia continua aceitando blocos
+        mine(original)
+        release.set()
+        original.close()
+        self.assertEqual(original.snapshots.heights(), [original.snapshot().height - 1])
+        original.store.close()
+
+    def test_corrupt_tail_is_dropped(self) -> None:
+        original = self._open(snapshots=False)
+        self._fill(original)
+        original.store.close()
+        store = BlockStore(self.data_dir)
+        keep = len(store) - 2
+        tampered = store.read(keep)
+        store.truncate(keep)
+        tampered.nonce += 1
+        store.append(tampered)
+        store.close()
+
+        loaded = self._open(snapshots=False)
+        self.assertEqual(len(loaded.chain), keep)
+        self.assertEqual(len(loaded.store), keep)
+        loaded.store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
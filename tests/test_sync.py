@@ -0,0 +1,143 @@
+"""Sincronizacao incremental: localizador, REQUEST_BLOCKS e troca de ramo entre nos."""
+
+from __future__ import annotations
+
+import logging
+import unittest
+
+from common import free_port, make_branch, mine
+from lsdchain.core.blockchain import Blockchain
+from lsdchain.network.node import Node
+from lsdchain.network.protocol import Message, MessageType, Protocol, StreamResponse
+
+
+class LocatorTest(unittest.TestCase):
+    def test_locator_is_dense_near_tip_and_ends_at_genesis(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        blockchain.chain = [blockchain.chain[0], *make_branch(blockchain.chain[0], 40)]
+        locator = blockchain.get_locator()
+        heights = [blockchain.find_common_height([h]) for h in locator]
+        self.assertEqual(heights[:10], list(range(40, 30, -1)))
+        self.assertEqual(heights[10:], [29, 25, 17, 1, 0])
+
+    def test_find_common_height(self) -> None:
+        blockchain = Blockchain(validation_workers=1)
+        mine(blockchain)
+        tip = blockchain.last_block
+        self.assertEqual(blockchain.find_common_height(["desconhecido", tip.hash]), 1)
+        self.assertEqual(blockchain.find_common_height(["desconhecido"]), 0)
+
+
+class RequestBlocksTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.node = Node("127.0.0.1", free_port())
+        self.node.SYNC_BATCH_SIZE = 3
+        for _ in range(5):
+            mine(self.node.blockchain)
+
+    def tearDown(self) -> None:
+        self.node.stop()
+        logging.disable(logging.NOTSET)
+
+    def _request(self, locator: list[str], stream: bool = False) -> Message | StreamResponse:
+        return self.node._handle_message(Protocol.request_blocks(locator, 100, stream=stream))
+
+    def test_batches_start_after_the_common_block(self) -> None:
+        chain = self.node.blockchain.chain
+        response = self._request(["desconhecido", chain[1].hash, chain[0].hash])
+        self.assertEqual(response.type, MessageType.RESPONSE_BLOCKS)
+        self.assertEqual(response.payload["start"], 2)
+        self.assertEqual([b["hash"] for b in response.payload["blocks"]], [b.hash for b in chain[2:5]])
+        self.assertTrue(response.payload["more"])
+
+        response = self._request([chain[4].hash])
+        self.assertEqual([b["index"] for b in response.payload["blocks"]], [5])
+        self.assertFalse(response.payload["more"])
+
+    def test_up_to_date_peer_gets_empty_batch(self) -> None:
+        response = self._request([self.node.blockchain.last_block.hash])
+        self.assertEqual(response.payload["blocks"], [])
+        self.assertFalse(response.payload["more"])
+
+    def test_stream_response(self) -> None:
+        chain = self.node.blockchain.chain
+        response = self._request([chain[3].hash], stream=True)
+        self.assertIsInstance(response, StreamResponse)
+        self.assertEqual(response.header.type, MessageType.BLOCK_STREAM)
+        self.assertEqual(response.header.payload["count"], 2)
+        self.assertEqual([b["hash"] for b in response.items], [b.hash for b in chain[4:]])
+
+
+class NodeSyncTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.nodes: list[Node] = []
+
+    def tearDown(self) -> None:
+        for node in self.nodes:
+            node.stop()
+        logging.disable(logging.NOTSET)
+
+    def _node(self) -> Node:
+        node = Node("127.0.0.1", free_port())
+        node.SYNC_BATCH_SIZE = 4
+        node.start()
+        self.nodes.append(node)
+        return node
+
+    def test_sync_extends_and_reorganizes(self) -> None:
+        source, follower = self._node(), self._node()
+        for _ in range(10):
+            mine(source.blockchain)
+        self.assertTrue(follower.connect_to_peer(source.address))
+        self.assertEqual(
+            [b.hash for b in follower.blockchain.chain], [b.hash for b in source.blockchain.chain]
+        )
+
+        # o seguidor minera um ramo proprio; a fonte cresce mais a partir do bloco 8
+        mine(follower.blockchain, miner="seguidor")
+        fork = source.blockchain.chain[8]
+        source.blockchain.chain = [*source.blockchain.chain[:9], *make_branch(fork, 6)]
+        self.assertTrue(follower.connect_to_peer(source.address))
+        self.assertEqual(
+            [b.hash for b in follower.blockchain.chain], [b.hash for b in source.blockchain.chain]
+        )
+        self.assertEqual(follower.blockchain.snapshot().get_balance("seguidor"), 0.0)
+
+    def test_legacy_peer_gets_request_chain_directly(self) -> None:
+        legacy = _LegacyNode("127.0.0.1", free_port())
+        legacy.start()
+        self.nodes.append(legacy)
+        for _ in range(3):
+            mine(legacy.blockchain)
+        follower = self._node()
+        self.assertTrue(follower.connect_to_peer(legacy.address))
+        self.assertEqual(legacy.requests, [MessageType.REQUEST_BLOCKS, MessageType.REQUEST_CHAIN])
+
+        mine(legacy.blockchain)
+        follower.sync_blockchain()
+        self.assertEqual(legacy.requests[2:], [MessageType.REQUEST_CHAIN])
+        self.assertEqual(follower.blockchain.last_block.hash, legacy.blockchain.last_block.hash)
+
+
+class _LegacyNode(Node):
+    """No do protocolo original: nao anuncia capacidades e nao conhece REQUEST_BLOCKS."""
+
+    FEATURES: list[str] = []
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self.requests: list[MessageType] = []
+
+    def _handle_message(self, message: Message) -> Message | StreamResponse | None:
+        if message.type in (MessageType.REQUEST_BLOCKS, MessageType.REQUEST_CHAIN):
+            self.requests.append(message.type)
+        if message.type == MessageType.REQUEST_BLOCKS:
+            raise ValueError("Tipo de mensagem desconhecido")
+        message.payload.pop("stream", None)
+        return super()._handle_message(message)
+
+
+if __name__ == "__main__":
+    unittest.main()
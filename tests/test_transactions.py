@@ -0,0 +1,64 @@
+"""Admissao de transacoes: resultados por item de Blockchain.add_transactions."""
+
+from __future__ import annotations
+
+import unittest
+
+from common import mine
+from lsdchain.core.blockchain import (
+    REJECT_BALANCE,
+    REJECT_COINBASE,
+    REJECT_DUPLICATE,
+    REJECT_INVALID,
+    REJECT_POOL_FULL,
+    Blockchain,
+)
+from lsdchain.core.transaction import Transaction
+
+
+class AddTransactionsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.blockchain = Blockchain(validation_workers=1)
+        mine(self.blockchain, miner="alice")  # alice: 50
+
+    def test_results_in_input_order(self) -> None:
+        funding = Transaction("alice", "bob", 30.0)
+        chained = Transaction("bob", "carol", 20.0)  # usa o credito de `funding`, do mesmo lote
+        overdraft = Transaction("alice", "dave", 30.0)
+        coinbase = Transaction("coinbase", "eve", 50.0)
+        invalid = Transaction("alice", "frank", 1.0)
+        invalid.valor = -1.0
+        results = self.blockchain.add_transactions(
+            [funding, chained, overdraft, funding, coinbase, invalid]
+        )
+        self.assertEqual(
+            results,
+            [None, None, REJECT_BALANCE, REJECT_DUPLICATE, REJECT_COINBASE, REJECT_INVALID],
+        )
+        self.assertEqual(self.blockchain.pending_transactions, [funding, chained])
+        self.assertEqual(self.blockchain.get_balance("alice"), 20.0)
+        self.assertEqual(self.blockchain.get_balance("carol"), 20.0)
+
+    def test_confirmed_transaction_is_duplicate(self) -> None:
+        tx = Transaction("alice", "bob", 1.0)
+        mine(self.blockchain, [tx])
+        self.assertEqual(self.blockchain.add_transactions([tx]), [REJECT_DUPLICATE])
+
+    def test_pool_full_marks_the_evicted_items(self) -> None:
+        self.blockchain.mempool.max_count = 2
+        txs = [Transaction("alice", f"dest{i}", 1.0) for i in range(3)]
+        # limites aplicados no fim do lote: a mais antiga sai
+        self.assertEqual(self.blockchain.add_transactions(txs), [REJECT_POOL_FULL, None, None])
+        self.assertEqual(self.blockchain.pending_transactions, txs[1:])
+
+    def test_metrics_count_each_result(self) -> None:
+        tx = Transaction("alice", "bob", 1.0)
+        self.blockchain.add_transactions([tx, tx, Transaction("zoe", "bob", 1.0)])
+        metrics = self.blockchain.metrics
+        self.assertEqual(metrics.value("lsd_transactions_total", result="accepted"), 1)
+        self.assertEqual(metrics.value("lsd_transactions_total", result=REJECT_DUPLICATE), 1)
+        self.assertEqual(metrics.value("lsd_transactions_total", result=REJECT_BALANCE), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()